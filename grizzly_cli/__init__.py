@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import sys
+from dataclasses import dataclass
+from importlib import import_module
 from os import environ
 from pathlib import Path
-from typing import TYPE_CHECKING, Callable, ClassVar, Optional
+from typing import TYPE_CHECKING, Callable, cast
 
 from grizzly_cli.__version__ import __version__
 
 if TYPE_CHECKING:  # pragma: no cover
-    from behave.model import Scenario
+    from argparse import Namespace as Arguments
 
     from grizzly_cli.argparse import ArgumentSubParser
 
@@ -19,25 +22,55 @@ MOUNT_CONTEXT = environ.get('GRIZZLY_MOUNT_CONTEXT', EXECUTION_CONTEXT)
 
 PROJECT_NAME = Path(EXECUTION_CONTEXT).name
 
-SCENARIOS: list[Scenario] = []
 
-FEATURE_DESCRIPTION: Optional[str] = None
+@dataclass(frozen=True)
+class SubCommand:
+    """A sub-command of `grizzly-cli`, where `module` has a `create_parser` function that adds the sub-command parser,
+    and `entrypoint` is the function in the same module that executes the sub-command.
 
+    The module is only imported when the sub-command is selected, so the dependencies of one sub-command
+    (azure, behave, jinja2...) is not loaded when running another.
+    """
 
-class register_parser:
-    registered: ClassVar[list[Callable[[ArgumentSubParser], None]]] = []
-    order: Optional[int]
+    module: str
+    entrypoint: str
 
-    def __init__(self, order: Optional[int] = None) -> None:
-        self.order = order
+    def create_parser(self, sub_parser: ArgumentSubParser) -> None:
+        create_parser = cast('Callable[[ArgumentSubParser], None]', import_module(self.module).create_parser)
+        create_parser(sub_parser)
 
-    def __call__(self, func: Callable[[ArgumentSubParser], None]) -> Callable[[ArgumentSubParser], None]:
-        if self.order is not None:
-            self.registered.insert(self.order - 1, func)
-        else:
-            self.registered.append(func)
+    def load(self) -> Callable[[Arguments], int]:
+        return cast('Callable[[Arguments], int]', getattr(import_module(self.module), self.entrypoint))
 
-        return func
+
+def get_cache_dir() -> Path:
+    """Directory where `grizzly-cli` can store data that is safe to remove, but speeds things up if it exists.
+
+    `GRIZZLY_CLI_CACHE_DIR` takes precedence, otherwise the platforms user cache directory is used.
+    """
+    cache_dir = environ.get('GRIZZLY_CLI_CACHE_DIR', None)
+    if cache_dir:
+        return Path(cache_dir)
+
+    if sys.platform == 'win32':
+        user_cache_dir = Path(environ.get('LOCALAPPDATA', '') or Path.home() / 'AppData' / 'Local')
+    elif sys.platform == 'darwin':
+        user_cache_dir = Path.home() / 'Library' / 'Caches'
+    else:
+        user_cache_dir = Path(environ.get('XDG_CACHE_HOME', '') or Path.home() / '.cache')
+
+    return user_cache_dir / 'grizzly-cli'
+
+
+SUBCOMMANDS: dict[str, SubCommand] = {
+    'init': SubCommand('grizzly_cli.init', 'init'),
+    'local': SubCommand('grizzly_cli.local', 'local'),
+    'auth': SubCommand('grizzly_cli.auth', 'auth'),
+    'dist': SubCommand('grizzly_cli.distributed', 'distributed'),
+    'keyvault': SubCommand('grizzly_cli.keyvault', 'keyvault'),
+    'render': SubCommand('grizzly_cli.render', 'render'),
+    'validate': SubCommand('grizzly_cli.validate', 'validate'),
+}
 
 
 __all__ = [
@@ -5,20 +5,18 @@ import sys
 from pathlib import Path
 from shutil import which
 from traceback import format_exc
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Optional, cast
 
-from grizzly_cli import __version__, register_parser
+from grizzly_cli import SUBCOMMANDS, __version__
 from grizzly_cli.argparse import ArgumentParser
-from grizzly_cli.auth import auth
-from grizzly_cli.distributed import distributed
-from grizzly_cli.init import init
-from grizzly_cli.keyvault import keyvault
-from grizzly_cli.local import local
-from grizzly_cli.utils import ask_yes_no, get_dependency_versions, get_distributed_system, setup_logging
+from grizzly_cli.utils import ask_yes_no, get_dependency_versions, get_distributed_system, parse_user_range, setup_logging
+from grizzly_cli.utils.feature import FeatureAnalysis
 
 if TYPE_CHECKING:
     import argparse
 
+    from grizzly_cli.argparse.lazy import LazySubParsersAction
+
 
 def _create_parser() -> ArgumentParser:
     parser = ArgumentParser(
@@ -49,10 +47,11 @@ def _create_parser() -> ArgumentParser:
         help='print version of command line interface, and exit. add argument `all` to get versions of dependencies',
     )
 
-    sub_parser = parser.add_subparsers(dest='command')
+    sub_parser = cast('LazySubParsersAction', parser.add_subparsers(dest='command'))
 
-    for create_parser in register_parser.registered:
-        create_parser(sub_parser)
+    # sub-command parser (and module) is not created until it is selected
+    for name, subcommand in SUBCOMMANDS.items():
+        sub_parser.add_lazy_parser(name, subcommand.create_parser)
 
     return parser
 
@@ -82,11 +81,21 @@ def _parse_show_version(args: argparse.Namespace) -> None:
     raise SystemExit(0)
 
 
-def _parse_run(parser: ArgumentParser, args: argparse.Namespace) -> None:
+def _parse_run(parser: ArgumentParser, args: argparse.Namespace) -> None:  # noqa: C901, PLR0912
     if args.command == 'dist':
         if args.limit_nofile < 10001 and not args.yes:
             print('!! this will cause warning messages from locust later on')
             ask_yes_no('are you sure you know what you are doing?')
+
+        if args.workers == 'auto':
+            if args.users_per_worker is None:
+                parser.error_no_help('--workers auto can only be used in combination with --users-per-worker')
+
+            if args.validate_config:
+                parser.error_no_help('--workers auto cannot be used in combination with --validate-config')
+
+        if args.users_per_worker is not None and args.users_per_worker < 1:
+            parser.error_no_help('--users-per-worker must be at least 1')
     elif args.command == 'local' and which('behave') is None:
         parser.error_no_help('"behave" not found in PATH, needed when running local mode')
 
@@ -98,6 +107,21 @@ def _parse_run(parser: ArgumentParser, args: argparse.Namespace) -> None:
             except ValueError:  # noqa: PERF203
                 parser.error_no_help('-T/--testdata-variable needs to be in the format NAME=VALUE')
 
+    if getattr(args, 'watch', False) and not args.dump and not args.dry_run:
+        parser.error_no_help('--watch can only be used in combination with --dump or --dry-run')
+
+    if getattr(args, 'plan_users', None) is not None:
+        try:
+            args.plan_users = parse_user_range(args.plan_users)
+        except ValueError as e:
+            parser.error_no_help(f'--plan-users: {e}')
+
+    if getattr(args, 'plan_only', False) and getattr(args, 'plan_users', None) is not None:
+        parser.error_no_help('--plan-only cannot be used in combination with --plan-users')
+
+    if getattr(args, 'plan_format', None) is not None and not getattr(args, 'plan_only', False):
+        parser.error_no_help('--plan-format can only be used in combination with --plan-only')
+
     if args.csv_prefix is None:
         if args.csv_interval is not None:
             parser.error_no_help('--csv-interval can only be used in combination with --csv-prefix')
@@ -106,9 +130,76 @@ def _parse_run(parser: ArgumentParser, args: argparse.Namespace) -> None:
             parser.error_no_help('--csv-flush-interval can only be used in combination with --csv-prefix')
 
 
+def _find_feature_file(argv: list[str]) -> Optional[Path]:
+    """Find the feature file argument of `local run` or `dist run` in `argv`, without parsing the arguments.
+
+    File names with spaces can be split over multiple arguments, so consecutive arguments that are not options
+    are joined and checked as well.
+    """
+    command_index = next((index for index, argument in enumerate(argv) if argument in SUBCOMMANDS), None)
+
+    if command_index is None or argv[command_index] not in ['local', 'dist'] or 'run' not in argv[command_index:]:
+        return None
+
+    arguments = argv[argv.index('run', command_index) + 1:]
+
+    for start, argument in enumerate(arguments):
+        if argument.startswith('-'):
+            continue
+
+        for end in range(start, len(arguments)):
+            if arguments[end].startswith('-'):
+                break
+
+            candidate = ' '.join(arguments[start:end + 1])
+            if candidate.endswith('.feature') and Path(candidate).is_file():
+                return Path(candidate)
+
+    return None
+
+
+def _inject_additional_arguments_from_metadata(argv: list[str]) -> list[str]:
+    """Add arguments from `# grizzly-cli <argument> <additional arguments...>` lines in the feature file to `argv`,
+    before it is parsed, so the arguments only has to be parsed once.
+
+    Nothing is injected when completing, the output is the suggestions and any message would be suggested as well.
+    """
+    if any(argument.startswith('--bash-complete') for argument in argv):
+        return argv
+
+    file = _find_feature_file(argv)
+
+    if file is None:
+        return argv
+
+    file_metadata = FeatureAnalysis.analyse(file).metadata_arguments
+
+    if len(file_metadata) < 1:
+        return argv
+
+    argv = argv[:]
+    for additional_arguments in file_metadata:
+        try:
+            if additional_arguments[0].strip().startswith('-'):
+                raise ValueError
+
+            index = argv.index(additional_arguments[0]) + 1
+            for zindex, additional_argument in enumerate(additional_arguments[1:]):
+                argv.insert(index + zindex, additional_argument)
+        except ValueError:  # noqa: PERF203
+            print('?? ignoring {}'.format(' '.join(additional_arguments)))
+
+    return argv
+
+
 def _parse_arguments() -> argparse.Namespace:
+    argv = _inject_additional_arguments_from_metadata(sys.argv[1:])
+
+    # suggested command lines, e.g. when validating compose project fails, should include injected arguments
+    sys.argv = sys.argv[0:1] + argv
+
     parser = _create_parser()
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if hasattr(args, 'file'):
         # needed to support file names with spaces, which is escaped (sh-style)
@@ -120,7 +211,7 @@ def _parse_arguments() -> argparse.Namespace:
     if args.command is None:
         parser.error('no command specified')
 
-    if getattr(args, 'subcommand', None) is None and args.command not in ['init', 'auth']:
+    if getattr(args, 'subcommand', None) is None and args.command not in ['init', 'auth', 'render', 'validate']:
         parser.error_no_help(f'no subcommand for {args.command} specified')
 
     if args.command == 'dist':
@@ -131,7 +222,7 @@ def _parse_arguments() -> argparse.Namespace:
 
         if args.registry is not None and not args.registry.endswith('/'):
             args.registry = f'{args.registry}/'
-    elif args.command in ['init', 'auth']:
+    elif args.command in ['init', 'auth', 'render', 'validate']:
         args.subcommand = None
 
     if args.subcommand == 'run':
@@ -146,52 +237,19 @@ def _parse_arguments() -> argparse.Namespace:
     return args
 
 
-def _inject_additional_arguments_from_metadata(args: argparse.Namespace) -> argparse.Namespace:
-    with Path(args.file).open() as fd:
-        file_metadata = [line.strip().replace('# grizzly-cli ', '').split(' ') for line in fd if line.strip().startswith('# grizzly-cli ')]
-
-    if len(file_metadata) < 1:
-        return args
-
-    argv = sys.argv[1:]
-    for additional_arguments in file_metadata:
-        try:
-            if additional_arguments[0].strip().startswith('-'):
-                raise ValueError
-
-            index = argv.index(additional_arguments[0]) + 1
-            for zindex, additional_argument in enumerate(additional_arguments[1:]):
-                argv.insert(index + zindex, additional_argument)
-        except ValueError:  # noqa: PERF203
-            print('?? ignoring {}'.format(' '.join(additional_arguments)))
-
-    sys.argv = sys.argv[0:1] + argv
-
-    return _parse_arguments()
-
-
 def main() -> int:
     args: Optional[argparse.Namespace] = None
 
     try:
         args = _parse_arguments()
 
-        if getattr(args, 'file', None) is not None and args.command not in ['keyvault']:
-            args = _inject_additional_arguments_from_metadata(args)
-
-        if args.command == 'local':
-            rc = local(args)
-        elif args.command == 'dist':
-            rc = distributed(args)
-        elif args.command == 'init':
-            rc = init(args)
-        elif args.command == 'auth':
-            rc = auth(args)
-        elif args.command == 'keyvault':
-            rc = keyvault(args)
-        else:
+        subcommand = SUBCOMMANDS.get(args.command)
+
+        if subcommand is None:
             message = f'unknown command {args.command}'
             raise ValueError(message)
+
+        rc = subcommand.load()(args)
     except (KeyboardInterrupt, ValueError) as e:
         print()
         if isinstance(e, ValueError):
@@ -203,3 +261,7 @@ def main() -> int:
         return 1
     else:
         return rc
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
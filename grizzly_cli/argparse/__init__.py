@@ -6,8 +6,9 @@ from argparse import ArgumentParser as CoreArgumentParser
 from argparse import Namespace, _SubParsersAction
 from typing import TYPE_CHECKING, Any, Optional, cast
 
-from grizzly_cli.argparse.bashcompletion import BashCompletionAction
+from grizzly_cli.argparse.bashcompletion import BashCompletionAction, BashCompletionServerAction
 from grizzly_cli.argparse.bashcompletion import hook as bashcompletion_hook
+from grizzly_cli.argparse.lazy import LazySubParsersAction
 from grizzly_cli.argparse.markdown import MarkdownFormatter, MarkdownHelpAction
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -23,6 +24,9 @@ class ArgumentParser(CoreArgumentParser):
     def __init__(self, *args: Any, markdown_help: bool = False, bash_completion: bool = False, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
+        # sub-parsers can be registered with a factory, and is not created until needed
+        self.register('action', 'parsers', LazySubParsersAction)
+
         self.markdown_help = markdown_help
         self.bash_completion = bash_completion
 
@@ -31,6 +35,7 @@ class ArgumentParser(CoreArgumentParser):
 
         if self.bash_completion:
             self.add_argument('--bash-completion', action=BashCompletionAction)
+            self.add_argument('--bash-completion-server', action=BashCompletionServerAction)
 
         self._optionals.title = 'optional arguments'
 
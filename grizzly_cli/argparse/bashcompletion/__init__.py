@@ -6,6 +6,7 @@ from argparse import (
     Action,
     ArgumentError,
     ArgumentParser,
+    ArgumentTypeError,
     Namespace,
     _AppendAction,
     _StoreAction,
@@ -15,18 +16,36 @@ from argparse import (
 from collections.abc import Sequence
 from os import path
 from pathlib import Path
+from shlex import quote
 from typing import Any, Optional, Union, cast
 
+from grizzly_cli.argparse.bashcompletion.index import snapshot
+from grizzly_cli.argparse.bashcompletion.server import get_socket_path, serve
 from grizzly_cli.argparse.bashcompletion.types import BashCompletionTypes
+from grizzly_cli.argparse.lazy import LazyParserMap
 
 __all__ = [
     'BashCompleteAction',
     'BashCompletionAction',
+    'BashCompletionServerAction',
     'BashCompletionTypes',
     'hook',
 ]
 
 
+def _is_valid_value(value_type: Any, value: Optional[str]) -> bool:
+    """Check if `value` can be converted by an argument type that is not `str`, `int` or a file."""
+    if value is None:
+        return False
+
+    try:
+        value_type(value)
+    except (ValueError, TypeError, ArgumentTypeError):
+        return False
+
+    return True
+
+
 class BashCompletionAction(Action):
     def __init__(
         self,
@@ -54,8 +73,101 @@ class BashCompletionAction(Action):
         current_file = Path(__file__)
         file_directory = current_file.parent
         bash_script = file_directory / 'bashcompletion.bash'
+        spec = '\n'.join(f'        [{quote(key)}]={quote(value)}' for key, value in self.get_spec(parser).items())
+
         with bash_script.open(encoding='utf-8') as fd:
-            print(fd.read().replace('bashcompletion_template', parser.prog))
+            print(
+                fd.read()
+                .replace('bashcompletion_template', parser.prog)
+                .replace('bashcompletion_socket', get_socket_path().as_posix())
+                .replace('        bashcompletion_spec', spec),
+            )
+
+        parser.exit()
+
+    def get_spec(self, parser: ArgumentParser, command: Optional[str] = None) -> dict[str, str]:
+        """Create a static specification of the parser tree, so options and sub-commands can be completed in bash, without
+        starting python.
+
+        Keys are `<command>:<suggestion>`, where the value is `command` for sub-commands, and `flag`, `store` or `append`
+        (suffixed with `-file` if the value is a `BashCompletionTypes.File`) for options. `<command>:<option>:removes` are
+        the options that should not be suggested after the option has been completed (the option itself and mutually exclusive
+        options). `<command>:suggestions` is all suggestions, in order, and `<command>:files` is set if there is a positional
+        argument that needs file suggestions.
+        """
+        if command is None:
+            command = parser.prog
+
+        complete_action = BashCompleteAction(['--bash-complete'])
+        suggestions = complete_action.get_suggestions(parser)
+        exclusive_suggestions = complete_action.get_exclusive_suggestions(parser)
+
+        spec: dict[str, str] = {}
+        names: list[str] = []
+
+        for name, suggestion in suggestions.items():
+            if not isinstance(suggestion, Action):
+                continue
+
+            if isinstance(suggestion, _SubParsersAction):
+                names.append(name)
+                spec.update({f'{command}:{name}': 'command'})
+                spec.update(self.get_spec(suggestion.choices[name], f'{command} {name}'))
+            elif len(suggestion.option_strings) > 0:
+                names.append(name)
+
+                if isinstance(suggestion, _AppendAction):
+                    kind = 'append'
+                elif isinstance(suggestion, _StoreAction):
+                    kind = 'store'
+                else:
+                    kind = 'flag'
+
+                if isinstance(suggestion.type, BashCompletionTypes.File):
+                    kind = f'{kind}-file'
+
+                spec.update({
+                    f'{command}:{name}': kind,
+                    f'{command}:{name}:removes': ' '.join([*suggestion.option_strings, *exclusive_suggestions.get(name, [])]),
+                })
+            elif isinstance(suggestion.type, BashCompletionTypes.File):
+                spec.update({f'{command}:files': suggestion.dest})
+
+        spec.update({f'{command}:suggestions': ' '.join(names)})
+
+        return spec
+
+
+class BashCompletionServerAction(Action):
+    def __init__(
+        self,
+        option_strings: list[str],
+        dest: str = SUPPRESS,
+        default: str = SUPPRESS,
+        help_text: str = SUPPRESS,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(
+            option_strings=option_strings,
+            dest=dest,
+            default=default,
+            help=help_text,
+            nargs=0,
+            **kwargs,
+        )
+
+    def __call__(
+        self,
+        parser: ArgumentParser,
+        *_args: Any,
+        **_kwargs: Any,
+    ) -> None:
+        try:
+            serve(parser)
+        except (ValueError, OSError) as e:
+            parser.exit(1, f'{e!s}\n')
+        except KeyboardInterrupt:
+            pass
 
         parser.exit()
 
@@ -82,7 +194,7 @@ class BashCompleteAction(Action):
         suggestions: dict[str, Union[str, Action]] = {}
 
         for action in parser._actions:
-            if isinstance(action, (BashCompleteAction, BashCompletionAction)) or (SUPPRESS in [action.help, action.default] and action.dest != 'help'):
+            if isinstance(action, (BashCompleteAction, BashCompletionAction, BashCompletionServerAction)) or (SUPPRESS in [action.help, action.default] and action.dest != 'help'):
                 continue
 
             if isinstance(action, _SubParsersAction):
@@ -206,7 +318,18 @@ class BashCompleteAction(Action):
 
         return filtered_suggestions
 
-    def __call__(  # noqa: C901, PLR0912, PLR0915
+    def __call__(
+        self,
+        parser: ArgumentParser,
+        namespace: Namespace,
+        values: Union[str, Sequence[Any], None],
+        option_string: Optional[str] = None,
+    ) -> None:
+        # files are listed multiple times during one completion, only check the file system for changes once
+        with snapshot():
+            self.complete(parser, namespace, values, option_string)
+
+    def complete(  # noqa: C901, PLR0912, PLR0915
         self,
         parser: ArgumentParser,
         namespace: Namespace,  # noqa: ARG002
@@ -261,7 +384,11 @@ class BashCompleteAction(Action):
                         suggestions = all_suggestions
                         for option in suggestion.option_strings:
                             del suggestions[option]
-                elif (suggestion.type is str and not isinstance(value, str)) or (suggestion.type is int and (value is None or not value.isnumeric())):
+                elif (
+                    (suggestion.type is str and not isinstance(value, str))
+                    or (suggestion.type is int and (value is None or not value.isnumeric()))
+                    or (suggestion.type not in [str, int] and not _is_valid_value(suggestion.type, value))
+                ):
                     suggestions = {}
 
                 if value is not None and isinstance(suggestion, _StoreAction):
@@ -314,5 +441,11 @@ def hook(parser: ArgumentParser) -> None:
         _subparsers = getattr(parser, '_subparsers', None)
         if _subparsers is not None:
             for subparsers in _subparsers._group_actions:
+                # do not create lazy sub-parsers just to hook them, it will be done when they are needed
+                if isinstance(subparsers.choices, LazyParserMap):
+                    if hook not in subparsers.choices.hooks:
+                        subparsers.choices.add_hook(hook)
+                    continue
+
                 for subparser in subparsers.choices.values():
                     hook(subparser)
@@ -1,5 +1,5 @@
-_bashcompletion_template() {
-    local current previous command
+_bashcompletion_template_python() {
+    local current previous command reply socket="bashcompletion_socket"
 
     current="${COMP_WORDS[COMP_CWORD]}"
     previous="${COMP_WORDS[$((COMP_CWORD - 1))]}"
@@ -15,7 +15,84 @@ _bashcompletion_template() {
         command="${COMP_WORDS[*]}"
     fi
 
+    # ask completion server, if it is running, instead of starting a new process for each TAB press. only a socket that
+    # is owned by the current user, in a directory owned by the current user, is used
+    if [[ -S "${socket}" && -O "${socket}" && ! -L "${socket}" && -O "${socket%/*}" && ! -L "${socket%/*}" ]] && command -v socat &> /dev/null; then
+        if reply="$(printf '%s\n%s\n%s\n' "${PWD}" "${command}" "${current}" | socat -t 1 - "UNIX-CONNECT:${socket}" 2> /dev/null)"; then
+            if [[ -n "${reply}" ]]; then
+                mapfile -t COMPREPLY <<< "${reply}"
+            else
+                COMPREPLY=()
+            fi
+            return 0
+        fi
+    elif [[ -n "${GRIZZLY_CLI_COMPLETION_SERVER}" ]] && command -v socat &> /dev/null; then
+        ( ${command%% *} --bash-completion-server < /dev/null &> /dev/null & )
+    fi
+
     mapfile -t COMPREPLY < <( ${command} --bash-complete="${command} ${current}" )
 }
 
+_bashcompletion_template() {
+    # generated from the parser tree, see BashCompletionAction.get_spec
+    local -A spec=(
+        bashcompletion_spec
+    )
+    local -A removed=()
+    local command="bashcompletion_template" current="${COMP_WORDS[COMP_CWORD]}" pending="" word kind option index
+
+    COMPREPLY=()
+
+    for (( index = 1; index < COMP_CWORD; index++ )); do
+        word="${COMP_WORDS[index]}"
+
+        # value for previous option, unless it is another option
+        if [[ -n "${pending}" ]]; then
+            pending=""
+            [[ "${word}" != -* ]] && continue
+        fi
+
+        if [[ "${word}" == "-h" || "${word}" == "--help" ]]; then
+            return 0
+        fi
+
+        kind="${spec["${command}:${word}"]}"
+
+        case "${kind}" in
+            command)
+                command="${command} ${word}"
+                removed=()
+                ;;
+            append*)
+                pending="${word}"
+                ;;
+            store*|flag*)
+                [[ "${kind}" == store* ]] && pending="${word}"
+                for option in ${spec["${command}:${word}:removes"]}; do
+                    removed["${option}"]=1
+                done
+                ;;
+        esac
+    done
+
+    # only values for file arguments needs python
+    if [[ -n "${pending}" && "${current}" != -* ]]; then
+        if [[ "${spec["${command}:${pending}"]}" == *-file ]]; then
+            _bashcompletion_template_python
+        fi
+        return 0
+    fi
+
+    if [[ "${current}" != -* && -n "${spec["${command}:files"]}" ]]; then
+        _bashcompletion_template_python
+        return 0
+    fi
+
+    for option in ${spec["${command}:suggestions"]}; do
+        if [[ -z "${removed["${option}"]}" && "${option}" == "${current}"* ]]; then
+            COMPREPLY+=("${option}")
+        fi
+    done
+}
+
 complete -F _bashcompletion_template -o filenames -o noquote bashcompletion_template
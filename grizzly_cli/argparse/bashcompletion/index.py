@@ -0,0 +1,240 @@
+"""Persistent index of the files in a directory tree, used when suggesting `BashCompletionTypes.File` values.
+
+Walking the whole tree on each completion is slow in large projects. The index keeps the listing of each directory
+together with the directory mtime, and on refresh only directories where the mtime has changed (entries has been added,
+removed or renamed) are listed again. Unchanged directories only costs a `stat`. Symbolic links to directories are
+followed, but a directory is only visited once, so links that points back into the tree does not loop forever.
+
+The index is stored in the user cache directory, one file per root directory, so it survives between completions.
+"""
+from __future__ import annotations
+
+import json
+import os
+from contextlib import contextmanager, suppress
+from hashlib import sha1
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from time import time_ns
+from typing import TYPE_CHECKING, Optional
+
+from grizzly_cli import get_cache_dir
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Callable, Generator
+
+__all__ = [
+    'FileIndex',
+    'get_file_index',
+    'snapshot',
+]
+
+# bump if the format of the stored index changes
+INDEX_VERSION = 1
+
+# file systems with coarse mtime resolution might not change the mtime for changes done right after a scan, so
+# listings of directories modified within this many nanoseconds of the scan are re-scanned on next refresh
+RACY_MTIME_NS = 2_000_000_000
+
+
+class FileIndex:
+    """Directory listings of all non-hidden directories under `root`.
+
+    `directories` maps the directory (posix style, relative to `root`, `''` for root itself) to
+    `[mtime_ns, [file names], [directory names]]`.
+    """
+
+    root: Path
+    file: Path
+    directories: dict[str, tuple[int, list[str], list[str]]]
+    changed: bool
+
+    def __init__(self, root: Path, file: Optional[Path] = None) -> None:
+        self.root = root
+        self.file = file if file is not None else self.get_index_file(root)
+        self.directories = {}
+        self.changed = False
+
+    @classmethod
+    def get_index_file(cls, root: Path) -> Path:
+        key = sha1(root.as_posix().encode('utf-8')).hexdigest()  # noqa: S324
+
+        return get_cache_dir() / 'completion' / f'{key}.json'
+
+    @classmethod
+    def load(cls, root: Path) -> FileIndex:
+        index = cls(root)
+
+        # a missing, old or broken index is the same as an empty index, it will be rebuilt on refresh
+        with suppress(OSError, ValueError, TypeError):
+            data = json.loads(index.file.read_text(encoding='utf-8'))
+            if data.get('version') == INDEX_VERSION and data.get('root') == root.as_posix():
+                index.directories = {directory: (mtime_ns, files, dirs) for directory, (mtime_ns, files, dirs) in data['directories'].items()}
+
+        return index
+
+    def save(self) -> None:
+        if not self.changed:
+            return
+
+        data = {
+            'version': INDEX_VERSION,
+            'root': self.root.as_posix(),
+            'directories': self.directories,
+        }
+
+        # a failing cache should not fail the completion
+        with suppress(OSError):
+            self.file.parent.mkdir(parents=True, exist_ok=True)
+
+            # write to a temporary file and replace, so a concurrent completion never reads a partial index
+            with NamedTemporaryFile('w', encoding='utf-8', dir=self.file.parent, suffix='.tmp', delete=False) as fd:
+                json.dump(data, fd, separators=(',', ':'))
+
+            Path(fd.name).replace(self.file)
+            self.changed = False
+
+    def _scan(self, directory: Path) -> tuple[list[str], list[str]]:
+        files: list[str] = []
+        dirs: list[str] = []
+
+        with suppress(OSError), os.scandir(directory) as entries:
+            for entry in entries:
+                # hidden files and directories are never suggested, and not indexed
+                if entry.name.startswith('.'):
+                    continue
+
+                with suppress(OSError):
+                    if entry.is_dir():
+                        dirs.append(entry.name)
+                    else:
+                        files.append(entry.name)
+
+        return sorted(files), sorted(dirs)
+
+    @classmethod
+    def is_compatible(cls, directory: str, prefix: str) -> bool:
+        """Check if `directory` can contain files that starts with `prefix`, or is on the way to such a directory."""
+        if not directory or not prefix:
+            return True
+
+        directory = f'{directory}/'
+
+        return directory.startswith(prefix) or prefix.startswith(directory)
+
+    def refresh(self, prefix: str = '') -> bool:
+        """Update the index with the current state of the file system, only directories that has changed are listed.
+
+        Only directories that are compatible with `prefix` (the value typed so far) are visited, the rest of the index
+        is kept as is until it is needed. Returns `True` if anything in the index changed.
+        """
+        directories: dict[str, tuple[int, list[str], list[str]]] = {
+            directory: listing for directory, listing in self.directories.items() if not self.is_compatible(directory, prefix)
+        }
+        pending: list[str] = ['']
+        changed = False
+        visited = 0
+        # (device, inode) of visited directories, symbolic links can point to a directory that already has been visited
+        seen: set[tuple[int, int]] = set()
+
+        while pending:
+            relative_directory = pending.pop()
+            directory = self.root / relative_directory if relative_directory else self.root
+
+            try:
+                directory_stat = directory.stat()
+            except OSError:
+                changed = True
+                continue
+
+            if (directory_stat.st_dev, directory_stat.st_ino) in seen:
+                continue
+
+            seen.add((directory_stat.st_dev, directory_stat.st_ino))
+            mtime_ns = directory_stat.st_mtime_ns
+
+            cached = self.directories.get(relative_directory)
+
+            if cached is not None and cached[0] == mtime_ns:
+                listing = cached
+            else:
+                files, dirs = self._scan(directory)
+                listing = (mtime_ns if time_ns() - mtime_ns > RACY_MTIME_NS else -1, files, dirs)
+                changed = True
+
+            directories[relative_directory] = listing
+            visited += 1
+
+            for name in listing[2]:
+                sub_directory = f'{relative_directory}/{name}' if relative_directory else name
+
+                # prune directories that can not contain anything matching the prefix, before descending
+                if self.is_compatible(sub_directory, prefix):
+                    pending.append(sub_directory)
+
+        # directories that has been removed
+        if not changed and len(directories) != len(self.directories):
+            changed = True
+
+        self.directories = directories
+        self.changed = self.changed or changed
+
+        return changed
+
+    def files(self, prefix: str = '', name_filter: Optional[Callable[[str], object]] = None) -> Generator[str, None, None]:
+        """Indexed files in directories compatible with `prefix`, posix style and relative to `root`.
+
+        If `name_filter` is provided, only files where it returns something truthy for the file name are included.
+        """
+        for directory, (_, files, _) in self.directories.items():
+            if not self.is_compatible(directory, prefix):
+                continue
+
+            directory_prefix = f'{directory}/' if directory else ''
+            for file in files:
+                if name_filter is None or name_filter(file):
+                    yield f'{directory_prefix}{file}'
+
+
+_indexes: dict[Path, FileIndex] = {}
+
+_snapshot: Optional[set[tuple[Path, str]]] = None
+
+
+@contextmanager
+def snapshot() -> Generator[None, None, None]:
+    """Within the context, the same part of an index is only refreshed the first time it is used.
+
+    One completion can list files multiple times, there is no need to check the file system for changes each time.
+    """
+    global _snapshot  # noqa: PLW0603
+
+    previous, _snapshot = _snapshot, set()
+
+    try:
+        yield
+    finally:
+        _snapshot = previous
+
+
+def get_file_index(root: Path, prefix: str = '') -> FileIndex:
+    """Get an index for `root`, that is up to date for directories compatible with `prefix`.
+
+    Loaded from the cache the first time in a process, and kept in memory so that repeated calls (e.g. in the
+    completion server) does not re-read it.
+    """
+    index = _indexes.get(root)
+
+    if index is None:
+        index = _indexes[root] = FileIndex.load(root)
+
+    key = (root, prefix)
+
+    if _snapshot is None or key not in _snapshot:
+        index.refresh(prefix)
+        index.save()
+
+        if _snapshot is not None:
+            _snapshot.add(key)
+
+    return index
@@ -0,0 +1,149 @@
+"""Opt-in completion server, that answers `--bash-complete` queries over a per-user unix socket.
+
+Starting `grizzly-cli` for each TAB press means that python has to start, all modules has to be imported and the parser
+tree has to be created, every time. The server does this once, and keeps the parsers (and any lazily imported
+sub-command modules) warm in between requests.
+
+Requests are three lines, current working directory, the command being completed and the current word. The response
+is the suggestions, one per line, i.e. the same as `--bash-complete` would print.
+
+The socket directory can be in a shared directory (e.g. `/tmp`), so the server is only started if the directory is
+private to the current user, and the bash completion only uses a socket owned by the current user. Otherwise completion
+is done in-process, as without the server.
+"""
+from __future__ import annotations
+
+import os
+import socket
+import stat
+from contextlib import redirect_stderr, redirect_stdout, suppress
+from getpass import getuser
+from io import StringIO
+from pathlib import Path
+from tempfile import gettempdir
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from argparse import ArgumentParser
+
+__all__ = [
+    'complete',
+    'get_socket_path',
+    'serve',
+]
+
+# stop server if it has not received any requests in this many seconds, so it does not live on after an upgrade
+IDLE_TIMEOUT = 1800.0
+
+REQUEST_TIMEOUT = 2.0
+
+
+def get_socket_path() -> Path:
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR', None) or gettempdir()
+
+    return Path(runtime_dir) / f'grizzly-cli-{getuser()}' / 'completion.sock'
+
+
+def _check_directory(directory: Path) -> None:
+    """Make sure `directory` exists, and that it is a directory (not a symbolic link) only accessible by the current user."""
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    directory_stat = directory.lstat()
+
+    if not stat.S_ISDIR(directory_stat.st_mode) or directory_stat.st_uid != os.getuid() or stat.S_IMODE(directory_stat.st_mode) != 0o700:
+        message = f'{directory.as_posix()} is not a directory only accessible by the current user, completion server is not started'
+        raise ValueError(message)
+
+
+def complete(parser: ArgumentParser, cwd: str, command: str, current: str) -> str:
+    """Do the same as `<command> --bash-complete="<command> <current>"` would do, and return what it printed."""
+    output = StringIO()
+
+    try:
+        os.chdir(cwd)
+    except OSError:
+        return ''
+
+    argv = [*command.split()[1:], f'--bash-complete={command} {current}']
+
+    with redirect_stdout(output), redirect_stderr(StringIO()), suppress(SystemExit):
+        parser.parse_args(argv)
+
+    return output.getvalue()
+
+
+def _read_request(connection: socket.socket) -> tuple[str, str, str] | None:
+    buffer: list[bytes] = []
+
+    while True:
+        chunk = connection.recv(4096)
+        if not chunk:
+            break
+
+        buffer.append(chunk)
+
+        # all three lines has been received, do not wait for client to close its end
+        if b''.join(buffer).count(b'\n') >= 3:
+            break
+
+    lines = b''.join(buffer).decode('utf-8').split('\n')
+
+    if len(lines) < 3:
+        return None
+
+    cwd, command, current = lines[:3]
+
+    return cwd, command, current
+
+
+def _bind(socket_path: Path) -> socket.socket:
+    _check_directory(socket_path.parent)
+
+    if socket_path.exists():
+        # another server is already running, if we can connect to it
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            try:
+                client.connect(socket_path.as_posix())
+            except OSError:
+                socket_path.unlink()
+            else:
+                message = f'completion server is already running on {socket_path.as_posix()}'
+                raise ValueError(message)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path.as_posix())
+    socket_path.chmod(0o600)
+    server.listen()
+
+    return server
+
+
+def serve(parser: ArgumentParser, socket_path: Path | None = None, idle_timeout: float = IDLE_TIMEOUT) -> None:
+    if socket_path is None:
+        socket_path = get_socket_path()
+
+    server = _bind(socket_path)
+    server.settimeout(idle_timeout)
+    cwd = Path.cwd()
+
+    try:
+        while True:
+            try:
+                connection, _ = server.accept()
+            except socket.timeout:
+                break
+
+            with connection:
+                connection.settimeout(REQUEST_TIMEOUT)
+                try:
+                    request = _read_request(connection)
+                    if request is None:
+                        continue
+
+                    response = complete(parser, *request)
+                    connection.sendall(response.encode('utf-8'))
+                except OSError:
+                    continue
+    finally:
+        server.close()
+        socket_path.unlink(missing_ok=True)
+        os.chdir(cwd)
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import re
 import sys
 from argparse import ArgumentTypeError
 from fnmatch import filter as fnmatch_filter
+from fnmatch import translate
+from functools import cached_property
+from os.path import normcase
 from os.path import sep as path_sep
 from pathlib import Path
 from typing import Optional, cast
 
+from grizzly_cli.argparse.bashcompletion.index import get_file_index
+
 __all__ = [
     'BashCompletionTypes',
 ]
@@ -22,9 +28,20 @@ class BashCompletionTypes:
     class File:
         def __init__(self, *args: str, missing_ok: bool = False) -> None:
             self.patterns = list(args)
-            self.cwd = Path.cwd()
             self.missing_ok = missing_ok
 
+        @cached_property
+        def name_pattern(self) -> re.Pattern[str]:
+            # all patterns in one expression, file names are matched case insensitive where the file system is
+            flags = re.IGNORECASE if normcase('A') == normcase('a') else 0
+
+            return re.compile('|'.join(f'(?:{translate(pattern)})' for pattern in self.patterns), flags)
+
+        @property
+        def cwd(self) -> Path:
+            # not bound when the type is created, the parser can be reused in different directories by the completion server
+            return Path.cwd()
+
         def __call__(self, value: str) -> str:
             if self.missing_ok:
                 return value
@@ -65,40 +82,35 @@ class BashCompletionTypes:
                 for chr_with, chr_replace in ESCAPE_CHARACTERS.items():
                     value = value.replace(cast('str', chr_replace), chr_with)
 
-            for pattern in self.patterns:
-                for path in self.cwd.rglob(f'**/{pattern}'):
+            prefix = value or ''
+            index = get_file_index(self.cwd, prefix)
+
+            # one pass over the files for all patterns, hidden paths and directories not compatible with the value are not walked
+            for path_match_value in index.files(prefix, self.name_pattern.match):
+                if not path_match_value.startswith(prefix):
+                    continue
+
+                match: Optional[dict[str, str]] = None
+
+                # all paths are treated in posix style
+                if '/' in path_match_value:  # there is a directory in the match
                     try:
-                        path_match = path.relative_to(self.cwd)
+                        """
+                        find first part that matches with provided value;
+                        value = `hel`
+                        path_match_value = `hello/example.txt`
+                        should be `hello`, and a dir(ectory)
+                        """
+                        index_match = len(prefix)
+                        index_sep = path_match_value.index('/', index_match)
+                        match = {self._transform_path(path_match_value[:index_sep]): 'dir'}
                     except ValueError:
-                        path_match = path
-
-                    path_match_value = path_match.as_posix()
-
-                    # skip any paths where any part is hidden, or any path that is not (partially) relative to provided value
-                    if any(part.startswith('.') for part in path_match.parts) or (value is not None and not path_match_value.startswith(value)):
-                        continue
-
-                    match: Optional[dict[str, str]] = None
-
-                    # all paths are treated in posix style
-                    if '/' in path_match_value:  # there is a directory in the match
-                        try:
-                            """
-                            find first part that matches with provided value;
-                            value = `hel`
-                            path_match_value = `hello/example.txt`
-                            should be `hello`, and a dir(ectory)
-                            """
-                            index_match = len(value or '')
-                            index_sep = path_match_value.index('/', index_match)
-                            match = {self._transform_path(path_match_value[:index_sep]): 'dir'}
-                        except ValueError:
-                            # no match against provided value, so assume file
-                            pass
-
-                    if match is None:
-                        match = {self._transform_path(path_match_value): 'file'}
-
-                    matches.update(match)
+                        # no match against provided value, so assume file
+                        pass
+
+                if match is None:
+                    match = {self._transform_path(path_match_value): 'file'}
+
+                matches.update(match)
 
             return matches
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from argparse import ArgumentParser, _SubParsersAction
+from collections.abc import Iterator, MutableMapping
+from typing import Any, Callable
+
+__all__ = [
+    'LazyParserMap',
+    'LazySubParsersAction',
+]
+
+
+class LazyParserMap(MutableMapping[str, ArgumentParser]):
+    """Map of sub-parser names to parsers, where a parser can be registered with a factory that is not called until
+    the parser is accessed, e.g. when the sub-command is selected on the command line.
+
+    Name lookups (`in`, iteration, `len`) does not create any parsers, so usage, errors and bash completion of
+    sub-command names can be handled without importing the modules behind the factories.
+    """
+
+    sub_parser: _SubParsersAction
+    parsers: dict[str, ArgumentParser]
+    factories: dict[str, Callable[[_SubParsersAction], None]]
+    names: list[str]
+    hooks: list[Callable[[ArgumentParser], None]]
+
+    def __init__(self, sub_parser: _SubParsersAction) -> None:
+        self.sub_parser = sub_parser
+        self.parsers = {}
+        self.factories = {}
+        self.names = []
+        self.hooks = []
+
+    def register(self, name: str, factory: Callable[[_SubParsersAction], None]) -> None:
+        if name in self:
+            message = f'conflicting subparser: {name}'
+            raise ValueError(message)
+
+        self.names.append(name)
+        self.factories[name] = factory
+
+    def add_hook(self, hook: Callable[[ArgumentParser], None]) -> None:
+        """Call `hook` for all parsers that already has been created, and for each parser created later on."""
+        self.hooks.append(hook)
+
+        for parser in self.parsers.values():
+            hook(parser)
+
+    def __getitem__(self, name: str) -> ArgumentParser:
+        factory = self.factories.pop(name, None)
+
+        if factory is not None:
+            factory(self.sub_parser)
+
+            parser = self.parsers[name]
+            for hook in self.hooks:
+                hook(parser)
+
+        return self.parsers[name]
+
+    def __setitem__(self, name: str, parser: ArgumentParser) -> None:
+        if name not in self.names:
+            self.names.append(name)
+
+        self.parsers[name] = parser
+
+    def __delitem__(self, name: str) -> None:
+        self.names.remove(name)
+        self.factories.pop(name, None)
+        self.parsers.pop(name, None)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.parsers or name in self.factories
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class LazySubParsersAction(_SubParsersAction):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._name_parser_map = self.choices = LazyParserMap(self)  # type: ignore[assignment]
+
+    def add_lazy_parser(self, name: str, factory: Callable[[_SubParsersAction], None]) -> None:
+        """Register `factory` that will create sub-parser `name` when it is first needed."""
+        self._name_parser_map.register(name, factory)  # type: ignore[attr-defined]
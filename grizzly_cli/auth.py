@@ -7,15 +7,12 @@ from typing import TYPE_CHECKING, Optional
 
 from pyotp import TOTP
 
-from grizzly_cli import register_parser
-
 if TYPE_CHECKING:  # pragma: no cover
     from argparse import Namespace as Arguments
 
     from grizzly_cli.argparse import ArgumentSubParser
 
 
-@register_parser()
 def create_parser(sub_parser: ArgumentSubParser) -> None:
     # grizzly-cli auth
     auth_parser = sub_parser.add_parser('auth', description=(
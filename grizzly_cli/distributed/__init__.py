@@ -12,9 +12,9 @@ from pathlib import Path
 from shutil import get_terminal_size
 from socket import gethostname
 from tempfile import NamedTemporaryFile
-from typing import IO, TYPE_CHECKING
+from typing import IO, TYPE_CHECKING, Union
 
-from grizzly_cli import EXECUTION_CONTEXT, MOUNT_CONTEXT, PROJECT_NAME, STATIC_CONTEXT, register_parser
+from grizzly_cli import EXECUTION_CONTEXT, MOUNT_CONTEXT, PROJECT_NAME, STATIC_CONTEXT
 from grizzly_cli.distributed.build import build as do_build
 from grizzly_cli.distributed.build import create_parser as build_create_parser
 from grizzly_cli.distributed.clean import clean as do_clean
@@ -31,16 +31,41 @@ if TYPE_CHECKING:  # pragma: no cover
     from grizzly_cli.argparse import ArgumentSubParser
 
 
-@register_parser(order=3)
+def worker_count(value: str) -> Union[int, str]:
+    if value == 'auto':
+        return value
+
+    workers = int(value)
+
+    if workers < 1:
+        message = 'must be at least 1, or auto'
+        raise argparse.ArgumentTypeError(message)
+
+    return workers
+
+
 def create_parser(sub_parser: ArgumentSubParser) -> None:
     dist_parser = sub_parser.add_parser('dist', description='commands for running grizzly i distributed mode.')
 
     dist_parser.add_argument(
         '--workers',
-        type=int,
+        type=worker_count,
         required=False,
         default=1,
-        help='how many instances of the `workers` container that should be created',
+        help=(
+            'how many instances of the `workers` container that should be created. if `auto`, the recommended number of workers '
+            'based on `--users-per-worker` is used'
+        ),
+    )
+    dist_parser.add_argument(
+        '--users-per-worker',
+        type=int,
+        required=False,
+        default=None,
+        help=(
+            'how many users a worker can run. a worker runs in one process, so this is also the number of users per CPU. '
+            'used to recommend the number of workers, and warn when a worker will have more users'
+        ),
     )
     dist_parser.add_argument(
         '--container-system',
@@ -55,7 +80,7 @@ def create_parser(sub_parser: ArgumentSubParser) -> None:
         type=str,
         required=False,
         default=None,
-        help='unique identifier suffixed to compose project, should be used when the same user needs to run more than one instance of `grizzly-cli`',
+        help='unique identifier suffixed to compose project, must be used when the same user needs to run more than one instance of `grizzly-cli` at the same time',
     )
     dist_parser.add_argument(
         '--limit-nofile',
@@ -276,15 +301,28 @@ def should_build_image(args: Arguments, project_name: str, tag: str) -> int:
     return 0
 
 
+def is_project_running(args: Arguments, compose_project: str) -> bool:
+    try:
+        output = subprocess.check_output(
+            [args.container_system, 'ps', '--quiet', '--filter', f'label=com.docker.compose.project={compose_project}'],
+            encoding='utf-8',
+        )
+    except:
+        return False
+
+    return output.strip() != ''
+
+
 def distributed_run(args: Arguments, environ: dict, run_arguments: dict[str, list[str]]) -> int:
     suffix = '' if args.id is None else f'-{args.id}'
     tag = getuser()
 
     project_name = PROJECT_NAME if args.project_name is None else args.project_name
+    compose_project = f'{project_name}{suffix}-{tag}'
 
     # default locust project
     compose_args: list[str] = [
-        '-p', f'{project_name}{suffix}-{tag}',
+        '-p', compose_project,
         '-f', f'{STATIC_CONTEXT}/compose.yaml',
     ]
 
@@ -299,6 +337,11 @@ def distributed_run(args: Arguments, environ: dict, run_arguments: dict[str, lis
         if rc != 0 or getattr(args, 'validate_config', False):
             return rc
 
+        # runs in the same compose project would stop, and remove, each others containers and network
+        if is_project_running(args, compose_project):
+            print(f'!! {compose_project} is already running, use --id to run more than one instance at the same time')
+            return 1
+
         rc = should_build_image(args, project_name, tag)
         if rc != 0:
             return rc
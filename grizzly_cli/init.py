@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING
 
 from packaging.version import Version
 
-from grizzly_cli import EXECUTION_CONTEXT, register_parser
+from grizzly_cli import EXECUTION_CONTEXT
 from grizzly_cli.utils import ask_yes_no
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -22,7 +22,6 @@ tee = '├── '
 last = '└── '
 
 
-@register_parser(order=1)
 def create_parser(sub_parser: ArgumentSubParser) -> None:
     # grizzly-cli init
     init_parser = sub_parser.add_parser('init', description=(
@@ -11,7 +11,6 @@ from typing import TYPE_CHECKING, Any
 import yaml
 from azure.core.exceptions import ClientAuthenticationError, ResourceNotFoundError, ServiceRequestError
 
-from grizzly_cli import register_parser
 from grizzly_cli.argparse.bashcompletion import BashCompletionTypes
 from grizzly_cli.utils import IndentDumper, chunker, flatten, logger, merge_dicts, unflatten
 from grizzly_cli.utils.configuration import get_context_root, get_keyvault_client, load_configuration_file, load_configuration_keyvault
@@ -41,7 +40,6 @@ class KeyvaultSecretHolder:
     value: str
 
 
-@register_parser()
 def create_parser(sub_parser: ArgumentSubParser) -> None:
     # grizzly-cli keyvault
     keyvault_parser = sub_parser.add_parser('keyvault', description=(
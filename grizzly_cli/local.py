@@ -1,7 +1,6 @@
 import os
 from argparse import Namespace as Arguments
 
-from grizzly_cli import register_parser
 from grizzly_cli.argparse import ArgumentSubParser
 from grizzly_cli.run import create_parser as run_create_parser
 from grizzly_cli.run import run
@@ -10,7 +9,6 @@ from grizzly_cli.utils import (
 )
 
 
-@register_parser(order=2)
 def create_parser(sub_parser: ArgumentSubParser) -> None:
     local_parser = sub_parser.add_parser('local', description='commands for running grizzly in local mode.')
 
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import TYPE_CHECKING, Optional
+
+from grizzly_cli.argparse.bashcompletion import BashCompletionTypes
+from grizzly_cli.utils import logger
+
+if TYPE_CHECKING:  # pragma: no cover
+    from argparse import Namespace as Arguments
+
+    from grizzly_cli.argparse import ArgumentSubParser
+
+
+FEATURE_FILE_TYPE = BashCompletionTypes.File('*.feature', missing_ok=True)
+
+
+def create_parser(sub_parser: ArgumentSubParser) -> None:
+    # grizzly-cli render
+    render_parser = sub_parser.add_parser('render', description=(
+        'render feature files, with all included scenarios, without running them. can be used to make sure that all feature files in a project '
+        'can be rendered, e.g. in a pipeline.'
+    ))
+
+    render_parser.add_argument(
+        '-o', '--out',
+        type=str,
+        default=None,
+        required=False,
+        help=(
+            'directory where rendered feature files are written, as `<name>.lock.feature` with the same directory structure as the feature '
+            'files (relative to the current directory). if not specified, the rendered feature files are not saved'
+        ),
+    )
+
+    render_parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=None,
+        required=False,
+        help='number of feature files rendered in parallel, default is the number of CPUs',
+    )
+
+    render_parser.add_argument(
+        'paths',
+        nargs='*',
+        type=FEATURE_FILE_TYPE,
+        default=['.'],
+        help='feature files, or directories with feature files, to render. default is the current directory',
+    )
+
+    if render_parser.prog != 'grizzly-cli render':  # pragma: no cover
+        render_parser.prog = 'grizzly-cli render'
+
+
+def find_feature_files(paths: list[str]) -> list[Path]:
+    """Find feature files in `paths`, directories are searched recursively.
+
+    Same rules as bash completion of feature files, hidden files and directories are skipped. Rendered feature files
+    (`*.lock.feature`) are not feature files.
+    """
+    # not imported on module level, only needed when rendering and not when the parser is created
+    from grizzly_cli.argparse.bashcompletion.index import FileIndex  # noqa: PLC0415
+
+    feature_files: dict[Path, None] = {}
+
+    for path in paths:
+        root = Path(path)
+
+        if root.is_file():
+            if FEATURE_FILE_TYPE.name_pattern.match(root.name) is None:
+                message = f'{path} does not match {", ".join(FEATURE_FILE_TYPE.patterns)}'
+                raise ValueError(message)
+
+            feature_files[root] = None
+            continue
+
+        if not root.is_dir():
+            message = f'{path} does not exist'
+            raise ValueError(message)
+
+        index = FileIndex(root.resolve())
+        index.refresh()
+
+        for file in index.files(name_filter=FEATURE_FILE_TYPE.name_pattern.match):
+            if not file.endswith('.lock.feature'):
+                feature_files[root / file] = None
+
+    return list(feature_files.keys())
+
+
+def get_output_file(feature_file: Path, output_directory: Path) -> Path:
+    """Get path of rendered `feature_file` in `output_directory`, with the same path as `feature_file` relative to the current directory."""
+    path = feature_file.resolve()
+
+    try:
+        relative_path = path.relative_to(Path.cwd())
+    except ValueError:
+        # outside of the current directory, keep the whole path
+        relative_path = Path(*path.parts[1:])
+
+    return output_directory / relative_path.parent / f'{path.stem}.lock{path.suffix}'
+
+
+def _render_file(job: tuple[Path, Path]) -> tuple[float, Optional[str]]:
+    # not imported on module level, since it pulls in jinja (and azure and cryptography, when rendering)
+    from grizzly_cli.utils.render import render_feature_file  # noqa: PLC0415
+
+    feature_file, output_file = job
+    start = perf_counter()
+    error: Optional[str] = None
+
+    try:
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+        # feature files are already rendered in parallel, do not start a process pool per file as well
+        render_feature_file(feature_file, output_file, max_workers=1)
+    except Exception as e:
+        error = repr(e)
+        output_file.unlink(missing_ok=True)
+
+    return (perf_counter() - start) * 1000, error
+
+
+def render(args: Arguments) -> int:
+    start = perf_counter()
+    feature_files = find_feature_files(args.paths)
+
+    if len(feature_files) < 1:
+        logger.warning('no feature files found in %s', ', '.join(args.paths))
+        return 0
+
+    with TemporaryDirectory() as temporary_directory:
+        # rendered feature files are only validated if there is no output directory
+        output_directory = Path(args.out) if args.out is not None else Path(temporary_directory)
+        jobs = [(feature_file, get_output_file(feature_file, output_directory)) for feature_file in feature_files]
+        max_workers = min(args.jobs or os.cpu_count() or 1, len(jobs))
+
+        if max_workers > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_render_file, jobs))
+        else:
+            results = [_render_file(job) for job in jobs]
+
+    failed = 0
+
+    for (feature_file, _), (render_time, error) in zip(jobs, results):
+        if error is None:
+            logger.info(f'{render_time:10.2f} ms {feature_file.as_posix()}')
+        else:
+            failed += 1
+            logger.error(f'{render_time:10.2f} ms {feature_file.as_posix()}: {error}')
+
+    logger.info(f'rendered {len(jobs)} feature files in {(perf_counter() - start) * 1000:.2f} ms, {failed} failed')
+
+    return 1 if failed > 0 else 0
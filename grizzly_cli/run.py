@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import shutil
 import sys
 from contextlib import suppress
 from datetime import datetime
@@ -13,22 +14,23 @@ from typing import (
     cast,
 )
 
-from jinja2 import Environment
-
 import grizzly_cli
 from grizzly_cli.argparse.bashcompletion import BashCompletionTypes
 from grizzly_cli.utils import (
     ask_yes_no,
     distribution_of_users_per_scenario,
-    find_metadata_notices,
-    find_variable_names_in_questions,
     get_input,
+    get_lock_file,
+    get_run_id,
     logger,
-    parse_feature_file,
+    plan_users_per_scenario,
     requirements,
     rm_rf,
+    write_distribution_plan,
 )
-from grizzly_cli.utils.configuration import ScenarioTag, get_context_root, load_configuration
+from grizzly_cli.utils.feature import FeatureAnalysis
+from grizzly_cli.utils.render import RENDER_BUFFER_SIZE, RenderCache, render_feature_file
+from grizzly_cli.utils.watch import watch_feature_file
 
 if TYPE_CHECKING:
     from argparse import Namespace as Arguments
@@ -116,6 +118,51 @@ def create_parser(sub_parser: ArgumentSubParser, parent: str) -> None:
             'will be dumped to stdout, the argument is treated as a filename'
         ),
     )
+    run_parser.add_argument(
+        '--render-stats',
+        action='store_true',
+        default=False,
+        required=False,
+        help='print which scenarios are included in the feature file, and how long time it took to render each of them',
+    )
+    run_parser.add_argument(
+        '--watch',
+        action='store_true',
+        default=False,
+        required=False,
+        help=(
+            'can only be used in combination with `--dump` or `--dry-run`. keep running, and render the feature file again when it, an included '
+            'feature file or the environment file changes. the difference in the rendered feature file is printed'
+        ),
+    )
+    run_parser.add_argument(
+        '--plan-users',
+        type=str,
+        default=None,
+        required=False,
+        help=(
+            'specified in the format `<start>:<stop>[:<step>]`, e.g. `10:5000:10`. instead of running, print which scenarios would not get any users, '
+            'or more users than iterations, for each number of users in the range. the feature file must have a `Given "N" users` background step'
+        ),
+    )
+    run_parser.add_argument(
+        '--plan-only',
+        action='store_true',
+        default=False,
+        required=False,
+        help=(
+            'instead of running, write the distribution of users and iterations per scenario to stdout, in the format of `--plan-format`. nothing is '
+            'asked for, values for all scenario variables must be specified with `-T/--testdata-variable`. the exit code is 1 if any scenario cannot run'
+        ),
+    )
+    run_parser.add_argument(
+        '--plan-format',
+        type=str,
+        choices=['json', 'csv'],
+        default=None,
+        required=False,
+        help='format of the distribution written by `--plan-only`, default is json',
+    )
     run_parser.add_argument(
         '--dry-run',
         action='store_true',
@@ -135,7 +182,7 @@ def create_parser(sub_parser: ArgumentSubParser, parent: str) -> None:
 
 
 def should_prompt_questions(args: Arguments, environ: dict) -> None:
-    variables = find_variable_names_in_questions(args.file)
+    variables = FeatureAnalysis.analyse(args.file).questions
     questions = len(variables)
     manual_input = False
 
@@ -145,6 +192,12 @@ def should_prompt_questions(args: Arguments, environ: dict) -> None:
         for variable in variables:
             name = f'TESTDATA_VARIABLE_{variable}'
             value = os.environ.get(name, '')
+
+            # nothing is asked for when only the plan is written, it is used in pipelines
+            if len(value) < 1 and getattr(args, 'plan_only', False):
+                message = f'missing value for variable "{variable}", specify it with -T/--testdata-variable'
+                raise ValueError(message)
+
             while len(value) < 1:
                 value = get_input(f'initial value for "{variable}": ')
                 manual_input = True
@@ -162,7 +215,7 @@ def should_prompt_questions(args: Arguments, environ: dict) -> None:
 
 
 def should_prompt_notices(args: Arguments) -> None:
-    notices = find_metadata_notices(args.file)
+    notices = FeatureAnalysis.analyse(args.file).notices
 
     if len(notices) > 0:
         output_func = cast('Callable[[str], None]', logger.info) if args.yes else ask_yes_no
@@ -173,6 +226,8 @@ def should_prompt_notices(args: Arguments) -> None:
 
 def update_grizzly_environment(args: Arguments, environ: dict) -> None:
     if args.environment_file is not None:
+        from grizzly_cli.utils.configuration import load_configuration  # noqa: PLC0415
+
         environment_lock_file = load_configuration(Path(args.environment_file).resolve())
         environ.update({'GRIZZLY_CONFIGURATION_FILE': environment_lock_file.as_posix()})
 
@@ -195,12 +250,12 @@ def build_run_arguments(args: Arguments) -> dict[str, list[str]]:
 
     if args.csv_prefix is not None:
         if args.csv_prefix is True:
-            parse_feature_file(args.file)
-            if grizzly_cli.FEATURE_DESCRIPTION is None:
+            description = FeatureAnalysis.analyse(args.file).description
+            if description is None:
                 message = 'feature file does not seem to have a `Feature:` description to use as --csv-prefix'
                 raise ValueError(message)
 
-            csv_prefix = grizzly_cli.FEATURE_DESCRIPTION.replace(' ', '_')
+            csv_prefix = description.replace(' ', '_')
             timestamp = datetime.now().astimezone().strftime('%Y%m%dT%H%M%S')
             args.csv_prefix = f'{csv_prefix}_{timestamp}'
 
@@ -215,79 +270,118 @@ def build_run_arguments(args: Arguments) -> dict[str, list[str]]:
     return run_arguments
 
 
+def dump_feature_file(feature_lock_file: Path, *, dump: str | bool) -> None:
+    """Write rendered feature file to file `dump`, or stdout if it is not a filename."""
+    output: TextIO = Path(dump).open('w+') if isinstance(dump, str) else sys.stdout  # noqa: SIM115
+
+    try:
+        with feature_lock_file.open() as fd:
+            shutil.copyfileobj(fd, output, RENDER_BUFFER_SIZE)
+        output.write('\n')
+    finally:
+        # do not close stdout...
+        if output is not sys.stdout:
+            output.close()
+
+
 @requirements(grizzly_cli.EXECUTION_CONTEXT)
 def run(args: Arguments, run_func: Callable[[Arguments, dict, dict[str, list[str]]], int]) -> int:
+    # not imported on module level, since it pulls in azure and cryptography, which is not needed
+    # when the run parser is created for bash completion
+    from grizzly_cli.utils.configuration import get_context_root, get_files_directory  # noqa: PLC0415
+
     # always set hostname of host where grizzly-cli was executed, could be useful
     environ: dict = {
         'GRIZZLY_CLI_HOST': get_hostname(),
         'GRIZZLY_EXECUTION_CONTEXT': grizzly_cli.EXECUTION_CONTEXT,
         'GRIZZLY_MOUNT_CONTEXT': grizzly_cli.MOUNT_CONTEXT,
+        'GRIZZLY_RUN_ID': get_run_id(),
     }
 
-    environment = Environment(autoescape=False, extensions=[ScenarioTag])
     feature_file = Path(args.file)
-    environment_lock_file: str | None = None
 
-    # during execution, create a temporary .lock.feature file that will be removed when done
-    original_feature_lines = feature_file.read_text().splitlines()
-    feature_lock_file = feature_file.parent / f'{feature_file.stem}.lock{feature_file.suffix}'
+    # during execution, create a temporary .<run id>.lock.feature file that will be removed when done, so runs of the
+    # same feature file at the same time does not overwrite, or remove, each others files. if the run is killed, lock
+    # files and files/<run id> are left behind, see `get_lock_file`
+    feature_lock_file = get_lock_file(feature_file)
+
+    watch = getattr(args, 'watch', False)
+    environment_file = Path(args.environment_file) if args.environment_file is not None else None
 
     try:
-        buffer: list[str] = []
-        remove_endif = False
+        # while watching, included scenarios are kept in memory instead
+        dependencies: set[Path] = set()
+        render_result = render_feature_file(feature_file, feature_lock_file, RenderCache(max_size=0) if watch else None, dependencies=dependencies)
 
-        # remove if-statements containing variables (`{$ .. $}`)
-        for line in original_feature_lines:
-            stripped_line = line.strip()
+        if getattr(args, 'render_stats', False):
+            logger.info(render_result.format_stats())
 
-            if stripped_line[:2] == '{%' and stripped_line[-2:] == '%}':
-                if '{$' in stripped_line and '$}' in stripped_line and 'if' in stripped_line:
-                    remove_endif = True
-                    continue
+        if args.dump:
+            logger.info(f'render cache {"hit" if render_result.cache_hit else "miss"} for {feature_file}')
 
-                if remove_endif and 'endif' in stripped_line:
-                    remove_endif = False
-                    continue
+            dump_feature_file(feature_lock_file, dump=args.dump)
 
-            buffer.append(line)
+            if watch:
+                # changes are printed as a diff, do not print the whole feature file again to stdout
+                watch_feature_file(
+                    feature_file,
+                    feature_lock_file,
+                    render_result,
+                    dependencies,
+                    refresh=lambda: dump_feature_file(feature_lock_file, dump=args.dump) if isinstance(args.dump, str) else None,
+                    environment_file=environment_file,
+                )
 
-        original_feature_content = '\n'.join(buffer)
+            return 0
 
-        template = environment.from_string(original_feature_content)
-        environment.extend(feature_file=feature_file, ignore_errors=False)
-        feature_content = template.render()
-        feature_lock_file.write_text(feature_content)
+        args.file = feature_lock_file.as_posix()
 
-        if args.dump:
-            output: TextIO = Path(args.dump).open('w+') if isinstance(args.dump, str) else sys.stdout  # noqa: SIM115
+        # analysed once, by everything that needs to know about the feature
+        FeatureAnalysis.analyse(feature_lock_file)
 
-            try:
-                print(feature_content, file=output)
-            finally:
-                # do not close stdout...
-                if output is not sys.stdout:
-                    output.close()
+        def execute() -> int:
+            update_grizzly_environment(args, environ)
 
-            return 0
+            if not getattr(args, 'validate_config', False):
+                distribution_of_users_per_scenario(args, environ)
 
-        args.file = feature_lock_file.as_posix()
+            run_arguments = build_run_arguments(args)
+
+            return run_func(args, environ, run_arguments)
+
+        def refresh() -> None:
+            # new questions could have been added, notices has already been confirmed
+            should_prompt_questions(args, environ)
+            execute()
 
         should_prompt_questions(args, environ)
+
+        if getattr(args, 'plan_users', None) is not None:
+            plan_users_per_scenario(args, environ)
+            return 0
+
+        if getattr(args, 'plan_only', False):
+            return write_distribution_plan(args, environ)
+
         should_prompt_notices(args)
-        update_grizzly_environment(args, environ)
 
-        if not getattr(args, 'validate_config', False):
-            distribution_of_users_per_scenario(args, environ)
+        rc = execute()
 
-        run_arguments = build_run_arguments(args)
+        if watch:
+            watch_feature_file(feature_file, feature_lock_file, render_result, dependencies, refresh=refresh, environment_file=environment_file)
 
-        return run_func(args, environ, run_arguments)
+        return rc
     finally:
+        environment_lock_file = environ.get('GRIZZLY_CONFIGURATION_FILE')
         if environment_lock_file is not None:
             Path(environment_lock_file).unlink(missing_ok=True)
 
         feature_lock_file.unlink(missing_ok=True)
 
         with suppress(FileNotFoundError, ValueError):
-            tmp_files = get_context_root() / 'files'
-            rm_rf(tmp_files)
+            context_root = get_context_root()
+            rm_rf(get_files_directory(context_root), missing_ok=True)
+
+            # only remove files/ if no other run is using it
+            with suppress(OSError):
+                (context_root / 'files').rmdir()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import csv
 import logging
 import logging.config
 import os
@@ -13,31 +14,33 @@ from contextlib import suppress
 from copy import deepcopy
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from functools import wraps
+from functools import lru_cache, wraps
 from hashlib import sha1
+from io import StringIO
+from json import dumps as jsondumps
 from json import loads as jsonloads
-from math import ceil
+from math import ceil, floor
 from os import environ
 from pathlib import Path
 from shutil import rmtree, which
 from tempfile import mkdtemp
 from typing import TYPE_CHECKING, Any, Callable, ClassVar, Optional, Union, cast
+from uuid import uuid4
 
-import requests
 import tomli
-from behave.parser import parse_file as feature_file_parser
 from jinja2 import Template
 from packaging import version as versioning
 from progress.spinner import Spinner
 from yaml import Dumper
 
 import grizzly_cli
+from grizzly_cli.utils.feature import FeatureAnalysis
 
 if TYPE_CHECKING:  # pragma: no cover
     from argparse import Namespace as Arguments
     from types import FrameType, TracebackType
 
-    from behave.model import Scenario
+    from grizzly_cli.utils.feature import ScenarioRecord
 
 logger = logging.getLogger('grizzly-cli')
 
@@ -186,6 +189,39 @@ def rm_rf(path: Union[str, Path], *, missing_ok: bool = False) -> None:
             raise
 
 
+def get_run_id() -> str:
+    """Get identifier of the current run.
+
+    The identifier is part of the name of files created during the run, so that runs of the same project at the same time,
+    on the same host, does not overwrite or remove each others files.
+
+    `GRIZZLY_RUN_ID` takes precedence, otherwise a new identifier is created and set in `GRIZZLY_RUN_ID`, so it is the
+    same for the rest of the run.
+    """
+    run_id = os.environ.get('GRIZZLY_RUN_ID', None)
+
+    if not run_id:
+        run_id = os.environ['GRIZZLY_RUN_ID'] = uuid4().hex[:8]
+    elif re.match(r'^[\w-]+$', run_id) is None:
+        message = f'GRIZZLY_RUN_ID "{run_id}" can only contain letters, digits, "_" and "-"'
+        raise ValueError(message)
+
+    return run_id
+
+
+def get_lock_file(file: Path) -> Path:
+    """Get path of rendered, or loaded, version of `file`, e.g. `test.feature` -> `test.<run id>.lock.feature`.
+
+    The run id is only part of the name during a run, see `get_run_id`. Lock files are removed when the run is done, but
+    a run that is killed leaves them behind, with a new name each run. Since another run could be using them, they are
+    not removed by later runs; `*.lock.feature` and `*.lock.yaml` files that are not in use can safely be removed.
+    """
+    run_id = os.environ.get('GRIZZLY_RUN_ID', None)
+    infix = f'.{run_id}' if run_id else ''
+
+    return file.with_name(f'{file.stem}{infix}.lock{file.suffix}')
+
+
 def get_dependency_versions(*, local_install: Union[bool, str]) -> tuple[tuple[Optional[str], Optional[list[str]]], Optional[str]]:  # noqa: C901, PLR0912, PLR0915
     grizzly_requirement: Optional[str] = None
     grizzly_requirement_egg: str
@@ -415,6 +451,8 @@ def get_dependency_versions(*, local_install: Union[bool, str]) -> tuple[tuple[O
         finally:
             rm_rf(tmp_workspace)
     else:
+        import requests  # noqa: PLC0415
+
         response = requests.get(
             'https://pypi.org/pypi/grizzly-loadtester/json',
             timeout=10,
@@ -606,44 +644,6 @@ def ask_yes_no(question: str) -> None:
             raise KeyboardInterrupt
 
 
-def parse_feature_file(file: str) -> None:
-    if len(grizzly_cli.SCENARIOS) > 0:
-        return
-
-    feature = feature_file_parser(file)
-
-    grizzly_cli.FEATURE_DESCRIPTION = feature.name
-
-    for scenario in feature.scenarios:
-        grizzly_cli.SCENARIOS.append(scenario)
-
-
-def find_metadata_notices(file: str) -> list[str]:
-    with Path(file).open('r') as fd:
-        return [line.strip().replace('# grizzly-cli:notice ', '') for line in fd if line.strip().startswith('# grizzly-cli:notice ')]
-
-
-def find_variable_names_in_questions(file: str) -> list[str]:
-    unique_variables: set[str] = set()
-
-    parse_feature_file(file)
-
-    for scenario in grizzly_cli.SCENARIOS:
-        for step in scenario.steps + scenario.background_steps or []:
-            if not step.name.startswith('ask for value of variable'):
-                continue
-
-            match = re.match(r'ask for value of variable "([^"]*)"', step.name)
-
-            if not match:
-                message = f'could not find variable name in "{step.name}"'
-                raise ValueError(message)
-
-            unique_variables.add(match.group(1))
-
-    return sorted(unique_variables)
-
-
 def _guess_datatype(value: str) -> Union[str, int, float, bool]:
     check_value = value.replace('.', '', 1)
 
@@ -665,6 +665,23 @@ def _guess_datatype(value: str) -> Union[str, int, float, bool]:
     return value
 
 
+@lru_cache(maxsize=1024)
+def _compile_expression(source: str) -> Template:
+    return Template(source)
+
+
+def _render_expression(source: str, context: Mapping[str, Any]) -> str:
+    """Render jinja expression `source` (e.g. a value in a step) with `context`.
+
+    Most values are literals, or the same few expressions in many scenarios, so jinja is only used when `source` looks like
+    a template, and then each expression is only compiled once.
+    """
+    if '{' not in source:
+        return source
+
+    return _compile_expression(source).render(context)
+
+
 class ScenarioProperties:
     name: str
     index: int
@@ -718,11 +735,71 @@ class ScenarioProperties:
         return self.user is not None and self._iterations is not None and self._user_count is not None
 
 
-def distribution_of_users_per_scenario(args: Arguments, environ: dict) -> None:  # noqa: C901, PLR0912, PLR0915
+def apportion_users(user_count: int, weights: list[float]) -> list[int]:
+    """Apportion `user_count` users based on `weights`, with the largest remainder method.
+
+    Each weight with a value above zero gets at least one user, weights that are zero does not get any users. The number
+    of apportioned users is always `user_count`, as long as there is at least one weight above zero.
+    """
+    return _apportion_users(user_count, weights, sorted((index for index, weight in enumerate(weights) if weight > 0), key=lambda index: weights[index]))
+
+
+def _apportion_users(user_count: int, weights: list[float], positive: list[int]) -> list[int]:
+    """Apportion `user_count` users, `positive` is the index of the weights above zero, ordered by weight."""
+    users = [0] * len(weights)
+
+    if len(positive) < 1:
+        return users
+
+    if user_count < len(positive):
+        message = f'{user_count} users cannot be apportioned to {len(positive)} weights, at least one user per weight is needed'
+        raise ValueError(message)
+
+    # weights with a quota of less than one user gets one user, which lowers the quota of the remaining weights. the quota
+    # is proportional to the weight, so it is always the lowest remaining weight that can have a quota of less than one user
+    remaining_users = user_count
+    remaining_weight = sum(weights[index] for index in positive)
+    minimum_count = 0
+
+    for index in positive:
+        if remaining_users * weights[index] >= remaining_weight:
+            break
+
+        users[index] = 1
+        remaining_users -= 1
+        remaining_weight -= weights[index]
+        minimum_count += 1
+
+    remainders: list[tuple[float, int]] = []
+
+    for index in positive[minimum_count:]:
+        quota = remaining_users * weights[index] / remaining_weight
+        users[index] = floor(quota)
+        remainders.append((quota - users[index], index))
+
+    # users left after rounding down goes to the largest remainders, ties goes to the first weight
+    left_over = remaining_users - sum(users[index] for index in positive[minimum_count:])
+
+    for _, index in sorted(remainders, key=lambda remainder: (-remainder[0], remainder[1]))[:left_over]:
+        users[index] += 1
+
+    return users
+
+
+def calculate_distribution_of_users_per_scenario(  # noqa: C901, PLR0912, PLR0915
+    file: Union[str, Path],
+    variables: dict[str, Any],
+    user_count: Optional[int] = None,
+) -> tuple[dict[str, ScenarioProperties], bool]:
+    """Calculate number of users and iterations per scenario in (rendered) feature `file`, without any output.
+
+    If `user_count` is specified, it is used instead of the number of users in the background of the feature.
+
+    Returns the distribution per scenario name, and if the users are distributed based on weight.
+    """
     distribution: dict[str, ScenarioProperties] = {}
-    variables = {key.replace('TESTDATA_VARIABLE_', ''): _guess_datatype(value) for key, value in environ.items() if key.startswith('TESTDATA_VARIABLE_')}
 
-    def _pre_populate_scenario(scenario: Scenario, index: int) -> None:
+    def _pre_populate_scenario(scenario: ScenarioRecord, index: int) -> None:
         if scenario.name not in distribution:
             distribution[scenario.name] = ScenarioProperties(
                 name=scenario.name,
@@ -735,54 +812,57 @@ def distribution_of_users_per_scenario(args: Arguments, environ: dict) -> None:
     scenario_user_count_total: Optional[int] = None
     use_weights = True
 
-    for index, scenario in enumerate(grizzly_cli.SCENARIOS):
-        scenario_variables: dict = {}
-        if len(scenario.steps) < 1:
-            message = f'scenario "{scenario.name}" does not have any steps'
+    scenarios = FeatureAnalysis.analyse(file).scenarios
+
+    for index, feature_scenario in enumerate(scenarios):
+        # variables set by steps in the scenario are added to a copy of the testdata variables as they are set
+        scenario_variables: dict[str, Any] = dict(variables)
+        if feature_scenario.step_count < 1:
+            message = f'scenario "{feature_scenario.name}" does not have any steps'
             raise ValueError(message)
 
-        _pre_populate_scenario(scenario, index=index + 1)
+        _pre_populate_scenario(feature_scenario, index=index + 1)
 
         if index == 0:  # background_steps is only processed for first scenario in grizzly
-            for step in scenario.background_steps or []:
+            for step in feature_scenario.background_steps or []:
                 if (step.name.endswith(' users') or step.name.endswith(' user')) and step.keyword == 'Given':
                     match = re.match(r'"([^"]*)" user(s)?', step.name)
                     if match:
-                        scenario_user_count_total = int(round(float(Template(match.group(1)).render(**variables)), 0))
+                        scenario_user_count_total = user_count if user_count is not None else int(round(float(_render_expression(match.group(1), variables)), 0))
 
         if scenario_user_count_total is None:
             use_weights = False
             scenario_user_count_total = 0
 
-        for step in (scenario.background_steps or []) + scenario.steps:
+        for step in (feature_scenario.background_steps or []) + feature_scenario.steps:
             if step.name.startswith('value for variable'):  # pragma: no cover
                 match = re.match(r'value for variable "([^"]*)" is "([^"]*)"', step.name)
                 if match:
                     try:
                         variable_name = match.group(1)
-                        variable_value = Template(match.group(2)).render(**variables, **scenario_variables)
+                        variable_value = _render_expression(match.group(2), scenario_variables)
                         scenario_variables.update({variable_name: variable_value})
                     except:  # noqa: S112
                         continue
             elif step.name.startswith('a user of type'):
                 match = re.match(r'a user of type "([^"]*)" (with weight "([^"]*)")?.*', step.name)
                 if match:
-                    distribution[scenario.name].user = match.group(1)
-                    distribution[scenario.name].weight = int(float(Template(match.group(3) or '1.0').render(**variables, **scenario_variables)))
+                    distribution[feature_scenario.name].user = match.group(1)
+                    distribution[feature_scenario.name].weight = int(float(_render_expression(match.group(3) or '1.0', scenario_variables)))
             elif step.name.startswith('repeat for'):
                 match = re.match(r'repeat for "([^"]*)" iteration[s]?', step.name)
                 if match:
-                    distribution[scenario.name].iterations = int(round(float(Template(match.group(1)).render(**variables, **scenario_variables)), 0))
+                    distribution[feature_scenario.name].iterations = int(round(float(_render_expression(match.group(1), scenario_variables)), 0))
             elif any(pattern in step.name for pattern in ['users of type', 'user of type']):
                 match = re.match(r'"([^"]*)" user[s]? of type "([^"]*)".*', step.name)
                 if match:
-                    scenario_user_count = int(round(float(Template(match.group(1)).render(**variables, **scenario_variables)), 0))
+                    scenario_user_count = int(round(float(_render_expression(match.group(1), scenario_variables)), 0))
                     scenario_user_count_total += scenario_user_count
 
-                    distribution[scenario.name].user_count = scenario_user_count
-                    distribution[scenario.name].user = match.group(2)
+                    distribution[feature_scenario.name].user_count = scenario_user_count
+                    distribution[feature_scenario.name].user = match.group(2)
 
-            if distribution[scenario.name].is_fulfilled():
+            if distribution[feature_scenario.name].is_fulfilled():
                 break
 
     scenario_count = len(distribution.keys())
@@ -791,34 +871,324 @@ def distribution_of_users_per_scenario(args: Arguments, environ: dict) -> None:
         message = f'grizzly needs at least {scenario_count} users to run this feature'
         raise ValueError(message)
 
-    total_weight = 0
-    total_iterations = 0
     for scenario in distribution.values():
         if scenario.user is None:
             message = f'{scenario.name} does not have a user type'
             raise ValueError(message)
 
-        total_weight += scenario.weight
-        total_iterations += scenario.iterations
-
     if use_weights:
-        for scenario in distribution.values():
-            scenario.user_count = ceil(scenario_user_count_total * (scenario.weight / total_weight))
+        user_counts = apportion_users(scenario_user_count_total, [scenario.weight for scenario in distribution.values()])
 
-        # smooth assigned user count based on weight, so that the sum of scenario.user_count == total_user_count
-        total_user_count = sum([scenario.user_count for scenario in distribution.values()])
-        user_overflow = total_user_count - scenario_user_count_total
+        for scenario, scenario_user_count in zip(distribution.values(), user_counts):
+            scenario.user_count = scenario_user_count
 
-        while user_overflow > 0:
-            for scenario in dict(sorted(distribution.items(), key=lambda d: d[1].user_count, reverse=True)).values():
-                if scenario.user_count <= 1:
-                    continue
+    return distribution, use_weights
 
-                scenario.user_count -= 1
-                user_overflow -= 1
 
-                if user_overflow < 1:
-                    break
+def calculate_users_per_worker(user_counts: list[int], workers: int) -> list[list[int]]:
+    """Calculate how many users of each scenario each worker gets, returned per worker and scenario.
+
+    Scenarios have a fixed number of users, which locust dispatches one user at a time from each scenario in turn, until
+    all users of a scenario has been dispatched. Each user is assigned to the next worker, round-robin.
+    """
+    users = [[0] * len(user_counts) for _ in range(workers)]
+    remaining = list(user_counts)
+    active = [index for index, user_count in enumerate(user_counts) if user_count > 0]
+    worker = 0
+
+    while len(active) > 0:
+        for index in active:
+            users[worker][index] += 1
+            remaining[index] -= 1
+            worker = (worker + 1) % workers
+
+        active = [index for index in active if remaining[index] > 0]
+
+    return users
+
+
+def get_recommended_worker_count(user_count: int, users_per_worker: int) -> int:
+    """Get the lowest number of workers, where no worker gets more than `users_per_worker` users."""
+    return max(1, ceil(user_count / users_per_worker))
+
+
+@dataclass
+class UserPlan:
+    user_count: int
+    user_counts: list[int]
+    zero_users: list[int]
+    over_iterations: list[int]
+    error: Optional[str] = None
+    worker_count: Optional[int] = None
+
+
+def calculate_user_plan(
+    file: Union[str, Path],
+    variables: dict[str, Any],
+    user_counts: range,
+    users_per_worker: Optional[int] = None,
+) -> tuple[list[ScenarioProperties], list[UserPlan]]:
+    """Calculate number of users per scenario in (rendered) feature `file`, for each number of users in `user_counts`.
+
+    Weights and iterations only depend on the variables, so the feature is only parsed once. `zero_users` and
+    `over_iterations` are the index (in the returned scenarios) of scenarios that would not get any users, and scenarios
+    that would get more users than iterations. If `users_per_worker` is specified, the recommended number of workers is
+    calculated as well.
+    """
+    # at least one user per scenario, so weights and iterations can be parsed when the whole range is too small, each
+    # number of users that is too small gets an error instead
+    user_count = max(*user_counts, len(FeatureAnalysis.analyse(file).scenarios))
+    distribution, use_weights = calculate_distribution_of_users_per_scenario(file, variables, user_count=user_count)
+
+    if not use_weights:
+        message = 'users can only be planned when they are distributed based on weight, the feature does not have a "Given "N" users" background step'
+        raise ValueError(message)
+
+    scenarios = list(distribution.values())
+    weights = [scenario.weight for scenario in scenarios]
+    positive = sorted((index for index, weight in enumerate(weights) if weight > 0), key=lambda index: weights[index])
+    plans: list[UserPlan] = []
+
+    for user_count in user_counts:
+        if user_count < len(scenarios):
+            plans.append(UserPlan(user_count, [], [], [], error=f'grizzly needs at least {len(scenarios)} users to run this feature'))
+            continue
+
+        scenario_user_counts = _apportion_users(user_count, weights, positive)
+
+        plans.append(UserPlan(
+            user_count,
+            scenario_user_counts,
+            zero_users=[index for index, count in enumerate(scenario_user_counts) if count < 1],
+            over_iterations=[index for index, count in enumerate(scenario_user_counts) if count > scenarios[index].iterations],
+            worker_count=get_recommended_worker_count(user_count, users_per_worker) if users_per_worker is not None else None,
+        ))
+
+    return scenarios, plans
+
+
+def parse_user_range(value: str) -> range:
+    """Parse `START:STOP[:STEP]` as a range of number of users, where `STOP` is included."""
+    try:
+        start, stop, step, *rest = [int(part) for part in value.split(':')] + ([1] if value.count(':') == 1 else [])
+    except ValueError:
+        start, stop, step, rest = 0, 0, 0, []
+
+    if len(rest) > 0 or start < 1 or stop < start or step < 1:
+        message = f'"{value}" is not a valid range of users, it needs to be in the format START:STOP[:STEP], e.g. 10:5000:10'
+        raise ValueError(message)
+
+    return range(start, stop + 1, step)
+
+
+def _format_indexes(indexes: list[int], scenarios: list[ScenarioProperties]) -> str:
+    """Format scenario indexes as identifiers, consecutive scenarios are written as a range, e.g. `001-004, 007`."""
+    ranges: list[list[int]] = []
+
+    for index in indexes:
+        if len(ranges) > 0 and ranges[-1][-1] == index - 1:
+            ranges[-1][-1] = index
+        else:
+            ranges.append([index, index])
+
+    return ', '.join(
+        scenarios[first].identifier if first == last else f'{scenarios[first].identifier}-{scenarios[last].identifier}'
+        for first, last in ranges
+    )
+
+
+def plan_users_per_scenario(args: Arguments, environ: dict) -> None:
+    """Log the scenarios that would not get any users, or more users than iterations, for each number of users in `args.plan_users`."""
+    variables = {key.replace('TESTDATA_VARIABLE_', ''): _guess_datatype(value) for key, value in environ.items() if key.startswith('TESTDATA_VARIABLE_')}
+    scenarios, plans = calculate_user_plan(args.file, variables, args.plan_users, getattr(args, 'users_per_worker', None))
+
+    max_length_description = max([len('description')] + [len(scenario.name) for scenario in scenarios])
+    max_length_iterations = max([len('#iter')] + [len(str(scenario.iterations)) for scenario in scenarios])
+    table_line = f'------|-------|-{"-" * max_length_iterations}|-{"-" * max_length_description}-|'
+
+    lines = [
+        f'\nfeature file {args.file} has {len(scenarios)} scenarios\n',
+        f'ident   weight  {"#iter":>{max_length_iterations}}  {"description":<{max_length_description}}',
+        table_line,
+        *[
+            f'{scenario.identifier:5}   {scenario.weight:>6}  {scenario.iterations:>{max_length_iterations}}  {scenario.name:<{max_length_description}}'
+            for scenario in scenarios
+        ],
+        table_line,
+    ]
+
+    rows = [
+        (
+            str(plan.user_count),
+            str(plan.worker_count or ''),
+            plan.error or _format_indexes(plan.zero_users, scenarios),
+            '' if plan.error else _format_indexes(plan.over_iterations, scenarios),
+        )
+        for plan in plans
+    ]
+
+    max_length_users = max(len('#users'), *[len(row[0]) for row in rows])
+    max_length_zero_users = max(len('zero users'), *[len(row[2]) for row in rows])
+    max_length_over_iterations = max(len('users > iterations'), *[len(row[3]) for row in rows])
+
+    table_line = f'{"-" * max_length_users}|-{"-" * max_length_zero_users}|-{"-" * max_length_over_iterations}-|'
+    header = f'{"#users":>{max_length_users}}  {"zero users":<{max_length_zero_users}}  users > iterations'
+    table_rows = [
+        f'{user_count:>{max_length_users}}  {zero_users:<{max_length_zero_users}}  {over_iterations}'
+        for user_count, _, zero_users, over_iterations in rows
+    ]
+
+    # recommended number of workers is only included if there is a number of users per worker
+    if getattr(args, 'users_per_worker', None) is not None:
+        max_length_workers = max(len('#workers'), *[len(row[1]) for row in rows])
+        table_line = f'{"-" * max_length_users}|-{"-" * max_length_workers}{table_line[max_length_users:]}'
+        header = f'{"#users":>{max_length_users}}  {"#workers":>{max_length_workers}}{header[max_length_users:]}'
+        table_rows = [f'{table_row[:max_length_users]}  {row[1]:>{max_length_workers}}{table_row[max_length_users:]}' for table_row, row in zip(table_rows, rows)]
+
+    lines += [
+        '',
+        header,
+        table_line,
+        *[table_row.rstrip() for table_row in table_rows],
+        table_line,
+        '',
+    ]
+
+    for line in lines:
+        logger.info(line)
+
+
+def get_distribution_errors(distribution: dict[str, ScenarioProperties]) -> dict[str, list[str]]:
+    """Get errors per scenario name, for scenarios in `distribution` that cannot run."""
+    errors: dict[str, list[str]] = {}
+
+    for scenario in distribution.values():
+        if scenario.user_count < 1:
+            errors.setdefault(scenario.name, []).append('no users assigned')
+
+        if scenario.iterations < 1:
+            errors.setdefault(scenario.name, []).append('no iterations')
+
+    return errors
+
+
+def get_distribution_plan(file: Union[str, Path], variables: dict[str, Any]) -> dict[str, Any]:
+    """Get the distribution of users and iterations per scenario in (rendered) feature `file`, as a plan that can be serialized.
+
+    Weight is `None` for all scenarios if the users are not distributed based on weight.
+    """
+    distribution, use_weights = calculate_distribution_of_users_per_scenario(file, variables)
+    errors = get_distribution_errors(distribution)
+
+    for scenario in distribution.values():
+        if scenario.name not in errors and scenario.iterations < scenario.user_count:
+            errors[scenario.name] = ['more users than iterations']
+
+    return {
+        'users': sum(scenario.user_count for scenario in distribution.values()),
+        'total_iterations': sum(scenario.iterations for scenario in distribution.values()),
+        'variables': variables,
+        'scenarios': [
+            {
+                'identifier': scenario.identifier,
+                'name': scenario.name,
+                'user': scenario.user,
+                'weight': scenario.weight if use_weights else None,
+                'users': scenario.user_count,
+                'iterations': scenario.iterations,
+                'errors': errors.get(scenario.name, []),
+            }
+            for scenario in distribution.values()
+        ],
+    }
+
+
+def create_csv_plan(plan: dict[str, Any]) -> str:
+    """CSV with one row per scenario. Total iterations and the variables, as `TESTDATA_VARIABLE_<name>`, are repeated on each row."""
+    variables: dict[str, Any] = plan['variables']
+    output = StringIO()
+    writer = csv.writer(output, lineterminator='\n')
+
+    writer.writerow(
+        ['identifier', 'name', 'user', 'weight', 'users', 'iterations', 'errors', 'total_iterations', *[f'TESTDATA_VARIABLE_{name}' for name in variables]],
+    )
+
+    for scenario in plan['scenarios']:
+        writer.writerow([
+            scenario['identifier'],
+            scenario['name'],
+            scenario['user'],
+            scenario['weight'],
+            scenario['users'],
+            scenario['iterations'],
+            ', '.join(scenario['errors']),
+            plan['total_iterations'],
+            *variables.values(),
+        ])
+
+    return output.getvalue()
+
+
+def write_distribution_plan(args: Arguments, environ: dict) -> int:
+    """Write the distribution plan of feature `args.file` to stdout, in `args.plan_format`. Returns 1 if any scenario cannot run."""
+    variables = {key.replace('TESTDATA_VARIABLE_', ''): _guess_datatype(value) for key, value in environ.items() if key.startswith('TESTDATA_VARIABLE_')}
+    plan = get_distribution_plan(args.file, variables)
+
+    if getattr(args, 'plan_format', None) == 'csv':
+        sys.stdout.write(create_csv_plan(plan))
+    else:
+        sys.stdout.write(f'{jsondumps(plan, indent=2)}\n')
+
+    return 1 if any(len(scenario['errors']) > 0 for scenario in plan['scenarios']) else 0
+
+
+def _distribution_of_users_per_worker(args: Arguments, scenarios: list[ScenarioProperties]) -> None:
+    user_count = sum(scenario.user_count for scenario in scenarios)
+    users_per_worker: Optional[int] = getattr(args, 'users_per_worker', None)
+    recommended_workers = get_recommended_worker_count(user_count, users_per_worker) if users_per_worker is not None else None
+
+    if args.workers == 'auto':
+        args.workers = recommended_workers
+
+    users = calculate_users_per_worker([scenario.user_count for scenario in scenarios], args.workers)
+    rows = [
+        (str(worker), str(sum(worker_users)), _format_indexes([index for index, count in enumerate(worker_users) if count > 0], scenarios))
+        for worker, worker_users in enumerate(users, start=1)
+    ]
+
+    max_length_worker = max(len('worker'), *[len(row[0]) for row in rows])
+    max_length_users = max(len('#user'), *[len(row[1]) for row in rows])
+    max_length_scenarios = max(len('scenarios'), *[len(row[2]) for row in rows])
+    table_line = f'{"-" * max_length_worker}|-{"-" * max_length_users}|-{"-" * max_length_scenarios}-|'
+
+    lines = [
+        f'each worker will run accordingly, with {args.workers} workers:\n',
+        f'{"worker":>{max_length_worker}}  {"#user":>{max_length_users}}  scenarios',
+        table_line,
+        *[f'{worker:>{max_length_worker}}  {worker_user_count:>{max_length_users}}  {worker_scenarios}'.rstrip() for worker, worker_user_count, worker_scenarios in rows],
+        table_line,
+        '',
+    ]
+
+    if recommended_workers is not None:
+        lines.append(f'recommended number of workers is {recommended_workers}, with at most {users_per_worker} users per worker\n')
+
+    for line in lines:
+        logger.info(line)
+
+    if users_per_worker is None:
+        return
+
+    for worker, worker_users in enumerate(users, start=1):
+        if sum(worker_users) > users_per_worker:
+            logger.warning('worker %d will have %d users, which is more than %d users per worker', worker, sum(worker_users), users_per_worker)
+
+
+def distribution_of_users_per_scenario(args: Arguments, environ: dict) -> None:  # noqa: C901, PLR0912, PLR0915
+    variables = {key.replace('TESTDATA_VARIABLE_', ''): _guess_datatype(value) for key, value in environ.items() if key.startswith('TESTDATA_VARIABLE_')}
+    distribution, use_weights = calculate_distribution_of_users_per_scenario(args.file, variables)
+    scenario_count = len(FeatureAnalysis.analyse(args.file).scenarios)
+    total_iterations = sum(scenario.iterations for scenario in distribution.values())
 
     def print_table_lines(max_length_iterations: int, max_length_users: int, max_length_description: int, max_length_errors: int) -> None:
         line = ['-' * 5, '-|-', '-' * 6, '|-', '-' * max_length_iterations, '|-', '-' * max_length_users, '|-', '-' * max_length_description, '-|']
@@ -836,28 +1206,15 @@ def distribution_of_users_per_scenario(args: Arguments, environ: dict) -> None:
     max_length_users = len('#user')
     max_length_errors = len('errors')
 
-    message = f'\nfeature file {args.file} will execute in total {total_iterations} iterations divided on {len(grizzly_cli.SCENARIOS)} scenarios'
+    message = f'\nfeature file {args.file} will execute in total {total_iterations} iterations divided on {scenario_count} scenarios'
     if hasattr(args, 'environment_file') and args.environment_file is not None:
         message = f'{message} with environment file {environ["GRIZZLY_CONFIGURATION_FILE"]}'
 
     logger.info('%s\n', message)
 
-    errors: dict[str, list[str]] = {}
+    errors = get_distribution_errors(distribution)
 
     for scenario in distribution.values():
-        # check for errors
-        if scenario.user_count < 1:
-            if scenario.name not in errors:
-                errors.update({scenario.name: []})
-
-            errors[scenario.name].append('no users assigned')
-
-        if scenario.iterations < 1:
-            if scenario.name not in errors:
-                errors.update({scenario.name: []})
-
-            errors[scenario.name].append('no iterations')
-
         # calculate max length out of all rows
         max_length_description = max(len(scenario.name), max_length_description)
         max_length_iterations = max(len(str(scenario.iterations)), max_length_iterations)
@@ -936,6 +1293,9 @@ def distribution_of_users_per_scenario(args: Arguments, environ: dict) -> None:
 
     logger.info('')
 
+    if getattr(args, 'workers', None) is not None:
+        _distribution_of_users_per_worker(args, list(distribution.values()))
+
     for scenario in distribution.values():
         if scenario.iterations < scenario.user_count:
             message = f'{scenario.name} will have {scenario.user_count} users to run {scenario.iterations} iterations, increase iterations or lower user count'
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import re
+import sys
 from base64 import b64decode
 from contextlib import suppress
+from functools import cache
+from os import environ
 from pathlib import Path
 from shutil import which
 from textwrap import dedent
-from typing import TYPE_CHECKING, ClassVar, Optional, cast
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, Optional, cast
 
 import yaml
 from azure.identity import AzureCliCredential, ChainedTokenCredential, ManagedIdentityCredential
@@ -15,18 +19,28 @@ from behave.parser import parse_feature
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives._serialization import PBES, KeySerializationEncryption, KeySerializationEncryptionBuilder, PrivateFormat
 from cryptography.hazmat.primitives.serialization import pkcs12
-from jinja2 import Environment
+from jinja2 import BaseLoader, Environment, FileSystemBytecodeCache, Template, TemplateNotFound
+from jinja2 import __version__ as jinja_version
 from jinja2.lexer import Token, TokenStream
 from jinja2_simple_tags import StandaloneTag
 
-from grizzly_cli.utils import IndentDumper, logger, merge_dicts, run_command, unflatten
+from grizzly_cli import get_cache_dir
+from grizzly_cli.utils import IndentDumper, get_lock_file, logger, merge_dicts, run_command, unflatten
+from grizzly_cli.utils.render import get_digest, get_include_key
 
 if TYPE_CHECKING:  # pragma: no cover
-    from collections.abc import Iterable
+    from collections.abc import Iterable, Iterator
 
-    from behave.model import Scenario
+    from behave.model import Feature, Scenario
     from cryptography.hazmat.primitives.asymmetric.types import PrivateKeyTypes
     from cryptography.x509 import Certificate
+    from jinja2.bccache import Bucket
+    from jinja2.ext import Extension
+
+    from grizzly_cli.utils.render import IncludeKey
+
+# `{$ name $}` in an included scenario, replaced with the value of argument `name` in the scenario tag
+SCENARIO_VARIABLE_PATTERN = re.compile(r'\{\$ ([^$]+) \$\}')
 
 
 def get_context_root() -> Path:
@@ -49,9 +63,80 @@ def get_context_root() -> Path:
     return context_root.parent
 
 
+def is_commented(source: str, position: int) -> bool:
+    """Check if `position` in `source` is on a line that has been commented out (`# ...`)."""
+    line_begin_pos = source.rfind('\n', 0, position) + 1
+
+    return source[line_begin_pos:position].lstrip().startswith('#')
+
+
+def coalesce_data(tokens: Iterable[Token]) -> Iterator[Token]:
+    """Join consecutive data tokens into one token, so the parser creates one node for each run of plain text."""
+    buffer: list[str] = []
+    lineno = 0
+
+    for token in tokens:
+        if token.type == 'data':
+            if len(buffer) < 1:
+                lineno = token.lineno
+            buffer.append(token.value)
+            continue
+
+        if len(buffer) > 0:
+            yield Token(lineno, 'data', ''.join(buffer))
+            buffer.clear()
+
+        yield token
+
+    if len(buffer) > 0:
+        yield Token(lineno, 'data', ''.join(buffer))
+
+
+class IncludeIndex:
+    """Feature file that scenarios are included from, with the lines of each scenario.
+
+    `scenarios` maps scenario name to the `(start, end)` slice of `lines` with the scenario steps, `end` is `None`
+    for the last scenario. If there are multiple scenarios with the same name, the first one is used.
+    """
+
+    file: Path
+    digest: str
+    lines: list[str]
+    feature: Feature
+    scenarios: dict[str, tuple[int, int | None]]
+
+    def __init__(self, file: Path) -> None:
+        self.file = file
+
+        content = file.read_text()
+        self.digest = get_digest(content)
+
+        content_skel = re.sub(r'\{%.*%\}', '', content)
+        content_skel = re.sub(r'\{\$.*\$\}', '', content_skel)
+
+        self.lines = content.splitlines()
+
+        assert len(self.lines) == len(content_skel.splitlines()), 'oops, there is not a 1:1 match between lines!'
+
+        self.feature = parse_feature(content_skel, filename=file.as_posix())
+        scenarios = cast('list[Scenario]', self.feature.scenarios)
+
+        self.scenarios = {}
+
+        for index, scenario in enumerate(scenarios):
+            if scenario.name in self.scenarios:
+                continue
+
+            # take everything up until where the next scenario starts, or until the end if it is the last scenario
+            end = scenarios[index + 1].line - 1 if index + 1 < len(scenarios) else None
+            self.scenarios[scenario.name] = (scenario.line, end)
+
+
 class ScenarioTag(StandaloneTag):
     tags: ClassVar[set[str]] = {'scenario'}
 
+    _includes: ClassVar[dict[Path, tuple[int, int, IncludeIndex]]] = {}
+
     def preprocess(
         self, source: str, name: str | None, filename: str | None = None,
     ) -> str:
@@ -60,35 +145,37 @@ class ScenarioTag(StandaloneTag):
         return cast('str', super().preprocess(source, name, filename))
 
     @classmethod
-    def get_scenario_text(cls, name: str, file: Path) -> str:
-        content = file.read_text()
+    def get_include_index(cls, file: Path) -> IncludeIndex:
+        """Get parsed included feature file, which is re-used as long as the file has not been modified.
 
-        content_skel = re.sub(r'\{%.*%\}', '', content)
-        content_skel = re.sub(r'\{\$.*\$\}', '', content_skel)
+        Many scenario tags can include scenarios from the same feature file, it only has to be read and parsed once.
+        """
+        path = file.resolve()
+        stat = path.stat()
+        cached = cls._includes.get(path)
 
-        assert len(content.splitlines()) == len(content_skel.splitlines()), 'oops, there is not a 1:1 match between lines!'
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
 
-        feature = parse_feature(content_skel, filename=file.as_posix())
-        scenarios = cast('list[Scenario]', feature.scenarios)
-        lines = content.splitlines()
+        index = IncludeIndex(path)
+        cls._includes[path] = (stat.st_mtime_ns, stat.st_size, index)
 
-        scenario_index: int
-        for index, scenario in enumerate(scenarios):
-            if scenario.name == name:
-                scenario_index = index
-                break
-
-        # check if there are scenarios after our scenario in the source
-        next_scenario: Scenario | None = None
-        with suppress(IndexError):
-            next_scenario = scenarios[scenario_index + 1]
-
-        if next_scenario is None:  # last scenario, take everything until the end
-            scenario_lines = lines[scenario.line:]
-        else:  # take everything up until where the next scenario starts
-            scenario_lines = lines[scenario.line:next_scenario.line - 1]
-            if scenario_lines[-1] == '':  # if last line is an empty line, lets remove it
-                scenario_lines.pop()
+        return index
+
+    @classmethod
+    def get_scenario_text(cls, name: str, file: Path) -> str:
+        index = cls.get_include_index(file)
+
+        try:
+            start, end = index.scenarios[name]
+        except KeyError:
+            message = f'scenario "{name}" not found in {file}'
+            raise ValueError(message) from None
+
+        scenario_lines = index.lines[start:end]
+
+        if end is not None and scenario_lines[-1] == '':  # if last line is an empty line, lets remove it
+            scenario_lines.pop()
 
         # remove any scenario text/comments
         if scenario_lines[0].strip() == '"""':
@@ -104,37 +191,33 @@ class ScenarioTag(StandaloneTag):
 
         return '\n'.join(scenario_lines)
 
-    def render(self, scenario: str, feature: str, **variables: str) -> str:
-        feature_file = Path(feature)
+    @classmethod
+    def render_scenario_text(cls, scenario: str, feature: str, feature_file: Path, variables: dict[str, Any], *, ignore_errors: bool) -> str:
+        """Get text of included scenario, with variables (`{$ .. $}`) rendered, but not nested statements (`{% .. %}`)."""
+        scenario_content = cls.get_scenario_text(scenario, feature_file)
 
-        # check if relative to parent feature file
-        if not feature_file.exists():
-            feature_file = (self.environment.feature_file.parent / feature).resolve()
+        # ordered sets, so errors are reported in the order the variables are declared or used
+        used: dict[str, None] = {}
+        errors_undeclared: dict[str, None] = {}
 
-        scenario_content = self.get_scenario_text(scenario, feature_file)
+        def _substitute(match: re.Match[str]) -> str:
+            name = match.group(1)
 
-        ignore_errors = getattr(self.environment, 'ignore_errors', False)
+            if name not in variables:
+                errors_undeclared[name] = None
+                return match.group(0)
 
-        # <!-- sub-render included scenario
-        errors_unused: set[str] = set()
-        errors_undeclared: set[str] = set()
+            used[name] = None
 
-        # tag has specified variables, so lets "render"
-        for name, value in variables.items():
-            variable_template = f'{{$ {name} $}}'
-            if variable_template not in scenario_content:
-                errors_unused.add(name)
-                continue
+            return str(variables[name])
 
-            scenario_content = scenario_content.replace(variable_template, str(value))
+        # tag has specified variables, so lets "render", all variables in one pass over the content. values are not
+        # scanned for variables
+        if '{$' in scenario_content:
+            scenario_content = SCENARIO_VARIABLE_PATTERN.sub(_substitute, scenario_content)
 
-        # look for sub-variables that has not been rendered
         if not ignore_errors:
-            if '{$' in scenario_content and '$}' in scenario_content:
-                matches = re.finditer(r'\{\$ ([^$]+) \$\}', scenario_content, re.MULTILINE)
-
-                for match in matches:
-                    errors_undeclared.add(match.group(1))
+            errors_unused = [name for name in variables if name not in used]
 
             if len(errors_undeclared) + len(errors_unused) > 0:
                 scenario_identifier = f'{feature}#{scenario}'
@@ -152,49 +235,89 @@ class ScenarioTag(StandaloneTag):
                 message = '\n'.join(buffer_error)
                 raise ValueError(message)
 
-        # check if we have nested statements (`{% .. %}`), and render again if that is the case
-        if '{%' in scenario_content and '%}' in scenario_content:
-            environment = self.environment.overlay()
-            environment.feature_file = feature_file
-            template = environment.from_string(scenario_content)
-            scenario_content = template.render()
-        # // -->
+        return scenario_content
+
+    def render(self, scenario: str, feature: str, **variables: str) -> str:
+        feature_file = Path(feature)
+
+        # check if relative to parent feature file
+        if not feature_file.exists():
+            feature_file = (self.environment.feature_file.parent / feature).resolve()
+
+        key = get_include_key(feature_file, scenario, variables)
+
+        # leaf includes can already have been rendered, see `IncludeGraph`
+        prerendered: dict[IncludeKey, str | Exception] | None = getattr(self.environment, 'prerendered', None)
+        if prerendered is not None and key in prerendered:
+            result = prerendered[key]
+            if isinstance(result, Exception):
+                raise result
+
+            scenario_content = result
+        else:
+            start = perf_counter()
+
+            # <!-- sub-render included scenario
+            scenario_content = self.render_scenario_text(scenario, feature, feature_file, variables, ignore_errors=getattr(self.environment, 'ignore_errors', False))
+
+            # check if we have nested statements (`{% .. %}`), and render again if that is the case
+            if '{%' in scenario_content and '%}' in scenario_content:
+                environment = self.environment.overlay()
+                environment.feature_file = feature_file
+                if isinstance(environment.loader, TemplateLoader):
+                    template = get_template(environment, f'{feature_file.as_posix()}#{scenario}@{get_digest(repr(key[2]))[:8]}', scenario_content)
+                else:
+                    template = environment.from_string(scenario_content)
+                scenario_content = template.render()
+            # // -->
+
+            render_times: dict[IncludeKey, float] | None = getattr(self.environment, 'render_times', None)
+            if render_times is not None:
+                render_times[key] = (perf_counter() - start) * 1000
+
+            # same include again, or the same graph rendered again after another file changed (`--watch`)
+            if prerendered is not None:
+                prerendered[key] = scenario_content
+
+        # keep track of included files, a rendered feature is only valid as long as they have not changed
+        includes: dict[str, str] | None = getattr(self.environment, 'includes', None)
+        if includes is not None:
+            index = self.get_include_index(feature_file)
+            includes[index.file.as_posix()] = index.digest
 
         return scenario_content
 
-    def filter_stream(self, stream: TokenStream) -> TokenStream | Iterable[Token]:  # type: ignore[return]  # noqa: PLR0912
-        """Everything outside of `{% scenario ... %}` (and `{% if ... %}...{% endif %}`) should be treated as "data", e.g. plain text.
+    def filter_stream(self, stream: TokenStream) -> TokenStream | Iterable[Token]:
+        """Everything outside of `{% scenario ... %}` (and `{% if ... %}...{% endif %}`) should be treated as "data", e.g. plain text."""
+        return coalesce_data(self._filter_tokens(stream))
 
-        Overloaded from `StandaloneTag`, must match method signature, which is not `Generator`, even though we yield
-        the result instead of returning.
-        """
+    def _filter_tokens(self, stream: TokenStream) -> Iterator[Token]:  # noqa: PLR0912
         in_scenario = False
         in_block_comment = False
         in_condition = False
         in_variable = False
 
-        variable_begin_pos = -1
-        variable_end_pos = 0
-        block_begin_pos = -1
-        block_end_pos = 0
-        source_lines = self._source.splitlines()
+        source = self._source
+        # tokens are found in the source in order, everything before `position` has already been handled
+        position = 0
+        variable_begin_pos = 0
+        block_begin_pos = 0
 
         for token in stream:
             if token.type == 'block_begin':
                 if stream.current.value in self.tags:  # {% scenario ... %}
                     in_scenario = True
-                    current_line = source_lines[token.lineno - 1].lstrip()
-                    in_block_comment = current_line.startswith('#')
-                    block_begin_pos = self._source.index(token.value, block_begin_pos + 1)
+                    block_begin_pos = source.index(token.value, position)
+                    position = block_begin_pos + len(token.value)
+                    in_block_comment = is_commented(source, block_begin_pos)
                 elif stream.current.value in ['if', 'endif']:  # {% if <condition> %}, {% endif %}
                     in_condition = True
 
             if in_scenario:
                 if token.type == 'block_end' and in_block_comment:
                     in_block_comment = False
-                    block_end_pos = self._source.index(token.value, block_begin_pos)
-                    token_value = self._source[block_begin_pos:block_end_pos + len(token.value)]
-                    filtered_token = Token(token.lineno, 'data', token_value)
+                    position = source.index(token.value, position) + len(token.value)
+                    filtered_token = Token(token.lineno, 'data', source[block_begin_pos:position])
                 elif in_block_comment:
                     continue
                 else:
@@ -203,15 +326,14 @@ class ScenarioTag(StandaloneTag):
                 filtered_token = token
             else:
                 if token.type == 'variable_begin':
-                    # Find variable start in the source
-                    variable_begin_pos = self._source.index(token.value, variable_begin_pos + 1)
+                    variable_begin_pos = source.index(token.value, position)
+                    position = variable_begin_pos + len(token.value)
                     in_variable = True
                     continue
                 elif token.type == 'variable_end':
-                    # Find variable end in the source
-                    variable_end_pos = self._source.index(token.value, variable_begin_pos)
-                    # Extract the variable definition substring and use as token value
-                    token_value = self._source[variable_begin_pos:variable_end_pos + len(token.value)]
+                    # the whole variable, as written in the source, is data
+                    position = source.index(token.value, position) + len(token.value)
+                    token_value = source[variable_begin_pos:position]
                     in_variable = False
                 elif in_variable:  # Variable templates is yielded when the whole block has been processed
                     continue
@@ -254,6 +376,10 @@ class MergeYamlTag(StandaloneTag):  # pragma: no cover
             if not merge_file.exists():
                 raise FileNotFoundError(merge_file)
 
+            merges: list[Path] | None = getattr(self.environment, 'merges', None)
+            if merges is not None:
+                merges.append(merge_file.resolve())
+
             merge_content = merge_file.read_text()
 
             if merge_content[0:3] != '---':
@@ -261,40 +387,44 @@ class MergeYamlTag(StandaloneTag):  # pragma: no cover
 
             buffer.append(merge_content)
 
-        if self._source[0:3] != '---':
+        # `preprocess` is not called when the template is loaded from the bytecode cache
+        source: str = self.environment.source
+        if source[0:3] != '---':
             buffer.append('---')
 
         return '\n'.join(buffer)
 
-    def filter_stream(self, stream: TokenStream) -> TokenStream | Iterable[Token]:  # type: ignore[return]
+    def filter_stream(self, stream: TokenStream) -> TokenStream | Iterable[Token]:
         """Everything outside of `{% merge ... %}` should be treated as "data", e.g. plain text."""
+        return coalesce_data(self._filter_tokens(stream))
+
+    def _filter_tokens(self, stream: TokenStream) -> Iterator[Token]:
         in_merge = False
         in_variable = False
         in_block_comment = False
 
-        variable_begin_pos = -1
-        variable_end_pos = 0
-        block_begin_pos = -1
-        block_end_pos = 0
-        source_lines = self._source.splitlines()
+        source = self._source
+        # tokens are found in the source in order, everything before `position` has already been handled
+        position = 0
+        variable_begin_pos = 0
+        block_begin_pos = 0
 
         for token in stream:
             if token.type == 'block_begin' and stream.current.value in self.tags:
                 in_merge = True
-                current_line = source_lines[token.lineno - 1].lstrip()
-                in_block_comment = current_line.startswith('#')
-                block_begin_pos = self._source.index(token.value, block_begin_pos + 1)
+                block_begin_pos = source.index(token.value, position)
+                position = block_begin_pos + len(token.value)
+                in_block_comment = is_commented(source, block_begin_pos)
 
             if not in_merge:
                 if token.type == 'variable_end':
-                    # Find variable end in the source
-                    variable_end_pos = self._source.index(token.value, variable_begin_pos)
-                    # Extract the variable definition substring and use as token value
-                    token_value = self._source[variable_begin_pos:variable_end_pos + len(token.value)]
+                    # the whole variable, as written in the source, is data
+                    position = source.index(token.value, position) + len(token.value)
+                    token_value = source[variable_begin_pos:position]
                     in_variable = False
                 elif token.type == 'variable_begin':
-                    # Find variable start in the source
-                    variable_begin_pos = self._source.index(token.value, variable_begin_pos + 1)
+                    variable_begin_pos = source.index(token.value, position)
+                    position = variable_begin_pos + len(token.value)
                     in_variable = True
                 else:
                     token_value = token.value
@@ -307,9 +437,8 @@ class MergeYamlTag(StandaloneTag):  # pragma: no cover
                 filtered_token = Token(token.lineno, 'data', token_value)
             elif token.type == 'block_end' and in_block_comment:
                 in_block_comment = False
-                block_end_pos = self._source.index(token.value, block_begin_pos)
-                token_value = self._source[block_begin_pos:block_end_pos + len(token.value)]
-                filtered_token = Token(token.lineno, 'data', token_value)
+                position = source.index(token.value, position) + len(token.value)
+                filtered_token = Token(token.lineno, 'data', source[block_begin_pos:position])
             elif in_block_comment:
                 continue
             else:
@@ -321,6 +450,81 @@ class MergeYamlTag(StandaloneTag):  # pragma: no cover
                 in_merge = False
 
 
+class TemplateLoader(BaseLoader):
+    """Templates that are not read by jinja, e.g. feature files that has been filtered before they are rendered.
+
+    Jinja only uses a bytecode cache for templates from a loader, see `get_template`.
+    """
+
+    sources: dict[str, str]
+
+    def __init__(self) -> None:
+        self.sources = {}
+
+    def get_source(self, environment: Environment, template: str) -> tuple[str, Optional[str], Callable[[], bool]]:  # noqa: ARG002
+        source = self.sources.get(template)
+
+        if source is None:
+            raise TemplateNotFound(template)
+
+        return source, None, lambda: self.sources.get(template) == source
+
+
+@cache
+def get_module_digest(module: str) -> str:
+    return get_digest(Path(cast('str', sys.modules[module].__file__)).read_text())
+
+
+class TemplateBytecodeCache(FileSystemBytecodeCache):
+    """Compiled templates, kept in the user cache directory between runs.
+
+    The compiled code depends on how the extensions filters the token stream, not only on the template source, so the
+    cache key includes the extensions, the content of the modules where they are implemented and the jinja version.
+    Jinja checks the checksum of the source, a template that has changed is compiled again.
+    """
+
+    prefix: str
+
+    def __init__(self, directory: Path, extensions: Iterable[type[Extension]]) -> None:
+        super().__init__(directory.as_posix(), '%s.cache')
+
+        fingerprint = [jinja_version]
+        for extension in extensions:
+            fingerprint.extend([f'{extension.__module__}.{extension.__qualname__}', get_module_digest(extension.__module__)])
+
+        self.prefix = get_digest('\n'.join(fingerprint))
+
+    def get_cache_key(self, name: str, filename: Optional[str] = None) -> str:
+        return super().get_cache_key(f'{self.prefix}:{name}', filename)
+
+    def load_bytecode(self, bucket: Bucket) -> None:
+        # a failing cache should not fail rendering, the template is compiled instead
+        with suppress(OSError):
+            super().load_bytecode(bucket)
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        with suppress(OSError):
+            Path(self.directory).mkdir(parents=True, exist_ok=True)
+            super().dump_bytecode(bucket)
+
+
+def create_environment(*extensions: type[Extension]) -> Environment:
+    """Environment for templates with `extensions`, where compiled templates are cached in the user cache directory."""
+    bytecode_cache = TemplateBytecodeCache(get_cache_dir() / 'templates', extensions)
+
+    return Environment(autoescape=False, extensions=extensions, loader=TemplateLoader(), bytecode_cache=bytecode_cache)
+
+
+def get_template(environment: Environment, name: str, source: str) -> Template:
+    """Get template `name`, with content `source`, which is only compiled if it has not been compiled before.
+
+    `environment` must have been created with `create_environment`.
+    """
+    cast('TemplateLoader', environment.loader).sources[name] = source
+
+    return environment.get_template(name)
+
+
 def get_keyvault_client(url: str) -> SecretClient:
     credential = ChainedTokenCredential(ManagedIdentityCredential(), AzureCliCredential())
 
@@ -355,6 +559,17 @@ def _create_safe_file_and_parent(file: Path) -> Path:
     return file
 
 
+def get_files_directory(root: Path) -> Path:
+    """Directory where files from keyvault are written, `files/` in context root `root`. During a run, each run has its own
+    directory in `files/`, see `get_run_id`. It is removed when the run is done, a run that is killed leaves it behind,
+    see `get_lock_file`.
+    """
+    files_directory = root / 'files'
+    run_id = environ.get('GRIZZLY_RUN_ID', None)
+
+    return files_directory / run_id if run_id else files_directory
+
+
 def _create_relative_path(root: Path, file: Path, *, no_suffix: bool = False) -> str:
     if no_suffix:
         file = file.with_suffix('')
@@ -371,7 +586,7 @@ def _write_mqm_cert(
     additional_certificates: list[Certificate] | None,
     encryption_algorithm: KeySerializationEncryption,
 ) -> str:
-    p12_file = _create_safe_file_and_parent(root / 'files' / f'{label}.p12')
+    p12_file = _create_safe_file_and_parent(get_files_directory(root) / f'{label}.p12')
     cms_file = p12_file.parent / f'{label}.kdb'
 
     if cms_file.exists():
@@ -437,7 +652,7 @@ def _write_mqm_cert(
 
 
 def _write_pem_private(root: Path, name: str, encryption_algorithm: KeySerializationEncryption, private_key: PrivateKeyTypes) -> str:
-    private_key_file = _create_safe_file_and_parent(root / 'files' / f'{name}.key')
+    private_key_file = _create_safe_file_and_parent(get_files_directory(root) / f'{name}.key')
 
     private_key_pem = private_key.private_bytes(
         encoding=serialization.Encoding.PEM,
@@ -451,7 +666,7 @@ def _write_pem_private(root: Path, name: str, encryption_algorithm: KeySerializa
 
 
 def _write_pem_public(root: Path, name: str, public_certificate: Certificate, additional_certificates: list[Certificate]) -> str:
-    certificate_file = _create_safe_file_and_parent(root / 'files' / f'{name}.crt')
+    certificate_file = _create_safe_file_and_parent(get_files_directory(root) / f'{name}.crt')
 
     certificate_data: list[bytes] = []
 
@@ -471,7 +686,7 @@ def _write_file(root: Path, content_type: str, encoded_content: str) -> str:
         message = 'could not find `file:` in content type'
         raise ValueError(message)
 
-    file = _create_safe_file_and_parent(root / 'files' / file_name)
+    file = _create_safe_file_and_parent(get_files_directory(root) / file_name)
 
     complete = True
 
@@ -565,23 +780,24 @@ def load_configuration(file: Path) -> Path:
 
         logger.info('loaded %d secrets from keyvault %s', number_of_keyvault_secrets, load_from_keyvault)
 
-    environment_lock_file = _create_safe_file_and_parent(file.parent / f'{file.stem}.lock{file.suffix}')
+    environment_lock_file = _create_safe_file_and_parent(get_lock_file(file))
 
     with environment_lock_file.open('w') as fd:
         yaml.dump(configuration, fd, Dumper=IndentDumper.use_indentation(file), default_flow_style=False, sort_keys=False, allow_unicode=True)
 
-    return file.with_name(f'{file.stem}.lock{file.suffix}')
+    return environment_lock_file
 
 
-def load_configuration_file(file: Path) -> dict:
-    """Load a grizzly environment file and flatten the structure."""
+def load_configuration_file(file: Path, merges: list[Path] | None = None) -> dict:
+    """Load a grizzly environment file and flatten the structure. Files merged with `{% merge ... %}` are added to `merges`."""
     configuration: dict = {}
 
-    environment = Environment(autoescape=False, extensions=[MergeYamlTag])
-    environment.extend(source_file=file)
+    source = file.read_text()
+    environment = create_environment(MergeYamlTag)
+    environment.extend(source_file=file, source=source, merges=merges)
     loader = yaml.SafeLoader
 
-    yaml_template = environment.from_string(file.read_text())
+    yaml_template = get_template(environment, file.resolve().as_posix(), source)
     yaml_content = yaml_template.render()
 
     yaml_configurations = list(yaml.load_all(yaml_content, Loader=loader))
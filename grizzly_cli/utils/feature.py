@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import re
+from contextlib import contextmanager
+from functools import cached_property
+from hashlib import sha1
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple, Optional, Union
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Generator, Iterable, Iterator
+
+    from behave.model import Scenario, Step
+
+__all__ = [
+    'FeatureAnalysis',
+    'FeatureScanner',
+    'ScenarioRecord',
+    'StepSummary',
+    'UnsupportedSyntaxError',
+]
+
+METADATA_ARGUMENTS_PREFIX = '# grizzly-cli '
+
+METADATA_NOTICE_PREFIX = '# grizzly-cli:notice '
+
+STEP_KEYWORDS = frozenset(['Given', 'When', 'Then', 'And', 'But', '*'])
+
+# steps with these prefixes (or where `is_inspected_step` is otherwise true) are the only steps grizzly-cli looks at
+INSPECTED_STEP_PREFIXES = ('a user of type', 'repeat for', 'value for variable', 'ask for value of variable')
+
+INSPECTED_STEP_SUFFIXES = (' user', ' users')
+
+# keywords that are valid gherkin, but handled by behave
+UNSUPPORTED_KEYWORDS = ('Scenario Outline:', 'Scenario Template:', 'Examples:', 'Scenarios:', 'Rule:')
+
+
+def is_inspected_step(name: str) -> bool:
+    return name.startswith(INSPECTED_STEP_PREFIXES) or name.endswith(INSPECTED_STEP_SUFFIXES) or 'user of type' in name or 'users of type' in name
+
+
+class StepSummary(NamedTuple):
+    keyword: str
+    name: str
+
+
+class ScenarioRecord:
+    """The parts of a scenario that grizzly-cli needs, only steps where `is_inspected_step` is true are kept.
+
+    `step_count` is the number of steps in the scenario, inspected or not, excluding background steps.
+    All scenarios in a feature shares the same `background_steps` list.
+    """
+
+    __slots__ = ('background_steps', 'name', 'step_count', 'steps')
+
+    name: str
+    step_count: int
+    background_steps: list[StepSummary]
+    steps: list[StepSummary]
+
+    def __init__(self, name: str, background_steps: list[StepSummary], steps: Optional[list[StepSummary]] = None, step_count: int = 0) -> None:
+        self.name = name
+        self.background_steps = background_steps
+        self.steps = steps if steps is not None else []
+        self.step_count = step_count
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(name={self.name!r}, step_count={self.step_count})'
+
+    @classmethod
+    def summarize(cls, steps: Iterable[Step]) -> list[StepSummary]:
+        return [StepSummary(step.keyword, step.name) for step in steps if is_inspected_step(step.name)]
+
+    @classmethod
+    def from_scenario(cls, scenario: Scenario) -> ScenarioRecord:
+        return cls(
+            scenario.name,
+            cls.summarize(scenario.background_steps or []),
+            cls.summarize(scenario.steps),
+            step_count=len(scenario.steps),
+        )
+
+
+class UnsupportedSyntaxError(Exception):
+    pass
+
+
+class FeatureScanner:
+    """Line based scanner for the subset of gherkin that grizzly features normally uses.
+
+    Scenarios are yielded one at a time, without building a model of the whole feature. Anything the scanner is not
+    sure how behave would interpret (scenario outlines, rules, other languages, text after steps, ...) raises
+    `UnsupportedSyntaxError`, and the feature should be parsed with behave instead.
+    """
+
+    description: Optional[str]
+
+    def __init__(self) -> None:
+        self.description = None
+
+    def scan(self, lines: Iterable[str]) -> Generator[ScenarioRecord, None, None]:  # noqa: C901, PLR0912, PLR0915
+        background_steps: Optional[list[StepSummary]] = None
+        scenario: Optional[ScenarioRecord] = None
+        has_steps = False
+        in_doc_string: Optional[str] = None
+
+        for line in lines:
+            stripped_line = line.strip()
+
+            if in_doc_string is not None:
+                if stripped_line.startswith(in_doc_string):
+                    in_doc_string = None
+                continue
+
+            if not stripped_line or stripped_line[0] in '|@':
+                continue
+
+            if stripped_line[0] == '#':
+                if stripped_line.startswith('# language:'):
+                    message = 'other languages than english'
+                    raise UnsupportedSyntaxError(message)
+                continue
+
+            if stripped_line.startswith(('"""', '```')):
+                in_doc_string = stripped_line[:3]
+                continue
+
+            keyword, _, text = stripped_line.partition(' ')
+
+            if keyword in STEP_KEYWORDS:
+                text = text.strip()
+                if self.description is None or not text:
+                    message = f'step "{stripped_line}" outside of feature'
+                    raise UnsupportedSyntaxError(message)
+
+                has_steps = True
+
+                if scenario is not None:
+                    scenario.step_count += 1
+                    if is_inspected_step(text):
+                        scenario.steps.append(StepSummary(keyword, text))
+                elif background_steps is not None:
+                    if is_inspected_step(text):
+                        background_steps.append(StepSummary(keyword, text))
+                else:
+                    message = f'step "{stripped_line}" outside of scenario'
+                    raise UnsupportedSyntaxError(message)
+            elif stripped_line.split(None, 1)[0] in STEP_KEYWORDS:
+                # e.g. a tab after the keyword, which behave does not parse as a step
+                message = f'step keyword not followed by a space in "{stripped_line}"'
+                raise UnsupportedSyntaxError(message)
+            elif stripped_line.startswith(UNSUPPORTED_KEYWORDS):
+                raise UnsupportedSyntaxError(stripped_line)
+            elif stripped_line.startswith(('Scenario:', 'Example:')):
+                if self.description is None:
+                    message = 'scenario before feature'
+                    raise UnsupportedSyntaxError(message)
+
+                if scenario is not None:
+                    yield scenario
+
+                if background_steps is None:
+                    background_steps = []
+
+                scenario = ScenarioRecord(stripped_line.split(':', 1)[1].strip(), background_steps)
+                has_steps = False
+            elif stripped_line.startswith('Background:'):
+                if self.description is None or scenario is not None or background_steps is not None:
+                    message = 'background must come after feature and before scenarios, and only once'
+                    raise UnsupportedSyntaxError(message)
+
+                background_steps = []
+                has_steps = False
+            elif stripped_line.startswith('Feature:'):
+                if self.description is not None:
+                    message = 'more than one feature'
+                    raise UnsupportedSyntaxError(message)
+
+                self.description = stripped_line.split(':', 1)[1].strip()
+            elif self.description is None or has_steps:
+                # free text is only allowed as description, before any steps
+                message = f'unexpected text "{stripped_line}"'
+                raise UnsupportedSyntaxError(message)
+
+        if in_doc_string is not None:
+            message = 'unterminated doc string'
+            raise UnsupportedSyntaxError(message)
+
+        if self.description is None:
+            message = 'no feature'
+            raise UnsupportedSyntaxError(message)
+
+        if scenario is not None:
+            yield scenario
+
+
+class FeatureAnalysis:
+    """Everything `grizzly-cli` needs to know about a feature file, from one pass over its content.
+
+    Everything is computed when first used, and only once. Metadata (`# grizzly-cli ...` arguments and
+    `# grizzly-cli:notice ...`) does not need behave, so it can be read from a feature file that has not been rendered
+    yet. Scenarios, description, steps and questions all comes from the same scan of the feature, see `FeatureScanner`.
+
+    Use `FeatureAnalysis.analyse`, which caches the analysis of the latest content of each path. Content that is read
+    from the file is not kept in memory, it is read line by line when it is analysed, since a rendered feature file can
+    be large.
+    """
+
+    file: Path
+    content: Optional[str]
+    digest: str
+
+    _cache: dict[Path, FeatureAnalysis] = {}  # noqa: RUF012
+    _digests: dict[Path, tuple[int, int, str]] = {}  # noqa: RUF012
+
+    def __init__(self, file: Path, content: Optional[str] = None, digest: Optional[str] = None) -> None:
+        self.file = file
+        self.content = content
+
+        if digest is None:
+            digest = self.get_digest(content) if content is not None else self.get_file_digest(file)
+
+        self.digest = digest
+
+    @classmethod
+    def get_digest(cls, content: str) -> str:
+        return sha1(content.encode('utf-8')).hexdigest()  # noqa: S324
+
+    @classmethod
+    def get_file_digest(cls, file: Path) -> str:
+        """Get the same digest as `get_digest` of the content of `file`, without reading all of it into memory."""
+        digest = sha1()  # noqa: S324
+
+        with file.open(encoding='utf-8') as fd:
+            for line in fd:
+                digest.update(line.encode('utf-8'))
+
+        return digest.hexdigest()
+
+    @classmethod
+    def analyse(cls, file: Union[str, Path], content: Optional[str] = None) -> FeatureAnalysis:
+        """Get analysis of `file`, if `content` is not provided it will be read from `file`.
+
+        Content that was analysed the last time `file` was analysed is not analysed again. If the file has not been
+        modified since then, it is not read again. Only the latest analysis of each file is kept, the content of a file
+        that changes often (e.g. when watching it) would otherwise be kept in memory for each change.
+        """
+        path = Path(file).resolve()
+        digest: Optional[str] = None
+
+        if content is None:
+            stat = path.stat()
+            cached_digest = cls._digests.get(path)
+
+            cached_analysis = cls._cache.get(path)
+
+            if cached_digest is not None and cached_digest[:2] == (stat.st_mtime_ns, stat.st_size) and cached_analysis is not None and cached_analysis.digest == cached_digest[2]:
+                return cached_analysis
+
+            digest = cls.get_file_digest(path)
+            cls._digests[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        else:
+            digest = cls.get_digest(content)
+
+            # content provided for a file that exists (e.g. just written), so it does not have to be read again
+            if path.exists():
+                stat = path.stat()
+                cls._digests[path] = (stat.st_mtime_ns, stat.st_size, digest)
+
+        analysis = cls._cache.get(path)
+
+        if analysis is None or analysis.digest != digest:
+            analysis = cls._cache[path] = cls(path, content, digest)
+
+        return analysis
+
+    @contextmanager
+    def _lines(self) -> Iterator[Iterable[str]]:
+        if self.content is not None:
+            yield self.content.splitlines()
+            return
+
+        with self.file.open(encoding='utf-8') as fd:
+            yield fd
+
+    @cached_property
+    def _metadata(self) -> tuple[list[list[str]], list[str]]:
+        metadata_arguments: list[list[str]] = []
+        notices: list[str] = []
+
+        with self._lines() as lines:
+            for line in lines:
+                stripped_line = line.strip()
+
+                if not stripped_line.startswith('# grizzly-cli'):
+                    continue
+
+                if stripped_line.startswith(METADATA_NOTICE_PREFIX):
+                    notices.append(stripped_line.replace(METADATA_NOTICE_PREFIX, ''))
+                elif stripped_line.startswith(METADATA_ARGUMENTS_PREFIX):
+                    metadata_arguments.append(stripped_line.replace(METADATA_ARGUMENTS_PREFIX, '').split(' '))
+
+        return metadata_arguments, notices
+
+    @cached_property
+    def metadata_arguments(self) -> list[list[str]]:
+        """Arguments from `# grizzly-cli <argument> <additional arguments...>` lines."""
+        return self._metadata[0]
+
+    @cached_property
+    def notices(self) -> list[str]:
+        """Text of `# grizzly-cli:notice <text>` lines."""
+        return self._metadata[1]
+
+    @cached_property
+    def _parsed(self) -> tuple[Optional[str], list[ScenarioRecord]]:
+        scanner = FeatureScanner()
+
+        try:
+            with self._lines() as lines:
+                scenarios = list(scanner.scan(lines))
+        except UnsupportedSyntaxError:
+            pass
+        else:
+            return scanner.description, scenarios
+
+        # behave is only needed when there's a feature file that the scanner does not understand
+        from behave.parser import parse_feature  # noqa: PLC0415
+
+        content = self.content if self.content is not None else self.file.read_text(encoding='utf-8')
+        feature = parse_feature(content, filename=self.file.as_posix())
+
+        if feature is None:
+            return None, []
+
+        return feature.name, [ScenarioRecord.from_scenario(scenario) for scenario in feature.scenarios]
+
+    @cached_property
+    def description(self) -> Optional[str]:
+        return self._parsed[0]
+
+    @cached_property
+    def scenarios(self) -> list[ScenarioRecord]:
+        return self._parsed[1]
+
+    @cached_property
+    def step_summaries(self) -> dict[str, list[StepSummary]]:
+        """Inspected steps, including background steps, per scenario name."""
+        return {scenario.name: scenario.background_steps + scenario.steps for scenario in self.scenarios}
+
+    @cached_property
+    def questions(self) -> list[str]:
+        """Name of variables that the user will be asked for a value for, sorted and unique."""
+        unique_variables: set[str] = set()
+
+        for steps in self.step_summaries.values():
+            for step in steps:
+                if not step.name.startswith('ask for value of variable'):
+                    continue
+
+                match = re.match(r'ask for value of variable "([^"]*)"', step.name)
+
+                if not match:
+                    message = f'could not find variable name in "{step.name}"'
+                    raise ValueError(message)
+
+                unique_variables.add(match.group(1))
+
+        return sorted(unique_variables)
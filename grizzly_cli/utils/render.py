@@ -0,0 +1,565 @@
+"""Persistent cache of rendered feature files.
+
+Rendering a feature file with many `{% scenario ... %}` includes is costly, and the result only depends on the content
+of the feature file, the content of all (transitively) included feature files and the grizzly-cli version. Variable
+values (`{$ ... $}`) are arguments to the scenario tags, so they are part of the content of the including file.
+
+Each entry is stored as `<key>.json` and `<key>.feature` in the cache directory, where the key is a hash of the
+grizzly-cli version, the current working directory, the path and the content of the feature file. Included feature
+files are resolved relative to the current working directory first, so the same feature file can include other files
+when rendered from another directory. The `.json` file contains a manifest with the hash of
+each included file when the entry was stored; if any of them has changed, it is a miss. The `.feature` file contains the
+rendered content, which is streamed to and from the cache, since it can be much larger than the feature file. Entries are evicted least recently used first, when the
+total size of the cache is larger than `GRIZZLY_CLI_RENDER_CACHE_SIZE` bytes (default 64 MiB, `0` disables the cache).
+"""
+from __future__ import annotations
+
+import ast
+import json
+import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import suppress
+from hashlib import sha1
+from io import StringIO
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional, Union, cast
+
+from grizzly_cli import __version__, get_cache_dir
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Collection, Iterable, Iterator, Mapping
+
+__all__ = [
+    'IncludeGraph',
+    'RenderCache',
+    'RenderResult',
+    'filter_template_lines',
+    'render_feature_file',
+]
+
+RENDER_CACHE_SIZE = 64 * 1024 * 1024
+
+# rendered feature files can be large, write them in larger chunks than the default buffer size
+RENDER_BUFFER_SIZE = 1024 * 1024
+
+# starting a process pool is only worth it when there are many leaf includes to render
+PARALLEL_RENDER_THRESHOLD = 16
+
+SCENARIO_TAG_PATTERN = re.compile(r'\{%-?\s*scenario\s+(.*?)\s*-?%\}')
+
+# resolved path of included feature file, scenario name and variables
+IncludeKey = tuple[str, str, tuple[tuple[str, str], ...]]
+
+
+def get_digest(content: str) -> str:
+    return sha1(content.encode('utf-8')).hexdigest()  # noqa: S324
+
+
+def get_include_key(feature_file: Path, scenario: str, variables: Mapping[str, Any]) -> IncludeKey:
+    return feature_file.resolve().as_posix(), scenario, tuple(sorted((name, str(value)) for name, value in variables.items()))
+
+
+def parse_scenario_tag(arguments: str) -> Optional[tuple[str, str, dict[str, Any]]]:
+    """Get scenario, feature and variables from the arguments of a `{% scenario ... %}` tag.
+
+    Returns `None` if the arguments are not all literals, they will then have to be rendered by jinja.
+    """
+    try:
+        expression = ast.parse(f'scenario({arguments})', mode='eval').body
+        if not isinstance(expression, ast.Call) or any(keyword.arg is None for keyword in expression.keywords):
+            return None
+
+        args = [ast.literal_eval(arg) for arg in expression.args]
+        kwargs: dict[str, Any] = {cast('str', keyword.arg): ast.literal_eval(keyword.value) for keyword in expression.keywords}
+    except (SyntaxError, ValueError, TypeError):
+        return None
+
+    # same as the signature of `ScenarioTag.render`
+    for name, value in zip(['scenario', 'feature'], args):
+        if name in kwargs:
+            return None
+        kwargs[name] = value
+
+    if len(args) > 2 or not isinstance(kwargs.get('scenario'), str) or not isinstance(kwargs.get('feature'), str):
+        return None
+
+    scenario = kwargs.pop('scenario')
+    feature = kwargs.pop('feature')
+
+    return scenario, feature, kwargs
+
+
+class RenderCache:
+    directory: Path
+    max_size: int
+
+    def __init__(self, directory: Optional[Path] = None, max_size: Optional[int] = None) -> None:
+        self.directory = directory if directory is not None else get_cache_dir() / 'render'
+        self.max_size = max_size if max_size is not None else int(os.environ.get('GRIZZLY_CLI_RENDER_CACHE_SIZE', RENDER_CACHE_SIZE))
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get_entry_file(self, feature_file: Path, source: str) -> Path:
+        # included feature files are resolved relative to the current working directory first, see `ScenarioTag.render`
+        key = get_digest(f'{__version__}\n{Path.cwd().as_posix()}\n{feature_file.resolve().as_posix()}\n{source}')
+
+        return self.directory / f'{key}.json'
+
+    def get(self, feature_file: Path, source: str) -> Optional[Path]:
+        """Get file with rendered content for `feature_file` with content `source`, if it is cached and no included file has changed."""
+        if not self.enabled:
+            return None
+
+        entry_file = self.get_entry_file(feature_file, source)
+        content_file = entry_file.with_suffix('.feature')
+
+        # a missing or broken entry is a miss, it will be replaced
+        try:
+            entry = json.loads(entry_file.read_text(encoding='utf-8'))
+            includes: dict[str, str] = entry['includes']
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+        if not content_file.exists() or not all(self._is_unchanged(Path(include_file), digest) for include_file, digest in includes.items()):
+            return None
+
+        # used, so it is the most recently used
+        with suppress(OSError):
+            entry_file.touch()
+
+        return content_file
+
+    def _is_unchanged(self, file: Path, digest: str) -> bool:
+        try:
+            return get_digest(file.read_text()) == digest
+        except OSError:
+            return False
+
+    def put(self, feature_file: Path, source: str, content_file: Path, includes: dict[str, str]) -> None:
+        """Store rendered content in `content_file`, `includes` is the hash of each included file (path as key) when rendered."""
+        if not self.enabled:
+            return
+
+        entry_file = self.get_entry_file(feature_file, source)
+        entry = {
+            'version': __version__,
+            'feature_file': feature_file.resolve().as_posix(),
+            'includes': includes,
+        }
+
+        # a failing cache should not fail the render
+        with suppress(OSError):
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+            # write to temporary files and replace, so a concurrent run never reads a partial entry. the manifest is
+            # written last, an entry is not valid without it
+            # only reserves an unique name, `shutil.copyfile` uses the fastest copy the platform supports
+            with NamedTemporaryFile('wb', dir=self.directory, suffix='.tmp', delete=False) as content_fd:
+                pass
+
+            shutil.copyfile(content_file, content_fd.name)
+            Path(content_fd.name).replace(entry_file.with_suffix('.feature'))
+
+            with NamedTemporaryFile('w', encoding='utf-8', dir=self.directory, suffix='.tmp', delete=False) as entry_fd:
+                json.dump(entry, entry_fd)
+
+            Path(entry_fd.name).replace(entry_file)
+
+            self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries, until the total size of the cache is within `max_size`."""
+        entries: list[tuple[int, int, Path]] = []
+
+        for entry_file in self.directory.glob('*.json'):
+            with suppress(OSError):
+                stat = entry_file.stat()
+                entry_size = stat.st_size
+
+                with suppress(FileNotFoundError):
+                    entry_size += entry_file.with_suffix('.feature').stat().st_size
+
+                entries.append((stat.st_mtime_ns, entry_size, entry_file))
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+
+        for _, entry_size, entry_file in sorted(entries, key=lambda entry: entry[0]):
+            if size <= self.max_size:
+                break
+
+            entry_file.unlink(missing_ok=True)
+            entry_file.with_suffix('.feature').unlink(missing_ok=True)
+            size -= entry_size
+
+
+class Include:
+    """A `{% scenario ... %}` tag with literal arguments, and the includes in the scenario it includes."""
+
+    key: IncludeKey
+    scenario: str
+    feature: str
+    file: Path
+    variables: dict[str, Any]
+    statements: Optional[str]
+    error: Optional[Exception]
+    children: list[Include]
+    render_time: Optional[float]
+
+    def __init__(self, scenario: str, feature: str, file: Path, variables: dict[str, Any]) -> None:
+        self.key = get_include_key(file, scenario, variables)
+        self.scenario = scenario
+        self.feature = feature
+        self.file = file
+        self.variables = variables
+        self.statements = None
+        self.error = None
+        self.children = []
+        self.render_time = None
+
+    @property
+    def identifier(self) -> str:
+        return f'{self.feature}#{self.scenario}'
+
+    @property
+    def leaf(self) -> bool:
+        """Included scenario does not have any nested statements, and can be rendered without jinja."""
+        return self.statements is None or not ('{%' in self.statements and '%}' in self.statements)
+
+
+class IncludeGraph:
+    """All (transitively) included scenarios of a feature file.
+
+    Only scenario tags where all arguments are literals are part of the graph. Other tags, and tags in included scenarios
+    that are not leafs, are rendered by jinja as before, but will use the pre-rendered leaf includes.
+
+    Includes are found by scanning the lines of the included scenario that has statements, with variables substituted,
+    no include is rendered while the graph is built. Leafs are then pre-rendered, see `prerender`.
+    """
+
+    feature_file: Path
+    ignore_errors: bool
+    includes: dict[IncludeKey, Include]
+    roots: list[Include]
+    prerendered: dict[IncludeKey, Union[str, Exception]]
+    reused: set[IncludeKey]
+
+    _reusable: dict[IncludeKey, tuple[Include, Optional[Union[str, Exception]]]]
+
+    def __init__(self, feature_file: Path, *, ignore_errors: bool = False) -> None:
+        self.feature_file = feature_file
+        self.ignore_errors = ignore_errors
+        self.includes = {}
+        self.roots = []
+        self.prerendered = {}
+        self.reused = set()
+        self._reusable = {}
+
+    @classmethod
+    def build(
+        cls,
+        feature_file: Path,
+        source: str,
+        *,
+        ignore_errors: bool = False,
+        previous: Optional[IncludeGraph] = None,
+        changed: Collection[Path] = (),
+        max_workers: Optional[int] = None,
+    ) -> IncludeGraph:
+        """Find all includes in `source`, recursively, and pre-render all leafs. Raises `ValueError` if a scenario
+        (transitively) includes itself.
+
+        Includes in `previous` are reused, with their pre-rendered content, if neither the included file nor any file it
+        (transitively) includes is in `changed`. `max_workers` is passed to `prerender`.
+        """
+        graph = cls(feature_file, ignore_errors=ignore_errors)
+
+        if previous is not None:
+            graph._reusable = previous.get_unaffected({file.resolve() for file in changed})
+
+        graph.roots = graph._find_includes(feature_file, source, [])
+        graph._reusable = {}
+
+        graph.prerender(max_workers)
+
+        return graph
+
+    def get_unaffected(self, changed: set[Path]) -> dict[IncludeKey, tuple[Include, Optional[Union[str, Exception]]]]:
+        """Includes, and their pre-rendered content, that does not depend on any of the `changed` files."""
+        affected: dict[IncludeKey, bool] = {}
+
+        def _is_affected(include: Include) -> bool:
+            if include.key not in affected:
+                affected[include.key] = include.file.resolve() in changed or any(_is_affected(child) for child in include.children)
+
+            return affected[include.key]
+
+        return {key: (include, self.prerendered.get(key)) for key, include in self.includes.items() if not _is_affected(include)}
+
+    def _reuse(self, include: Include) -> None:
+        if include.key in self.includes:
+            return
+
+        self.includes[include.key] = include
+        self.reused.add(include.key)
+
+        _, result = self._reusable.get(include.key, (include, None))
+        if result is not None:
+            self.prerendered[include.key] = result
+
+        for child in include.children:
+            self._reuse(child)
+
+    def _find_includes(self, parent_file: Path, content: str, stack: list[Include]) -> list[Include]:
+        # not imported on module level, since it pulls in azure and cryptography
+        from grizzly_cli.utils.configuration import SCENARIO_VARIABLE_PATTERN, ScenarioTag  # noqa: PLC0415
+
+        children: list[Include] = []
+
+        for line in content.splitlines():
+            # tags in comments are not rendered, see `ScenarioTag.filter_stream`
+            if line.lstrip().startswith('#') or '{%' not in line:
+                continue
+
+            for match in SCENARIO_TAG_PATTERN.finditer(line):
+                arguments = parse_scenario_tag(match.group(1))
+                if arguments is None:
+                    continue
+
+                scenario, feature, variables = arguments
+
+                # same resolution as `ScenarioTag.render`
+                file = Path(feature)
+                if not file.exists():
+                    file = (parent_file.parent / feature).resolve()
+
+                include = Include(scenario, feature, file, variables)
+
+                for index, ancestor in enumerate(stack):
+                    if (ancestor.file.resolve(), ancestor.scenario) == (file.resolve(), scenario):
+                        cycle = ' -> '.join(node.identifier for node in [*stack[index:], include])
+                        message = f'scenario includes itself: {cycle}'
+                        raise ValueError(message)
+
+                existing_include = self.includes.get(include.key)
+                if existing_include is not None:
+                    children.append(existing_include)
+                    continue
+
+                reusable = self._reusable.get(include.key)
+                if reusable is not None:
+                    reused_include, _ = reusable
+                    self._reuse(reused_include)
+                    children.append(reused_include)
+                    continue
+
+                self.includes[include.key] = include
+
+                try:
+                    scenario_text = ScenarioTag.get_scenario_text(scenario, file)
+                except Exception as e:
+                    # raised when the include is rendered, if it is rendered
+                    include.error = e
+                    self.prerendered[include.key] = e
+                else:
+                    include.statements = _get_statement_lines(scenario_text, variables, SCENARIO_VARIABLE_PATTERN)
+
+                    if not include.leaf:
+                        include.children = self._find_includes(file, include.statements, [*stack, include])
+
+                children.append(include)
+
+        return children
+
+    @property
+    def leafs(self) -> list[Include]:
+        return [include for include in self.includes.values() if include.leaf]
+
+    def prerender(self, max_workers: Optional[int] = None) -> dict[IncludeKey, Union[str, Exception]]:
+        """Render all leaf includes, errors are kept instead of raised, so they are raised when the include is rendered
+        in the template, in the same order as before.
+
+        Leafs does not depend on each other, and are rendered in a process pool if there are many of them. Leafs that
+        already has been rendered, e.g. reused from a previous graph, are not rendered again.
+        """
+        leafs = [include for include in self.leafs if include.key not in self.prerendered]
+        jobs = [(include.scenario, include.feature, include.file, include.variables, self.ignore_errors) for include in leafs]
+        cpu_count = os.cpu_count() or 1
+
+        if len(jobs) >= PARALLEL_RENDER_THRESHOLD and cpu_count > 1 and (max_workers is None or max_workers > 1):
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_render_leaf, jobs, chunksize=max(1, len(jobs) // (cpu_count * 4))))
+        else:
+            results = [_render_leaf(job) for job in jobs]
+
+        for include, (result, render_time) in zip(leafs, results):
+            self.prerendered[include.key] = result
+
+            if isinstance(result, Exception):
+                include.error = result
+            else:
+                include.render_time = render_time
+
+        return self.prerendered
+
+    def format(self) -> str:
+        """Includes as a tree, with render time for each include. Render time for non-leafs includes nested includes."""
+        lines: list[str] = [self.feature_file.as_posix()]
+
+        def _format(includes: list[Include], depth: int) -> None:
+            for include in includes:
+                render_time = f'{include.render_time:.2f} ms' if include.render_time is not None else 'not rendered'
+                if include.error is not None:
+                    kind = 'error'
+                elif include.leaf:
+                    kind = 'leaf'
+                else:
+                    kind = f'{len(include.children)} includes'
+
+                lines.append(f'{"  " * depth}- {include.identifier}: {render_time} ({kind})')
+                _format(include.children, depth + 1)
+
+        _format(self.roots, 1)
+
+        return '\n'.join(lines)
+
+
+def _get_statement_lines(scenario_text: str, variables: Mapping[str, Any], pattern: re.Pattern[str]) -> str:
+    """Lines of an included scenario that has (parts of) statements, with variables substituted as when it is rendered.
+
+    The rendered scenario has nested statements if, and only if, these lines has, so it is enough to find its includes.
+    """
+    lines: list[str] = []
+
+    for line in scenario_text.splitlines():
+        if '{$' in line:
+            line = pattern.sub(lambda match: str(variables[match.group(1)]) if match.group(1) in variables else match.group(0), line)  # noqa: PLW2901
+
+        if '{%' in line or '%}' in line:
+            lines.append(line)
+
+    return '\n'.join(lines)
+
+
+def _render_leaf(job: tuple[str, str, Path, dict[str, Any], bool]) -> tuple[Union[str, Exception], float]:
+    # not imported on module level, since it pulls in azure and cryptography
+    from grizzly_cli.utils.configuration import ScenarioTag  # noqa: PLC0415
+
+    scenario, feature, file, variables, ignore_errors = job
+    start = perf_counter()
+
+    try:
+        result: Union[str, Exception] = ScenarioTag.render_scenario_text(scenario, feature, file, variables, ignore_errors=ignore_errors)
+    except Exception as e:
+        result = e
+
+    return result, (perf_counter() - start) * 1000
+
+
+class RenderResult(NamedTuple):
+    cache_hit: bool
+    graph: Optional[IncludeGraph]
+    render_time: float
+
+    def format_stats(self) -> str:
+        if self.cache_hit or self.graph is None:
+            return f'rendered from cache in {self.render_time:.2f} ms, no includes was rendered'
+
+        graph = self.graph
+        parallel = len(graph.leafs) >= PARALLEL_RENDER_THRESHOLD and (os.cpu_count() or 1) > 1
+
+        return (
+            f'rendered in {self.render_time:.2f} ms, {len(graph.includes)} unique includes, {len(graph.leafs)} leafs pre-rendered '
+            f'{"in parallel" if parallel else "serially"}:\n{graph.format()}'
+        )
+
+
+def filter_template_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Remove if-statements containing variables (`{$ .. $}`), they are resolved when the scenario is included."""
+    remove_endif = False
+
+    for line in lines:
+        stripped_line = line.strip()
+
+        if stripped_line[:2] == '{%' and stripped_line[-2:] == '%}':
+            if '{$' in stripped_line and '$}' in stripped_line and 'if' in stripped_line:
+                remove_endif = True
+                continue
+
+            if remove_endif and 'endif' in stripped_line:
+                remove_endif = False
+                continue
+
+        yield line
+
+
+def render_feature_file(
+    feature_file: Path,
+    output_file: Path,
+    cache: Optional[RenderCache] = None,
+    *,
+    previous: Optional[RenderResult] = None,
+    changed: Collection[Path] = (),
+    dependencies: Optional[set[Path]] = None,
+    max_workers: Optional[int] = None,
+) -> RenderResult:
+    """Render `feature_file` to `output_file`, from `cache` if possible.
+
+    The rendered content is written while it is rendered, and never kept in memory as a whole. If `previous` is set,
+    includes that does not depend on any of the `changed` files are not rendered again. Files the rendered content
+    depends on are added to `dependencies`, also if rendering fails. `max_workers` is passed to `IncludeGraph.prerender`.
+    """
+    start = perf_counter()
+
+    if cache is None:
+        cache = RenderCache()
+
+    if dependencies is not None:
+        dependencies.add(feature_file.resolve())
+
+    source = feature_file.read_text()
+    cached_file = cache.get(feature_file, source)
+
+    if cached_file is not None:
+        shutil.copyfile(cached_file, output_file)
+        return RenderResult(cache_hit=True, graph=None, render_time=(perf_counter() - start) * 1000)
+
+    # not imported on module level, a cache hit does not need jinja, or azure and cryptography (pulled in by configuration)
+    from grizzly_cli.utils.configuration import ScenarioTag, create_environment, get_template  # noqa: PLC0415
+
+    template_source = '\n'.join(line.rstrip('\r\n') for line in filter_template_lines(StringIO(source)))
+    graph = IncludeGraph.build(
+        feature_file, template_source, previous=previous.graph if previous is not None else None, changed=changed, max_workers=max_workers,
+    )
+
+    # included files that does not exist (yet) are dependencies as well
+    if dependencies is not None:
+        dependencies.update(include.file.resolve() for include in graph.includes.values())
+
+    environment = create_environment(ScenarioTag)
+    template = get_template(environment, feature_file.resolve().as_posix(), template_source)
+    includes: dict[str, str] = {}
+    render_times: dict[IncludeKey, float] = {}
+    environment.extend(feature_file=feature_file, ignore_errors=False, includes=includes, prerendered=graph.prerendered, render_times=render_times)
+
+    try:
+        with output_file.open('w', buffering=RENDER_BUFFER_SIZE) as fd:
+            fd.writelines(template.generate())
+    finally:
+        # includes that are not part of the graph, e.g. arguments that are variables
+        if dependencies is not None:
+            dependencies.update(Path(include_file) for include_file in includes)
+
+    for key, render_time in render_times.items():
+        include = graph.includes.get(key)
+        if include is not None:
+            include.render_time = render_time
+
+    cache.put(feature_file, source, output_file, includes)
+
+    return RenderResult(cache_hit=False, graph=graph, render_time=(perf_counter() - start) * 1000)
@@ -0,0 +1,152 @@
+"""Render a feature file again when any of the files it depends on changes, see `grizzly-cli ... run --watch`.
+
+Files are polled for changes (modification time and size), which works the same on all platforms and in containers with
+mounted volumes. Only includes that depends on a changed file are rendered again, see `IncludeGraph.build`.
+"""
+from __future__ import annotations
+
+from difflib import unified_diff
+from time import perf_counter, sleep
+from typing import TYPE_CHECKING, Callable, Optional
+
+from grizzly_cli.utils import logger
+from grizzly_cli.utils.render import RenderCache, RenderResult, render_feature_file
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterable
+    from pathlib import Path
+
+__all__ = [
+    'FileWatcher',
+    'watch_feature_file',
+]
+
+# seconds between each poll for changes
+WATCH_INTERVAL = 0.5
+
+
+def _get_modified(file: Path) -> Optional[tuple[int, int]]:
+    try:
+        stat = file.stat()
+    except OSError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FileWatcher:
+    """Poll files for changes, a file that is created or removed has also changed."""
+
+    files: dict[Path, Optional[tuple[int, int]]]
+
+    def __init__(self) -> None:
+        self.files = {}
+
+    def watch(self, files: Iterable[Path]) -> None:
+        """Watch `files`, instead of the files watched until now."""
+        resolved_files = {file.resolve() for file in files}
+        self.files = {file: self.files[file] if file in self.files else _get_modified(file) for file in resolved_files}
+
+    def poll(self) -> set[Path]:
+        """Get files that has changed since last poll."""
+        changed: set[Path] = set()
+
+        for file, modified in self.files.items():
+            current_modified = _get_modified(file)
+            if current_modified != modified:
+                self.files[file] = current_modified
+                changed.add(file)
+
+        return changed
+
+
+def _load_environment_file(environment_file: Optional[Path]) -> list[Path]:
+    """Load environment file, to make sure it is still valid, and get it and all files merged into it."""
+    if environment_file is None:
+        return []
+
+    # not imported on module level, since it pulls in azure and cryptography
+    from grizzly_cli.utils.configuration import load_configuration_file  # noqa: PLC0415
+
+    merges: list[Path] = []
+
+    try:
+        load_configuration_file(environment_file, merges)
+    except Exception as e:
+        logger.error(f'failed to load {environment_file}: {e!r}')
+
+    return [environment_file.resolve(), *merges]
+
+
+def watch_feature_file(
+    feature_file: Path,
+    output_file: Path,
+    result: RenderResult,
+    dependencies: set[Path],
+    refresh: Callable[[], object],
+    *,
+    environment_file: Optional[Path] = None,
+    interval: float = WATCH_INTERVAL,
+) -> None:
+    """Render `feature_file` to `output_file` again when it, or any included file, changes, print the difference and
+    call `refresh`. `refresh` is also called when `environment_file`, or any file merged into it, changes.
+
+    `result` and `dependencies` are from when `feature_file` was rendered the first time. Runs until interrupted (ctrl+c).
+
+    The difference is computed against the previous rendered content, so all of it is kept in memory while watching, and
+    the new content is read into memory as well, unlike a render without watching.
+    """
+    # rendered includes are kept in the include graph while watching, no need to store them in the cache as well
+    cache = RenderCache(max_size=0)
+    environment_files = _load_environment_file(environment_file)
+    rendered_lines = output_file.read_text().splitlines()
+
+    watcher = FileWatcher()
+    watcher.watch([*dependencies, *environment_files])
+
+    logger.info(f'watching {len(watcher.files)} files for changes, press ctrl+c to stop')
+
+    try:
+        while True:
+            sleep(interval)
+
+            changed = watcher.poll()
+            if len(changed) < 1:
+                continue
+
+            start = perf_counter()
+            logger.info(f'changed: {", ".join(sorted(file.as_posix() for file in changed))}')
+
+            if not changed.isdisjoint(environment_files):
+                environment_files = _load_environment_file(environment_file)
+
+            if not changed.isdisjoint(dependencies):
+                dependencies = set()
+
+                try:
+                    result = render_feature_file(feature_file, output_file, cache, previous=result, changed=changed, dependencies=dependencies)
+                except Exception as e:
+                    # keep watching, the error is probably fixed in the next change
+                    logger.error(f'failed to render {feature_file}: {e!r}')
+                    continue
+                finally:
+                    watcher.watch([*dependencies, *environment_files])
+
+                lines = output_file.read_text().splitlines()
+                diff = '\n'.join(unified_diff(rendered_lines, lines, fromfile=f'a/{output_file.name}', tofile=f'b/{output_file.name}', lineterm=''))
+                rendered_lines = lines
+
+                logger.info(diff if len(diff) > 0 else 'no changes in rendered feature file')
+
+            try:
+                refresh()
+            except Exception as e:
+                # e.g. the distribution of users is not possible after the change, keep watching
+                logger.error(f'failed to refresh {feature_file}: {e}')
+                continue
+
+            graph = result.graph
+            reused = f', reused {len(graph.reused)} of {len(graph.includes)} includes' if graph is not None else ''
+            logger.info(f'refreshed in {(perf_counter() - start) * 1000:.2f} ms{reused}')
+    except KeyboardInterrupt:
+        logger.info('stopped watching')
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import TYPE_CHECKING, NamedTuple, TextIO
+from xml.etree import ElementTree as ET
+
+from grizzly_cli.argparse.bashcompletion import BashCompletionTypes
+from grizzly_cli.render import FEATURE_FILE_TYPE, find_feature_files
+from grizzly_cli.utils import _guess_datatype, calculate_distribution_of_users_per_scenario, get_distribution_errors, logger
+
+if TYPE_CHECKING:  # pragma: no cover
+    from argparse import Namespace as Arguments
+
+    from grizzly_cli.argparse import ArgumentSubParser
+
+
+ENVIRONMENT_FILE_TYPE = BashCompletionTypes.File('*.yaml', '*.yml')
+
+
+class ValidationResult(NamedTuple):
+    type: str
+    file: str
+    errors: list[str]
+    time: float
+
+
+def create_parser(sub_parser: ArgumentSubParser) -> None:
+    # grizzly-cli validate
+    validate_parser = sub_parser.add_parser('validate', description=(
+        'validate all feature files and environment files in a project, without running anything. feature files are rendered, '
+        'checked for missing values for variables and that users and iterations can be distributed over the scenarios. environment '
+        'files are loaded, including merged files. nothing is asked for, no containers are started and no keyvault is used, so it can '
+        'be used in a pipeline.'
+    ))
+
+    validate_parser.add_argument(
+        '-T', '--testdata-variable',
+        action='append',
+        type=str,
+        required=False,
+        help='specified in the format `<name>=<value>`. value for a scenario variable that the feature file asks for.',
+    )
+
+    validate_parser.add_argument(
+        '-e', '--environment-file',
+        action='append',
+        type=ENVIRONMENT_FILE_TYPE,
+        required=False,
+        default=None,
+        help=(
+            'environment file to validate, can be specified multiple times. if not specified, all environment files in `environments` '
+            'directories are validated'
+        ),
+    )
+
+    validate_parser.add_argument(
+        '-f', '--format',
+        type=str,
+        choices=['json', 'junit'],
+        default='json',
+        required=False,
+        help='format of the report, default is json',
+    )
+
+    validate_parser.add_argument(
+        '-o', '--out',
+        type=str,
+        default=None,
+        required=False,
+        help='file where the report is written, default is stdout',
+    )
+
+    validate_parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=None,
+        required=False,
+        help='number of files validated in parallel, default is the number of CPUs',
+    )
+
+    validate_parser.add_argument(
+        'paths',
+        nargs='*',
+        type=FEATURE_FILE_TYPE,
+        default=['.'],
+        help='feature files, or directories with feature files and environment files, to validate. default is the current directory',
+    )
+
+    if validate_parser.prog != 'grizzly-cli validate':  # pragma: no cover
+        validate_parser.prog = 'grizzly-cli validate'
+
+
+def get_testdata_variables(testdata_variables: list[str] | None) -> dict[str, str]:
+    """Values for scenario variables, from `TESTDATA_VARIABLE_<name>` environment variables and `-T/--testdata-variable`."""
+    variables = {key.replace('TESTDATA_VARIABLE_', ''): value for key, value in os.environ.items() if key.startswith('TESTDATA_VARIABLE_')}
+
+    for variable in testdata_variables or []:
+        if '=' not in variable:
+            message = '-T/--testdata-variable needs to be in the format NAME=VALUE'
+            raise ValueError(message)
+
+        name, value = variable.split('=', 1)
+        variables[name] = value
+
+    return variables
+
+
+def find_environment_files(paths: list[str]) -> list[Path]:
+    """Find environment files in `environments` directories under the directories in `paths`.
+
+    Loaded environment files (`*.lock.yaml`) are not environment files.
+    """
+    # not imported on module level, only needed when validating and not when the parser is created
+    from grizzly_cli.argparse.bashcompletion.index import FileIndex  # noqa: PLC0415
+
+    environment_files: dict[Path, None] = {}
+
+    for path in paths:
+        root = Path(path)
+
+        if not root.is_dir():
+            continue
+
+        index = FileIndex(root.resolve())
+        index.refresh()
+
+        for file in index.files(name_filter=ENVIRONMENT_FILE_TYPE.name_pattern.match):
+            relative_file = Path(file)
+            if 'environments' in relative_file.parts[:-1] and '.lock' not in relative_file.suffixes:
+                environment_files[root / relative_file] = None
+
+    return list(environment_files.keys())
+
+
+def _validate_distribution(feature_lock_file: Path, variables: dict[str, str]) -> list[str]:
+    try:
+        distribution, _ = calculate_distribution_of_users_per_scenario(feature_lock_file, {name: _guess_datatype(value) for name, value in variables.items()})
+        errors = [f'{name}: {", ".join(scenario_errors)}' for name, scenario_errors in get_distribution_errors(distribution).items()]
+    except ValueError as e:
+        return [str(e)]
+
+    if len(errors) > 0:
+        return errors
+
+    return [
+        f'{scenario.name} will have {scenario.user_count} users to run {scenario.iterations} iterations, increase iterations or lower user count'
+        for scenario in distribution.values()
+        if scenario.iterations < scenario.user_count
+    ]
+
+
+def _validate_feature_file(feature_file: Path, variables: dict[str, str]) -> ValidationResult:
+    # not imported on module level, since it pulls in jinja (and azure and cryptography, when rendering)
+    from grizzly_cli.utils.feature import FeatureAnalysis  # noqa: PLC0415
+    from grizzly_cli.utils.render import render_feature_file  # noqa: PLC0415
+
+    start = perf_counter()
+    errors: list[str] = []
+
+    with TemporaryDirectory() as temporary_directory:
+        feature_lock_file = Path(temporary_directory) / f'{feature_file.stem}.lock{feature_file.suffix}'
+
+        try:
+            # feature files are already validated in parallel, do not start a process pool per file as well
+            render_feature_file(feature_file, feature_lock_file, max_workers=1)
+
+            missing_variables = [name for name in FeatureAnalysis.analyse(feature_lock_file).questions if name not in variables]
+            errors.extend(f'missing value for variable "{name}"' for name in missing_variables)
+
+            # distribution depends on the values of the variables, no point in checking it if any is missing
+            if len(missing_variables) < 1:
+                errors.extend(_validate_distribution(feature_lock_file, variables))
+        except Exception as e:
+            errors.append(repr(e))
+
+    return ValidationResult('feature', feature_file.as_posix(), errors, (perf_counter() - start) * 1000)
+
+
+def _validate_environment_file(environment_file: Path) -> ValidationResult:
+    # not imported on module level, since it pulls in azure and cryptography
+    from grizzly_cli.utils.configuration import load_configuration_file  # noqa: PLC0415
+
+    start = perf_counter()
+    errors: list[str] = []
+
+    try:
+        load_configuration_file(environment_file)
+    except Exception as e:
+        errors.append(repr(e))
+
+    return ValidationResult('environment', environment_file.as_posix(), errors, (perf_counter() - start) * 1000)
+
+
+def _validate(job: tuple[str, Path, dict[str, str]]) -> ValidationResult:
+    file_type, file, variables = job
+
+    if file_type == 'environment':
+        return _validate_environment_file(file)
+
+    return _validate_feature_file(file, variables)
+
+
+def create_json_report(results: list[ValidationResult], validate_time: float) -> str:
+    return json.dumps({
+        'files': [result._asdict() for result in results],
+        'failed': sum(1 for result in results if len(result.errors) > 0),
+        'time': validate_time,
+    }, indent=2)
+
+
+def create_junit_report(results: list[ValidationResult], validate_time: float) -> str:
+    """JUnit XML report, with one test suite per type of file and one test case per file. Time is in seconds."""
+    testsuites = ET.Element('testsuites', {
+        'name': 'grizzly-cli validate',
+        'tests': str(len(results)),
+        'failures': str(sum(1 for result in results if len(result.errors) > 0)),
+        'time': f'{validate_time / 1000:.3f}',
+    })
+
+    for file_type in ['feature', 'environment']:
+        type_results = [result for result in results if result.type == file_type]
+
+        testsuite = ET.SubElement(testsuites, 'testsuite', {
+            'name': file_type,
+            'tests': str(len(type_results)),
+            'failures': str(sum(1 for result in type_results if len(result.errors) > 0)),
+            'time': f'{sum(result.time for result in type_results) / 1000:.3f}',
+        })
+
+        for result in type_results:
+            testcase = ET.SubElement(testsuite, 'testcase', {'classname': file_type, 'name': result.file, 'time': f'{result.time / 1000:.3f}'})
+
+            if len(result.errors) > 0:
+                failure = ET.SubElement(testcase, 'failure', {'message': result.errors[0]})
+                failure.text = '\n'.join(result.errors)
+
+    ET.indent(testsuites)
+
+    return ET.tostring(testsuites, encoding='unicode', xml_declaration=True)
+
+
+def validate(args: Arguments) -> int:
+    start = perf_counter()
+    variables = get_testdata_variables(args.testdata_variable)
+
+    feature_files = find_feature_files(args.paths)
+    environment_files = [Path(file) for file in args.environment_file] if args.environment_file is not None else find_environment_files(args.paths)
+
+    jobs = [('feature', file, variables) for file in feature_files] + [('environment', file, variables) for file in environment_files]
+
+    if len(jobs) < 1:
+        logger.warning('no feature files or environment files found in %s', ', '.join(args.paths))
+        return 0
+
+    max_workers = min(args.jobs or os.cpu_count() or 1, len(jobs))
+
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_validate, jobs))
+    else:
+        results = [_validate(job) for job in jobs]
+
+    failed = 0
+
+    for result in results:
+        if len(result.errors) < 1:
+            logger.info(f'{result.time:10.2f} ms {result.file}')
+        else:
+            failed += 1
+            logger.error(f'{result.time:10.2f} ms {result.file}:')
+            for error in result.errors:
+                logger.error(f'{"":13} {error}')
+
+    validate_time = (perf_counter() - start) * 1000
+
+    logger.info(f'validated {len(feature_files)} feature files and {len(environment_files)} environment files in {validate_time:.2f} ms, {failed} failed')
+
+    report = create_json_report(results, validate_time) if args.format == 'json' else create_junit_report(results, validate_time)
+    output: TextIO = Path(args.out).open('w') if args.out is not None else sys.stdout  # noqa: SIM115
+
+    try:
+        output.write(f'{report}\n')
+    finally:
+        # do not close stdout...
+        if output is not sys.stdout:
+            output.close()
+
+    return 1 if failed > 0 else 0
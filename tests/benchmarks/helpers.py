@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+from os import environ
+from pathlib import Path
+from statistics import median
+from typing import Any
+
+__all__ = [
+    'BENCHMARK_BUDGET',
+    'BENCHMARK_ROUNDS',
+    'Baseline',
+    'percentile',
+]
+
+# how much slower than the baseline a benchmark is allowed to be, 1.5 == 50% slower
+BENCHMARK_BUDGET = float(environ.get('GRIZZLY_BENCHMARK_BUDGET', '1.5'))
+
+# number of times each benchmark is repeated, to even out noise
+BENCHMARK_ROUNDS = int(environ.get('GRIZZLY_BENCHMARK_ROUNDS', '5'))
+
+# store current results as baseline, instead of comparing with existing baseline
+BENCHMARK_UPDATE = environ.get('GRIZZLY_BENCHMARK_UPDATE', 'false').lower() == 'true'
+
+BENCHMARK_BASELINE = Path(environ.get('GRIZZLY_BENCHMARK_BASELINE', Path(__file__).parent / 'baseline'))
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of `values`."""
+    if percent == 50:
+        return median(values)
+
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered) + 0.5) - 1))
+
+    return ordered[index]
+
+
+class Baseline:
+    """JSON file with benchmark results, that results from later runs are compared with.
+
+    Results for a key that does not exist in the baseline (or if `GRIZZLY_BENCHMARK_UPDATE=true`) are stored as the
+    new baseline. A metric has regressed if it is more than `GRIZZLY_BENCHMARK_BUDGET` times the baseline value.
+    """
+
+    file: Path
+    results: dict[str, dict[str, Any]]
+    changed: bool
+
+    def __init__(self, name: str) -> None:
+        self.file = BENCHMARK_BASELINE / f'{name}.json'
+        self.results = json.loads(self.file.read_text()) if self.file.exists() else {}
+        self.changed = False
+
+    def compare(self, key: str, result: dict[str, Any], *metrics: str, tolerance: float = 0.0) -> list[str]:
+        """Compare `metrics` in `result` with the baseline for `key`. `tolerance` is added to the budget, so metrics with
+        small values (e.g. sub-millisecond timings) does not fail on noise.
+        """
+        baseline = self.results.get(key)
+
+        if baseline is None or BENCHMARK_UPDATE:
+            self.results[key] = result
+            self.changed = True
+            return []
+
+        regressions: list[str] = []
+
+        for metric in metrics:
+            baseline_value = baseline.get(metric)
+            if baseline_value is None:
+                continue
+
+            budget = baseline_value * BENCHMARK_BUDGET + tolerance
+            if result[metric] > budget:
+                regressions.append(f'{key}: {metric} {result[metric]:.2f} > {budget:.2f} (baseline {baseline_value:.2f}, budget x{BENCHMARK_BUDGET})')
+
+        return regressions
+
+    def save(self) -> None:
+        if not self.changed:
+            return
+
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        self.file.write_text(json.dumps(self.results, indent=2, sort_keys=True))
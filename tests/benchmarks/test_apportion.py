@@ -0,0 +1,54 @@
+"""Apportioning users to 10 up to 100 000 weighted scenarios.
+
+Run with `python -m pytest --no-cov tests/benchmarks/test_apportion.py`. Each scenario has a weight between 1 and 100,
+and there are three users per scenario.
+"""
+from __future__ import annotations
+
+from statistics import median
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+import pytest
+
+from grizzly_cli.utils import apportion_users
+from tests.benchmarks.helpers import BENCHMARK_ROUNDS, Baseline
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Generator
+
+
+@pytest.fixture(scope='module')
+def baseline() -> Generator[Baseline, None, None]:
+    baseline = Baseline('apportion')
+
+    try:
+        yield baseline
+    finally:
+        baseline.save()
+
+
+@pytest.mark.parametrize('scenarios', [10, 100, 1_000, 10_000, 100_000])
+def test_apportion(baseline: Baseline, scenarios: int) -> None:
+    weights: list[float] = [(index * 7919) % 100 + 1 for index in range(scenarios)]
+    user_count = scenarios * 3
+
+    timings: list[float] = []
+
+    for _ in range(BENCHMARK_ROUNDS):
+        start = perf_counter()
+        users = apportion_users(user_count, weights)
+        timings.append((perf_counter() - start) * 1000)
+
+        assert sum(users) == user_count
+        assert min(users) >= 1
+
+    result = {
+        'apportion_ms': median(timings),
+        'scenarios': scenarios,
+    }
+
+    key = f'scenarios={scenarios}'
+    regressions = baseline.compare(key, result, 'apportion_ms', tolerance=1.0)
+
+    assert regressions == [], f'{key} is slower than baseline (apportion_ms {result["apportion_ms"]:.2f}):\n' + '\n'.join(regressions)
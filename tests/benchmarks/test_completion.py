@@ -0,0 +1,171 @@
+"""Latency of `grizzly-cli local run --bash-complete=...` in synthetic projects of different sizes.
+
+Run with `python -m pytest --no-cov tests/benchmarks/test_completion.py`. Each partial input is completed
+`GRIZZLY_BENCHMARK_COMPLETION_ROUNDS` times, both by starting `grizzly-cli` (as bash does without the completion
+server) and in-process with a warm parser (as the completion server does). p50 and p99 latencies are compared with
+`tests/benchmarks/baseline/completion.json`.
+
+Project sizes are configured with `GRIZZLY_BENCHMARK_PROJECTS`, `<name>:<number of feature files>` separated by comma.
+"""
+from __future__ import annotations
+
+import subprocess
+import sys
+from os import chdir, environ
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+import pytest
+
+from grizzly_cli.__main__ import _create_parser
+from grizzly_cli.argparse.bashcompletion.server import complete
+from tests.benchmarks.helpers import Baseline, percentile
+from tests.helpers import rm_rf
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Generator
+
+    from _pytest.fixtures import SubRequest
+    from _pytest.tmpdir import TempPathFactory
+
+BENCHMARK_COMPLETION_ROUNDS = int(environ.get('GRIZZLY_BENCHMARK_COMPLETION_ROUNDS', '20'))
+
+PROJECTS: dict[str, int] = {
+    name: int(size) for name, size in (project.split(':', 1) for project in environ.get('GRIZZLY_BENCHMARK_PROJECTS', 'small:50,large:5000').split(','))
+}
+
+# sub-millisecond timings are noisy, allow this much on top of the budget
+BENCHMARK_TOLERANCE_MS = 2.0
+
+# directories per level, and levels, of nested feature file directories
+NESTING_WIDTH = 4
+NESTING_DEPTH = 4
+
+COMMAND = 'grizzly-cli local run'
+
+INPUTS: dict[str, str] = {
+    'empty': '',
+    'option': '-',
+    'features-dir': 'features/',
+    'partial-file': 'features/a/a/',
+    'deep-dir': 'features/a/a/a/a/',
+    'environment-file': '-e environments/',
+}
+
+
+def _nested(number: int) -> str:
+    parts: list[str] = []
+    for _ in range(NESTING_DEPTH):
+        parts.append(chr(ord('a') + number % NESTING_WIDTH))
+        number //= NESTING_WIDTH
+
+    return '/'.join(parts)
+
+
+def create_project(root: Path, features: int) -> None:
+    """Grizzly project with `features` feature files in nested directories, environment files, requests templates and
+    the hidden directories that are usually found in a project (`.git`, `.venv`).
+    """
+    (root / 'features' / 'steps').mkdir(parents=True)
+    (root / 'features' / 'environment.py').write_text('from grizzly.behave import *\n')
+    (root / 'features' / 'steps' / 'steps.py').write_text('from grizzly.steps import *\n')
+    (root / 'environments').mkdir()
+    (root / 'features' / 'requests').mkdir()
+
+    for number in range(features):
+        directory = root / 'features' / _nested(number)
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f'test-{number}.feature').write_text(f'Feature: test {number}\n')
+        (root / 'features' / 'requests' / f'request-{number}.j2.json').touch()
+
+    for number in range(max(1, features // 10)):
+        (root / 'environments' / f'environment-{number}.yaml').write_text('configuration: {}\n')
+
+    for hidden in ['.git/objects', '.venv/lib/site-packages']:
+        for number in range(features * 2):
+            directory = root / hidden / f'{number // 100}'
+            directory.mkdir(parents=True, exist_ok=True)
+            (directory / f'hidden-{number}.feature').touch()
+
+
+@pytest.fixture(scope='module')
+def baseline() -> Generator[Baseline, None, None]:
+    baseline = Baseline('completion')
+
+    try:
+        yield baseline
+    finally:
+        baseline.save()
+
+
+@pytest.fixture(scope='module', params=PROJECTS.keys())
+def project(request: SubRequest, tmp_path_factory: TempPathFactory) -> Generator[tuple[str, Path], None, None]:
+    name = request.param
+    test_context = tmp_path_factory.mktemp(f'benchmark_completion_{name}')
+    create_project(test_context, PROJECTS[name])
+
+    try:
+        yield name, test_context
+    finally:
+        rm_rf(test_context)
+
+
+@pytest.mark.parametrize('partial_input', INPUTS.keys())
+def test_completion_process(partial_input: str, project: tuple[str, Path], baseline: Baseline) -> None:
+    name, root = project
+    # same as the bash completion script, an option with a value is part of the current value
+    command, value = COMMAND, INPUTS[partial_input]
+    argv = [sys.executable, '-m', 'grizzly_cli', *command.split(' ')[1:], f'--bash-complete={command} {value}']
+    timings: list[float] = []
+
+    # warm up, the file index is created the first time
+    subprocess.run(argv, cwd=root, capture_output=True, check=True)
+
+    for _ in range(BENCHMARK_COMPLETION_ROUNDS):
+        start = perf_counter()
+        subprocess.run(argv, cwd=root, capture_output=True, check=True)
+        timings.append((perf_counter() - start) * 1000)
+
+    result = {
+        'p50_ms': percentile(timings, 50),
+        'p99_ms': percentile(timings, 99),
+        'features': PROJECTS[name],
+    }
+
+    key = f'process:{name}:{partial_input}'
+    regressions = baseline.compare(key, result, 'p50_ms', 'p99_ms', tolerance=BENCHMARK_TOLERANCE_MS)
+
+    assert regressions == [], f'{key} is slower than baseline:\n' + '\n'.join(regressions)
+
+
+@pytest.mark.parametrize('partial_input', INPUTS.keys())
+def test_completion_server(partial_input: str, project: tuple[str, Path], baseline: Baseline) -> None:
+    name, root = project
+    # same as the bash completion script, an option with a value is part of the current value
+    command, value = COMMAND, INPUTS[partial_input]
+    parser = _create_parser()
+    original_cwd = Path.cwd()
+    timings: list[float] = []
+
+    try:
+        # warm up, the file index is created the first time
+        assert complete(parser, root.as_posix(), command, value) != ''
+
+        for _ in range(BENCHMARK_COMPLETION_ROUNDS):
+            start = perf_counter()
+            complete(parser, root.as_posix(), command, value)
+            timings.append((perf_counter() - start) * 1000)
+    finally:
+        chdir(original_cwd)
+
+    result = {
+        'p50_ms': percentile(timings, 50),
+        'p99_ms': percentile(timings, 99),
+        'features': PROJECTS[name],
+    }
+
+    key = f'server:{name}:{partial_input}'
+    regressions = baseline.compare(key, result, 'p50_ms', 'p99_ms', tolerance=BENCHMARK_TOLERANCE_MS)
+
+    assert regressions == [], f'{key} is slower than baseline:\n' + '\n'.join(regressions)
@@ -0,0 +1,154 @@
+"""Directory walk when suggesting `BashCompletionTypes.File` values, in a synthetic tree with 200k files.
+
+Run with `python -m pytest --no-cov tests/benchmarks/test_completion_walk.py`. The previous implementation, one `rglob`
+per pattern that walks hidden directories and filters afterwards, is kept here as reference and compared with the
+pruning, index backed, walk.
+"""
+from __future__ import annotations
+
+import sys
+from os import environ
+from statistics import median
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Callable, Optional, cast
+
+import pytest
+
+from grizzly_cli.argparse.bashcompletion import index as index_module
+from grizzly_cli.argparse.bashcompletion.index import FileIndex
+from grizzly_cli.argparse.bashcompletion.types import ESCAPE_CHARACTERS, BashCompletionTypes
+from tests.benchmarks.helpers import BENCHMARK_ROUNDS, Baseline
+from tests.helpers import cwd, rm_rf
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Generator
+    from pathlib import Path
+
+    from _pytest.tmpdir import TempPathFactory
+
+BENCHMARK_FILES = int(environ.get('GRIZZLY_BENCHMARK_FILES', '200000'))
+
+PATTERNS = ['*.feature', '*.yaml', '*.yml']
+
+# (directory, share of files, extension)
+LAYOUT: list[tuple[str, float, str]] = [
+    ('features', 0.01, 'feature'),
+    ('environments', 0.001, 'yaml'),
+    ('node_modules', 0.5, 'js'),
+    ('.git/objects', 0.2, 'pack'),
+    ('.venv/lib/site-packages', 0.2, 'py'),
+    ('requests', 0.089, 'j2.json'),
+]
+
+FILES_PER_DIRECTORY = 50
+
+
+def rglob_list_files(root: Path, patterns: list[str], value: Optional[str]) -> dict[str, str]:
+    """`list_files` before the file index, one `rglob` per pattern, hidden paths are filtered after being walked."""
+    matches: dict[str, str] = {}
+
+    if value is not None:
+        for chr_with, chr_replace in ESCAPE_CHARACTERS.items():
+            value = value.replace(cast('str', chr_replace), chr_with)
+
+    for pattern in patterns:
+        for path in root.rglob(f'**/{pattern}'):
+            path_match = path.relative_to(root)
+            path_match_value = path_match.as_posix()
+
+            if any(part.startswith('.') for part in path_match.parts) or (value is not None and not path_match_value.startswith(value)):
+                continue
+
+            match: Optional[dict[str, str]] = None
+
+            if '/' in path_match_value:
+                try:
+                    index_sep = path_match_value.index('/', len(value or ''))
+                    match = {BashCompletionTypes.File._transform_path(path_match_value[:index_sep]): 'dir'}
+                except ValueError:
+                    pass
+
+            if match is None:
+                match = {BashCompletionTypes.File._transform_path(path_match_value): 'file'}
+
+            matches.update(match)
+
+    return matches
+
+
+@pytest.fixture(scope='module')
+def baseline() -> Generator[Baseline, None, None]:
+    baseline = Baseline('completion_walk')
+
+    try:
+        yield baseline
+    finally:
+        baseline.save()
+
+
+@pytest.fixture(scope='module')
+def tree(tmp_path_factory: TempPathFactory) -> Generator[Path, None, None]:
+    test_context = tmp_path_factory.mktemp('benchmark_completion_walk')
+
+    for directory, share, extension in LAYOUT:
+        count = max(1, int(BENCHMARK_FILES * share))
+        for number in range(count):
+            sub_directory = test_context / directory / f'{directory.rsplit("/", 1)[-1]}-{number // FILES_PER_DIRECTORY // 10}' / f'{number // FILES_PER_DIRECTORY}'
+            if number % FILES_PER_DIRECTORY == 0:
+                sub_directory.mkdir(parents=True, exist_ok=True)
+            (sub_directory / f'file-{number}.{extension}').touch()
+
+    try:
+        yield test_context
+    finally:
+        rm_rf(test_context)
+
+
+def _measure(func: Callable[[], Any], before: Optional[Callable[[], None]] = None) -> tuple[list[float], Any]:
+    timings: list[float] = []
+    result: Any = None
+
+    for _ in range(BENCHMARK_ROUNDS):
+        if before is not None:
+            before()
+
+        start = perf_counter()
+        result = func()
+        timings.append((perf_counter() - start) * 1000)
+
+    return timings, result
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='synthetic tree is too slow to create on windows')
+@pytest.mark.parametrize('value', [None, 'features/', 'environments/environments-0/0/'])
+def test_completion_walk(value: Optional[str], tree: Path, baseline: Baseline) -> None:
+    impl = BashCompletionTypes.File(*PATTERNS)
+
+    def cold() -> None:
+        index_module._indexes.clear()
+        FileIndex.get_index_file(tree).unlink(missing_ok=True)
+
+    with cwd(tree):
+        rglob_timings, expected = _measure(lambda: rglob_list_files(tree, PATTERNS, value))
+        cold_timings, actual_cold = _measure(lambda: impl.list_files(value), before=cold)
+        warm_timings, actual_warm = _measure(lambda: impl.list_files(value))
+
+    assert actual_cold == expected
+    assert actual_warm == expected
+
+    result = {
+        'rglob_ms': median(rglob_timings),
+        'cold_ms': median(cold_timings),
+        'warm_ms': median(warm_timings),
+        'files': BENCHMARK_FILES,
+    }
+
+    key = f'value={value}'
+    regressions = baseline.compare(key, result, 'cold_ms', 'warm_ms')
+
+    summary = ', '.join(f'{metric} {result[metric]:.2f}' for metric in ['rglob_ms', 'cold_ms', 'warm_ms'])
+    assert regressions == [], f'{key} is slower than baseline ({summary}):\n' + '\n'.join(regressions)
+
+    # pruning hidden directories, and keeping the index, should always be faster than walking everything per pattern
+    assert result['cold_ms'] < result['rglob_ms'], summary
+    assert result['warm_ms'] < result['rglob_ms'], summary
@@ -0,0 +1,90 @@
+"""Calculating the distribution of users and iterations for a generated feature file with 2 000 scenarios.
+
+Run with `python -m pytest --no-cov tests/benchmarks/test_distribution.py`. The feature file has
+`GRIZZLY_BENCHMARK_DISTRIBUTION_SCENARIOS` scenarios (default 2 000), where weights and iterations are a mix of literal
+values and the same few jinja expressions. The feature file is analysed before it is measured, so only the calculation of
+the distribution is measured.
+"""
+from __future__ import annotations
+
+from os import environ
+from statistics import median
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+import pytest
+
+from grizzly_cli.utils import calculate_distribution_of_users_per_scenario
+from grizzly_cli.utils.feature import FeatureAnalysis
+from tests.benchmarks.helpers import BENCHMARK_ROUNDS, Baseline
+from tests.helpers import rm_rf
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Generator
+    from pathlib import Path
+
+    from _pytest.tmpdir import TempPathFactory
+
+BENCHMARK_SCENARIOS = int(environ.get('GRIZZLY_BENCHMARK_DISTRIBUTION_SCENARIOS', '2000'))
+
+
+@pytest.fixture(scope='module')
+def baseline() -> Generator[Baseline, None, None]:
+    baseline = Baseline('distribution')
+
+    try:
+        yield baseline
+    finally:
+        baseline.save()
+
+
+@pytest.fixture(scope='module')
+def feature_file(tmp_path_factory: TempPathFactory) -> Generator[Path, None, None]:
+    test_context = tmp_path_factory.mktemp('benchmark_distribution')
+    feature_file = test_context / 'test.feature'
+
+    with feature_file.open('w') as fd:
+        fd.write('Feature: benchmark\n    Background: common\n        Given "{{ users }}" users\n        And spawn rate is "10" users per second\n\n')
+
+        for number in range(BENCHMARK_SCENARIOS):
+            weight = '{{ weight }}' if number % 2 == 0 else f'{number % 10 + 1}'
+            iterations = '{{ iterations * factor | int }}' if number % 3 == 0 else f'{number % 5 + 1}'
+            fd.write(
+                f'    Scenario: scenario-{number}\n'
+                f'        Given value for variable "factor" is "{{{{ {number % 4 + 1} }}}}"\n'
+                f'        And a user of type "RestApi" with weight "{weight}" load testing "https://localhost"\n'
+                f'        And repeat for "{iterations}" iterations\n'
+                '        Then get request with name "read" to endpoint "/api/read"\n'
+                '\n',
+            )
+
+    try:
+        yield feature_file
+    finally:
+        rm_rf(test_context)
+
+
+def test_distribution(feature_file: Path, baseline: Baseline) -> None:
+    variables = {'users': BENCHMARK_SCENARIOS * 2, 'weight': 2, 'iterations': 10}
+
+    FeatureAnalysis.analyse(feature_file)
+
+    timings: list[float] = []
+
+    for _ in range(BENCHMARK_ROUNDS):
+        start = perf_counter()
+        distribution, _ = calculate_distribution_of_users_per_scenario(feature_file, variables)
+        timings.append((perf_counter() - start) * 1000)
+
+        assert len(distribution) == BENCHMARK_SCENARIOS
+        assert sum(scenario.user_count for scenario in distribution.values()) == BENCHMARK_SCENARIOS * 2
+
+    result = {
+        'distribution_ms': median(timings),
+        'scenarios': BENCHMARK_SCENARIOS,
+    }
+
+    key = f'scenarios={BENCHMARK_SCENARIOS}'
+    regressions = baseline.compare(key, result, 'distribution_ms')
+
+    assert regressions == [], f'{key} is slower than baseline (distribution_ms {result["distribution_ms"]:.2f}):\n' + '\n'.join(regressions)
@@ -0,0 +1,129 @@
+"""Scanning a generated feature file with 10k scenarios, compared with parsing it with behave.
+
+Run with `python -m pytest --no-cov tests/benchmarks/test_feature_scan.py`. Both time and peak memory (traced python
+allocations) are measured, for building the scenario records grizzly-cli needs.
+"""
+from __future__ import annotations
+
+import tracemalloc
+from os import environ
+from statistics import median
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Callable
+
+import pytest
+from behave.parser import parse_file
+
+from grizzly_cli.utils.feature import FeatureScanner, ScenarioRecord
+from tests.benchmarks.helpers import BENCHMARK_ROUNDS, Baseline
+from tests.helpers import rm_rf
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Generator
+    from pathlib import Path
+
+    from _pytest.tmpdir import TempPathFactory
+
+BENCHMARK_SCENARIOS = int(environ.get('GRIZZLY_BENCHMARK_SCENARIOS', '10000'))
+
+
+@pytest.fixture(scope='module')
+def baseline() -> Generator[Baseline, None, None]:
+    baseline = Baseline('feature_scan')
+
+    try:
+        yield baseline
+    finally:
+        baseline.save()
+
+
+@pytest.fixture(scope='module')
+def feature_file(tmp_path_factory: TempPathFactory) -> Generator[Path, None, None]:
+    test_context = tmp_path_factory.mktemp('benchmark_feature_scan')
+    feature_file = test_context / 'test.feature'
+
+    with feature_file.open('w') as fd:
+        fd.write('Feature: benchmark\n    Background: common\n        Given "{{ users }}" users\n        And spawn rate is "10" users per second\n\n')
+
+        for number in range(BENCHMARK_SCENARIOS):
+            fd.write(
+                f'    Scenario: scenario-{number}\n'
+                f'        Given a user of type "RestApi" with weight "{number % 10 + 1}" load testing "https://localhost"\n'
+                f'        And repeat for "{number % 5 + 1}" iterations\n'
+                f'        And value for variable "AtomicIntegerIncrementer.id_{number}" is "1"\n'
+                '        And set context variable "auth.user.username" to "bob"\n'
+                '        Then post request with name "create" to endpoint "/api/create"\n'
+                '            """\n'
+                '            {"id": "{{ AtomicIntegerIncrementer.id }}", "name": "test"}\n'
+                '            """\n'
+                '        And save response payload "$.id" in variable "id"\n'
+                '        Then get request with name "read" to endpoint "/api/read/{{ id }}"\n'
+                '        And fail ratio is greater than "5"% fail scenario\n'
+                '\n',
+            )
+
+    try:
+        yield feature_file
+    finally:
+        rm_rf(test_context)
+
+
+def _scan(feature_file: Path) -> list[ScenarioRecord]:
+    with feature_file.open() as fd:
+        return list(FeatureScanner().scan(fd))
+
+
+def _parse(feature_file: Path) -> list[ScenarioRecord]:
+    feature = parse_file(feature_file.as_posix())
+
+    return [ScenarioRecord.from_scenario(scenario) for scenario in feature.scenarios]
+
+
+def _measure(func: Callable[[], list[ScenarioRecord]]) -> tuple[float, float, list[ScenarioRecord]]:
+    timings: list[float] = []
+    result: list[ScenarioRecord] = []
+
+    for _ in range(BENCHMARK_ROUNDS):
+        start = perf_counter()
+        result = func()
+        timings.append((perf_counter() - start) * 1000)
+        del result
+
+    # memory is measured separately, tracing allocations makes everything slower
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return median(timings), peak / 1024 / 1024, result
+
+
+def _as_tuples(records: list[ScenarioRecord]) -> list[Any]:
+    return [(record.name, record.step_count, record.background_steps, record.steps) for record in records]
+
+
+def test_feature_scan(feature_file: Path, baseline: Baseline) -> None:
+    behave_ms, behave_peak_mb, expected = _measure(lambda: _parse(feature_file))
+    scan_ms, scan_peak_mb, actual = _measure(lambda: _scan(feature_file))
+
+    assert len(actual) == BENCHMARK_SCENARIOS
+    assert _as_tuples(actual) == _as_tuples(expected)
+
+    result = {
+        'behave_ms': behave_ms,
+        'behave_peak_mb': behave_peak_mb,
+        'scan_ms': scan_ms,
+        'scan_peak_mb': scan_peak_mb,
+        'scenarios': BENCHMARK_SCENARIOS,
+    }
+
+    key = f'scenarios={BENCHMARK_SCENARIOS}'
+    regressions = baseline.compare(key, result, 'scan_ms', 'scan_peak_mb')
+
+    summary = ', '.join(f'{metric} {result[metric]:.2f}' for metric in ['behave_ms', 'behave_peak_mb', 'scan_ms', 'scan_peak_mb'])
+    assert regressions == [], f'{key} is slower than baseline ({summary}):\n' + '\n'.join(regressions)
+
+    assert result['scan_ms'] < result['behave_ms'], summary
+    assert result['scan_peak_mb'] < result['behave_peak_mb'], summary
@@ -0,0 +1,121 @@
+"""Rendering a generated feature file that expands to many lines, to the lock file.
+
+Run with `python -m pytest --no-cov tests/benchmarks/test_render_stream.py`. The same feature file is rendered with a
+small and a large included scenario, and peak memory (traced python allocations) should not grow with the size of the
+rendered file, since the rendered content is written while it is rendered and not kept in memory as a whole. Most of
+the peak is jinja compiling the feature file, which depends on the size of the feature file and not what it expands to.
+"""
+from __future__ import annotations
+
+import tracemalloc
+from os import environ
+from statistics import median
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+import pytest
+
+from grizzly_cli.utils.render import RenderCache, render_feature_file
+from tests.benchmarks.helpers import BENCHMARK_ROUNDS, Baseline
+from tests.helpers import rm_rf
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Generator
+    from pathlib import Path
+
+    from _pytest.tmpdir import TempPathFactory
+
+BENCHMARK_SCENARIOS = int(environ.get('GRIZZLY_BENCHMARK_SCENARIOS', '1000'))
+
+# number of steps in the small and large included scenario, rendered file is roughly scenarios * steps lines
+BENCHMARK_STEPS = (20, 200)
+
+
+@pytest.fixture(scope='module')
+def baseline() -> Generator[Baseline, None, None]:
+    baseline = Baseline('render_stream')
+
+    try:
+        yield baseline
+    finally:
+        baseline.save()
+
+
+@pytest.fixture(scope='module')
+def feature_file(tmp_path_factory: TempPathFactory) -> Generator[Path, None, None]:
+    test_context = tmp_path_factory.mktemp('benchmark_render_stream')
+    feature_file = test_context / 'test-{steps}.feature'
+
+    with (test_context / 'include.feature').open('w') as fd:
+        fd.write('Feature: include\n')
+        for steps in BENCHMARK_STEPS:
+            fd.write(f'    Scenario: steps-{steps}\n')
+            for number in range(steps):
+                fd.write(f'        Then get request with name "{{$ name $}}-{number}" to endpoint "/api/{{$ name $}}/{number}"\n')
+
+    try:
+        yield feature_file
+    finally:
+        rm_rf(test_context)
+
+
+def _write_feature_file(feature_file: Path, steps: int) -> Path:
+    file = feature_file.with_name(feature_file.name.format(steps=steps))
+
+    with file.open('w') as fd:
+        fd.write('Feature: benchmark\n    Background: common\n        Given "{{ users }}" users\n\n')
+
+        for number in range(BENCHMARK_SCENARIOS):
+            fd.write(
+                f'    Scenario: scenario-{number}\n'
+                '        Given a user of type "RestApi" load testing "https://localhost"\n'
+                f'        {{% scenario "steps-{steps}", feature="./include.feature", name="test" %}}\n'
+                '\n',
+            )
+
+    return file
+
+
+def _measure(feature_file: Path, *, rounds: int) -> tuple[float, float, float]:
+    output_file = feature_file.with_suffix('.lock.feature')
+    cache = RenderCache(max_size=0)
+    timings: list[float] = []
+
+    for _ in range(rounds):
+        start = perf_counter()
+        render_feature_file(feature_file, output_file, cache)
+        timings.append((perf_counter() - start) * 1000)
+
+    # memory is measured separately, tracing allocations makes everything slower
+    tracemalloc.start()
+    try:
+        render_feature_file(feature_file, output_file, cache)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return median(timings), peak / 1024 / 1024, output_file.stat().st_size / 1024 / 1024
+
+
+def test_render_stream(feature_file: Path, baseline: Baseline) -> None:
+    small_steps, large_steps = BENCHMARK_STEPS
+    _, small_peak_mb, small_output_mb = _measure(_write_feature_file(feature_file, small_steps), rounds=1)
+    render_ms, render_peak_mb, output_mb = _measure(_write_feature_file(feature_file, large_steps), rounds=BENCHMARK_ROUNDS)
+
+    result = {
+        'render_ms': render_ms,
+        'render_peak_mb': render_peak_mb,
+        'output_mb': output_mb,
+        'small_peak_mb': small_peak_mb,
+        'small_output_mb': small_output_mb,
+        'scenarios': BENCHMARK_SCENARIOS,
+    }
+
+    key = f'scenarios={BENCHMARK_SCENARIOS}'
+    regressions = baseline.compare(key, result, 'render_ms', 'render_peak_mb')
+
+    summary = ', '.join(f'{metric} {result[metric]:.2f}' for metric in ['render_ms', 'render_peak_mb', 'output_mb', 'small_peak_mb', 'small_output_mb'])
+    assert regressions == [], f'{key} is slower than baseline ({summary}):\n' + '\n'.join(regressions)
+
+    # ten times as much output, should not need (much) more memory
+    assert render_peak_mb - small_peak_mb < (output_mb - small_output_mb) / 4, summary
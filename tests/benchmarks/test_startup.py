@@ -0,0 +1,172 @@
+"""Import time and cold start of `grizzly-cli`, for each entry path.
+
+Run with `python -m pytest --no-cov tests/benchmarks/test_startup.py`. The first run stores a baseline in
+`tests/benchmarks/baseline/startup.json`, later runs fails if the fastest wall time, or the import time of that run,
+of an entry path is more than `GRIZZLY_BENCHMARK_BUDGET` times the baseline. The median wall time is stored as well,
+for reference. Each entry path must succeed, a command that fails early would otherwise be benchmarked as fast.
+
+Baselines are not committed, since they depend on the host. In CI, either point `GRIZZLY_BENCHMARK_BASELINE` to a
+directory that is persisted between runs (e.g. a cache), or a first run just stores a baseline and passes. The fastest
+wall time is also compared with `GRIZZLY_BENCHMARK_MAX_MS`, if set, which does not need a baseline.
+"""
+from __future__ import annotations
+
+import subprocess
+import sys
+from os import environ
+from shutil import which
+from statistics import median
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from tests.benchmarks.helpers import BENCHMARK_ROUNDS, Baseline
+from tests.helpers import rm_rf
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Generator
+    from pathlib import Path
+
+    from _pytest.tmpdir import TempPathFactory
+
+TOP_MODULES = 20
+
+# absolute budget for the fastest wall time of each entry path, applies also when there is no baseline
+BENCHMARK_MAX_MS = float(environ['GRIZZLY_BENCHMARK_MAX_MS']) if environ.get('GRIZZLY_BENCHMARK_MAX_MS') else None
+
+ENTRY_PATHS: dict[str, list[str]] = {
+    'version': ['--version'],
+    'bash-complete': ['--bash-complete=grizzly-cli '],
+    'bash-complete-local-run': ['local', 'run', '--bash-complete=grizzly-cli local run '],
+    'auth': ['auth'],
+    'init': ['init', '--yes', 'benchmark-project'],
+    'local-run-dump': ['local', 'run', 'features/benchmark.feature', '--dump'],
+    'dist-validate-config': ['dist', '--validate-config', 'run', 'features/benchmark.feature'],
+    'keyvault-diff': ['keyvault', '--file', 'environments/benchmark.yaml', 'diff', 'environments/benchmark-orig.yaml'],
+}
+
+# entry paths that needs something that might not be installed, at least one of the executables
+ENTRY_PATH_REQUIREMENTS: dict[str, list[str]] = {
+    'dist-validate-config': ['docker', 'podman'],
+}
+
+
+@pytest.fixture(scope='module')
+def baseline() -> Generator[Baseline, None, None]:
+    baseline = Baseline('startup')
+
+    try:
+        yield baseline
+    finally:
+        baseline.save()
+
+
+@pytest.fixture(scope='module')
+def project(tmp_path_factory: TempPathFactory) -> Generator[Path, None, None]:
+    test_context = tmp_path_factory.mktemp('benchmark_startup')
+
+    (test_context / 'features').mkdir()
+    (test_context / 'features' / 'environment.py').write_text('from grizzly.behave import *\n')
+    (test_context / 'features' / 'benchmark.feature').write_text("""Feature: benchmark
+  Background: common
+    Given "2" users
+
+  Scenario: first
+    Given a user of type "RestApi" load testing "http://localhost"
+    And repeat for "2" iterations
+
+  Scenario: second
+    Given a user of type "RestApi" load testing "http://localhost"
+    And repeat for "2" iterations
+""")
+    (test_context / 'environments').mkdir()
+    for name in ['benchmark', 'benchmark-orig']:
+        (test_context / 'environments' / f'{name}.yaml').write_text("""configuration:
+  keyvault: https://benchmark.vault.azure.net
+  template:
+    host: https://localhost
+""")
+
+    try:
+        yield test_context
+    finally:
+        rm_rf(test_context)
+
+
+def parse_importtime(output: str) -> tuple[float, list[dict[str, Any]]]:
+    """Parse output from `python -X importtime`, and return total import time and the modules with highest cumulative import time."""
+    total_ms = 0.0
+    modules: list[dict[str, Any]] = []
+
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+
+        _, timings = line.split(':', 1)
+        self_us, cumulative_us, module = timings.split('|', 2)
+        cumulative_ms = int(cumulative_us) / 1000
+
+        # top level imports has one space of indentation, nested imports more
+        if not module.startswith('  '):
+            total_ms += cumulative_ms
+
+        modules.append({
+            'module': module.strip(),
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': cumulative_ms,
+        })
+
+    return total_ms, sorted(modules, key=lambda module: module['cumulative_ms'], reverse=True)[:TOP_MODULES]
+
+
+@pytest.mark.parametrize('entry_path', ENTRY_PATHS.keys())
+def test_startup(entry_path: str, project: Path, baseline: Baseline) -> None:
+    argv = ENTRY_PATHS[entry_path]
+    requirements = ENTRY_PATH_REQUIREMENTS.get(entry_path, [])
+
+    if len(requirements) > 0 and all(which(executable) is None for executable in requirements):
+        pytest.skip(f'{entry_path} needs one of {", ".join(requirements)}')
+
+    env = {**environ, 'OTP_SECRET': 'ABCDEFGHIJKLMNOP'}
+    wall_times: list[float] = []
+    import_ms = 0.0
+    top_modules: list[dict[str, Any]] = []
+
+    for _ in range(BENCHMARK_ROUNDS):
+        rm_rf(project / 'benchmark-project', missing_ok=True)
+
+        start = perf_counter()
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-m', 'grizzly_cli', *argv],
+            cwd=project,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        wall_time = (perf_counter() - start) * 1000
+
+        errors = '\n'.join(line for line in process.stderr.splitlines() if not line.startswith('import time:'))
+        assert process.returncode == 0, f'{entry_path} ({" ".join(argv)}) failed with return code {process.returncode}:\n{process.stdout}{errors}'
+
+        if len(wall_times) < 1 or wall_time < min(wall_times):
+            import_ms, top_modules = parse_importtime(process.stderr)
+
+        wall_times.append(wall_time)
+
+    wall_ms = min(wall_times)
+    result = {
+        'wall_ms': wall_ms,
+        'wall_median_ms': median(wall_times),
+        'import_ms': import_ms,
+        'top_modules': top_modules,
+    }
+
+    regressions = baseline.compare(entry_path, result, 'wall_ms', 'import_ms')
+
+    if BENCHMARK_MAX_MS is not None and wall_ms > BENCHMARK_MAX_MS:
+        regressions.append(f'{entry_path}: wall_ms {wall_ms:.2f} > {BENCHMARK_MAX_MS:.2f} (GRIZZLY_BENCHMARK_MAX_MS)')
+
+    top = '\n'.join(f'  {module["cumulative_ms"]:8.2f} ms  {module["module"]}' for module in top_modules)
+    assert regressions == [], f'{entry_path} ({" ".join(argv)}) is slower than budget:\n' + '\n'.join(regressions) + f'\n\ntop modules:\n{top}'
@@ -0,0 +1,112 @@
+"""Filtering generated feature and environment templates, and substituting variables in a large included scenario.
+
+Run with `python -m pytest --no-cov tests/benchmarks/test_template_filter.py`. The templates have
+`GRIZZLY_BENCHMARK_TEMPLATE_LINES` lines (default 50 000), with a jinja variable on every line and a commented out tag
+every 100 lines. Only the parsing (lexing and `filter_stream`) is measured, not the compilation of the parsed template.
+The included scenario has a `{$ ... $}` variable on every line, out of `GRIZZLY_BENCHMARK_TEMPLATE_VARIABLES` declared
+variables (default 100).
+"""
+from __future__ import annotations
+
+from os import environ
+from statistics import median
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable
+
+import pytest
+from jinja2 import Environment
+
+from grizzly_cli.utils.configuration import MergeYamlTag, ScenarioTag
+from tests.benchmarks.helpers import BENCHMARK_ROUNDS, Baseline
+from tests.helpers import rm_rf
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Generator
+
+    from _pytest.tmpdir import TempPathFactory
+
+BENCHMARK_LINES = int(environ.get('GRIZZLY_BENCHMARK_TEMPLATE_LINES', '50000'))
+
+BENCHMARK_VARIABLES = int(environ.get('GRIZZLY_BENCHMARK_TEMPLATE_VARIABLES', '100'))
+
+
+@pytest.fixture(scope='module')
+def baseline() -> Generator[Baseline, None, None]:
+    baseline = Baseline('template_filter')
+
+    try:
+        yield baseline
+    finally:
+        baseline.save()
+
+
+def _median_ms(func: Callable[[], object]) -> float:
+    timings: list[float] = []
+
+    for _ in range(BENCHMARK_ROUNDS):
+        start = perf_counter()
+        func()
+        timings.append((perf_counter() - start) * 1000)
+
+    return median(timings)
+
+
+def _generate_feature_template() -> str:
+    lines = ['Feature: benchmark', '    Scenario: benchmark']
+
+    for number in range(BENCHMARK_LINES - len(lines)):
+        if number % 100 == 0:
+            lines.append(f'    # {{% scenario "scenario-{number}", feature="./include.feature", name="{{{{ name }}}}" %}}')
+        else:
+            lines.append(f'        Then get request with name "{{{{ name }}}}-{number}" to endpoint "/api/{{{{ endpoint | default("test") }}}}/{number}"')
+
+    return '\n'.join(lines)
+
+
+def _generate_environment_template() -> str:
+    lines = ['configuration:']
+
+    for number in range(BENCHMARK_LINES - len(lines)):
+        if number % 100 == 0:
+            lines.append(f'  # {{% merge "./base-{number}.yaml" %}}')
+        else:
+            lines.append(f'  key{number}: "{{{{ value }}}}-{number}"')
+
+    return '\n'.join(lines)
+
+
+def test_template_filter(tmp_path_factory: TempPathFactory, baseline: Baseline) -> None:
+    test_context = tmp_path_factory.mktemp('benchmark_template_filter')
+    include_file = test_context / 'include.feature'
+
+    with include_file.open('w') as fd:
+        fd.write('Feature: include\n    Scenario: include\n')
+        for number in range(BENCHMARK_LINES - 2):
+            fd.write(f'        Then get request with name "{{$ name{number % BENCHMARK_VARIABLES} $}}" to endpoint "/api/{number}"\n')
+
+    variables = {f'name{number}': f'value{number}' for number in range(BENCHMARK_VARIABLES)}
+    feature_template = _generate_feature_template()
+    environment_template = _generate_environment_template()
+
+    try:
+        # make sure the included file has been indexed, only substitution is measured
+        scenario_text = ScenarioTag.render_scenario_text('include', './include.feature', include_file, variables, ignore_errors=False)
+        assert '{$' not in scenario_text
+
+        result = {
+            'scenario_filter_ms': _median_ms(lambda: Environment(autoescape=False, extensions=[ScenarioTag]).parse(feature_template)),
+            'merge_filter_ms': _median_ms(lambda: Environment(autoescape=False, extensions=[MergeYamlTag]).parse(environment_template)),
+            'substitute_ms': _median_ms(
+                lambda: ScenarioTag.render_scenario_text('include', './include.feature', include_file, variables, ignore_errors=False),
+            ),
+            'lines': BENCHMARK_LINES,
+            'variables': BENCHMARK_VARIABLES,
+        }
+    finally:
+        rm_rf(test_context)
+
+    key = f'lines={BENCHMARK_LINES},variables={BENCHMARK_VARIABLES}'
+    regressions = baseline.compare(key, result, 'scenario_filter_ms', 'merge_filter_ms', 'substitute_ms')
+
+    summary = ', '.join(f'{metric} {result[metric]:.2f}' for metric in ['scenario_filter_ms', 'merge_filter_ms', 'substitute_ms'])
+    assert regressions == [], f'{key} is slower than baseline ({summary}):\n' + '\n'.join(regressions)
@@ -12,6 +12,7 @@ from tests.fixtures import (
 
 if TYPE_CHECKING:  # pragma: no cover
     from collections.abc import Generator
+    from pathlib import Path
 
     from _pytest.config import Config
     from _pytest.fixtures import SubRequest
@@ -41,6 +42,17 @@ def pytest_collection_modifyitems(items: list[pytest.Function]) -> None:
             item.add_marker(pytest.mark.timeout(PYTEST_TIMEOUT))
 
 
+@pytest.fixture(scope='session')
+def _cache_dir_session(tmp_path_factory: TempPathFactory) -> Path:
+    return tmp_path_factory.mktemp('cache')
+
+
+@pytest.fixture(autouse=True)
+def _cache_dir(_cache_dir_session: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Do not use, or pollute, the users cache directory when running tests."""
+    monkeypatch.setenv('GRIZZLY_CLI_CACHE_DIR', _cache_dir_session.as_posix())
+
+
 def _e2e_fixture(tmp_path_factory: TempPathFactory, request: SubRequest) -> Generator[End2EndFixture, None, None]:
     distributed = request.param if hasattr(request, 'param') else E2E_RUN_MODE == 'dist'
 
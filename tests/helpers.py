@@ -13,10 +13,13 @@ from setuptools_scm import Configuration as SetuptoolsScmConfiguration
 from setuptools_scm._cli import _get_version as setuptools_scm_get_version
 
 from grizzly_cli.utils import rm_rf
+from grizzly_cli.utils.feature import FeatureAnalysis, ScenarioRecord
 
 if TYPE_CHECKING:
     from collections.abc import Generator
 
+    from pytest_mock import MockerFixture
+
 __all__ = ['rm_rf']
 
 
@@ -107,6 +110,17 @@ def create_scenario(name: str, background_steps: list[str], steps: list[str]) ->
     return scenario
 
 
+def mock_feature_analysis(mocker: MockerFixture, scenarios: list[Scenario], description: Optional[str] = None) -> FeatureAnalysis:
+    """All feature files will be analysed as a feature with `scenarios`."""
+    analysis = FeatureAnalysis(Path('test.feature'), '')
+    analysis.scenarios = [ScenarioRecord.from_scenario(scenario) for scenario in scenarios]
+    analysis.description = description
+
+    mocker.patch('grizzly_cli.utils.feature.FeatureAnalysis.analyse', return_value=analysis)
+
+    return analysis
+
+
 def get_current_version() -> str:
     root = (Path(__file__).parent / '..').resolve()
 
@@ -2,15 +2,20 @@ from __future__ import annotations
 
 import argparse
 import inspect
+import subprocess
+import sys
 from os.path import sep
 from pathlib import Path
+from shlex import quote
+from shutil import which
 from typing import TYPE_CHECKING, Optional
 
 import pytest
 
 from grizzly_cli.__main__ import _create_parser
 from grizzly_cli.argparse import ArgumentParser
-from grizzly_cli.argparse.bashcompletion import BashCompleteAction, BashCompletionAction, hook
+from grizzly_cli.argparse.bashcompletion import BashCompleteAction, BashCompletionAction, BashCompletionTypes, hook
+from grizzly_cli.argparse.bashcompletion.server import get_socket_path
 from tests.helpers import cwd, rm_rf
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -104,13 +109,117 @@ class TestBashCompletionAction:
         bash_script_path = Path(inspect.getfile(action.__class__)).parent / 'bashcompletion.bash'
 
         with bash_script_path.open(encoding='utf-8') as fd:
-            bash_script = fd.read().replace('bashcompletion_template', parser.prog) + '\n'
+            bash_script = (
+                fd.read()
+                .replace('bashcompletion_template', parser.prog)
+                .replace('bashcompletion_socket', get_socket_path().as_posix())
+                .replace('        bashcompletion_spec', """        [test-prog:-h]=flag
+        [test-prog:-h:removes]='-h --help'
+        [test-prog:--help]=flag
+        [test-prog:--help:removes]='-h --help'
+        [test-prog:suggestions]='-h --help'""")
+            ) + '\n'
 
         capture = capsys.readouterr()
         assert capture.err == ''
         assert capture.out == bash_script
 
 
+    def test_get_spec(self) -> None:
+        parser = argparse.ArgumentParser(prog='test-prog')
+        parser.add_argument('--flag', action='store_true')
+        parser.add_argument('-v', '--value', type=str)
+        parser.add_argument('-a', '--append', action='append', type=BashCompletionTypes.File('*.txt'))
+        parser.add_argument('--hidden', help=argparse.SUPPRESS)
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument('--foo', action='store_true')
+        group.add_argument('--bar', type=BashCompletionTypes.File('*.txt'))
+        sub_parser = parser.add_subparsers(dest='command')
+        sub_sub_parser = sub_parser.add_parser('sub')
+        sub_sub_parser.add_argument('--baz', action='store_const', const=1)
+        sub_sub_parser.add_argument('file', nargs='+', type=BashCompletionTypes.File('*.txt'))
+        sub_sub_parser.add_argument('name', type=str)
+
+        action = BashCompletionAction(['--bash-completion'])
+
+        assert action.get_spec(parser) == {
+            'test-prog:-h': 'flag',
+            'test-prog:-h:removes': '-h --help',
+            'test-prog:--help': 'flag',
+            'test-prog:--help:removes': '-h --help',
+            'test-prog:--flag': 'flag',
+            'test-prog:--flag:removes': '--flag',
+            'test-prog:-v': 'store',
+            'test-prog:-v:removes': '-v --value',
+            'test-prog:--value': 'store',
+            'test-prog:--value:removes': '-v --value',
+            'test-prog:-a': 'append-file',
+            'test-prog:-a:removes': '-a --append',
+            'test-prog:--append': 'append-file',
+            'test-prog:--append:removes': '-a --append',
+            'test-prog:--foo': 'flag',
+            'test-prog:--foo:removes': '--foo --bar',
+            'test-prog:--bar': 'store-file',
+            'test-prog:--bar:removes': '--bar --foo',
+            'test-prog:sub': 'command',
+            'test-prog sub:-h': 'flag',
+            'test-prog sub:-h:removes': '-h --help',
+            'test-prog sub:--help': 'flag',
+            'test-prog sub:--help:removes': '-h --help',
+            'test-prog sub:--baz': 'flag',
+            'test-prog sub:--baz:removes': '--baz',
+            'test-prog sub:files': 'file',
+            'test-prog sub:suggestions': '-h --help --baz',
+            'test-prog:suggestions': '-h --help --flag -v --value -a --append --foo --bar sub',
+        }
+
+    @pytest.mark.skipif(sys.platform == 'win32' or which('bash') is None, reason='bash is not available')
+    @pytest.mark.parametrize('command', [
+        'grizzly-cli ',
+        'grizzly-cli --',
+        'grizzly-cli local ',
+        'grizzly-cli local run -',
+        'grizzly-cli local run --dry-run -',
+        'grizzly-cli local run --dry-run --verbose -T key=value -',
+        'grizzly-cli local run -y --',
+        'grizzly-cli dist -',
+        'grizzly-cli dist --build -',
+        'grizzly-cli dist --workers 2 --validate-config --',
+        'grizzly-cli dist --workers 2 --validate-config ',
+        'grizzly-cli dist build --',
+        'grizzly-cli init --with-mq -',
+        'grizzly-cli keyvault --',
+        'grizzly-cli auth -',
+    ])
+    def test_spec_completion(self, command: str, capsys: CaptureFixture, tmp_path_factory: TempPathFactory) -> None:
+        """Completing options and sub-commands with the spec in bash should give the same result as `--bash-complete`."""
+        test_context = tmp_path_factory.mktemp('test_context')
+        parser = _create_parser()
+
+        try:
+            with pytest.raises(SystemExit):
+                parser.parse_args(['--bash-completion'])
+            bash_script = test_context / 'bashcompletion.bash'
+            bash_script.write_text(capsys.readouterr().out)
+
+            words = command.split(' ')
+            with pytest.raises(SystemExit):
+                parser.parse_args([*words[1:-1], f'--bash-complete={command}'])
+            expected = [suggestion for suggestion in capsys.readouterr().out.split('\n') if suggestion != '']
+
+            output = subprocess.check_output([
+                'bash',
+                '-c',
+                f'source "{bash_script.as_posix()}" && COMP_WORDS=({" ".join(quote(word) for word in words)}) && COMP_CWORD={len(words) - 1} && '
+                '_grizzly-cli && printf "%s\\n" "${COMPREPLY[@]}"',
+            ], text=True)
+            actual = [suggestion for suggestion in output.split('\n') if suggestion != '']
+
+            assert actual == expected
+        finally:
+            rm_rf(test_context)
+
+
 class TestBashCompleteAction:
     def test___init__(self) -> None:
         action = BashCompleteAction(['--bash-complete'])
@@ -216,7 +325,7 @@ class TestBashCompleteAction:
     @pytest.mark.parametrize(
         ('command', 'expected'),
         [
-            ('grizzly-cli ', '-h\n--help\n--version\ninit\nkeyvault\nlocal\ndist\nauth'),
+            ('grizzly-cli ', '-h\n--help\n--version\ninit\nkeyvault\nlocal\ndist\nauth\nrender\nvalidate'),
             ('grizzly-cli -', '-h\n--help\n--version'),
             ('grizzly-cli --', '--help\n--version'),
             ('grizzly-cli lo', 'local'),
@@ -237,25 +346,25 @@ class TestBashCompleteAction:
                 'grizzly-cli local run ',
                 (
                     '-h\n--help\n--verbose\n-T\n--testdata-variable\n-y\n--yes\n-e\n--environment-file\n--csv-prefix\n--csv-interval\n'
-                    '--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--dry-run\ntest.feature\ntest-dir'
+                    '--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--render-stats\n--watch\n--plan-users\n--plan-only\n--plan-format\n--dry-run\ntest.feature\ntest-dir'
                 ),
             ),
             (
                 'grizzly-cli local run -',
                 (
                     '-h\n--help\n--verbose\n-T\n--testdata-variable\n-y\n--yes\n-e\n--environment-file\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n-l\n--log-file\n'
-                    '--log-dir\n--dump\n--dry-run'
+                    '--log-dir\n--dump\n--render-stats\n--watch\n--plan-users\n--plan-only\n--plan-format\n--dry-run'
                 ),
             ),
             (
                 'grizzly-cli local run --',
-                '--help\n--verbose\n--testdata-variable\n--yes\n--environment-file\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n--log-file\n--log-dir\n--dump\n--dry-run',
+                '--help\n--verbose\n--testdata-variable\n--yes\n--environment-file\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n--log-file\n--log-dir\n--dump\n--render-stats\n--watch\n--plan-users\n--plan-only\n--plan-format\n--dry-run',
             ),
             (
                 'grizzly-cli local run --yes',
                 (
                     '-h\n--help\n--verbose\n-T\n--testdata-variable\n-e\n--environment-file\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n-l\n--log-file\n--log-dir\n'
-                    '--dump\n--dry-run'
+                    '--dump\n--render-stats\n--watch\n--plan-users\n--plan-only\n--plan-format\n--dry-run'
                 ),
             ),
             ('grizzly-cli local run --help --yes', ''),
@@ -264,7 +373,7 @@ class TestBashCompleteAction:
                 'grizzly-cli local run --yes -T key=value',
                 (
                     '-h\n--help\n--verbose\n-T\n--testdata-variable\n-e\n--environment-file\n--csv-prefix\n--csv-interval\n'
-                    '--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--dry-run\ntest.feature\ntest-dir'
+                    '--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--render-stats\n--watch\n--plan-users\n--plan-only\n--plan-format\n--dry-run\ntest.feature\ntest-dir'
                 ),
             ),
             ('grizzly-cli local run --yes -T key=value --env', '--environment-file'),
@@ -273,19 +382,19 @@ class TestBashCompleteAction:
             ('grizzly-cli local run --yes -T key=value --environment-file test-', 'test-dir'),
             (
                 'grizzly-cli local run --yes -T key=value --environment-file test-dir',
-                '-h\n--help\n--verbose\n-T\n--testdata-variable\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--dry-run',
+                '-h\n--help\n--verbose\n-T\n--testdata-variable\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--render-stats\n--watch\n--plan-users\n--plan-only\n--plan-format\n--dry-run',
             ),
             ('grizzly-cli local run --yes -T key=value --environment-file test.', 'test.yaml'),
             (
                 'grizzly-cli local run --yes -T key=value --environment-file test.yaml',
-                '-h\n--help\n--verbose\n-T\n--testdata-variable\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--dry-run',
+                '-h\n--help\n--verbose\n-T\n--testdata-variable\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--render-stats\n--watch\n--plan-users\n--plan-only\n--plan-format\n--dry-run',
             ),
             ('grizzly-cli local run --yes -T key=value --environment-file test.yaml --test', '--testdata-variable'),
             ('grizzly-cli local run --yes -T key=value --environment-file test.yaml --testdata-variable', ''),
             (
                 'grizzly-cli local run --yes -T key=value --environment-file test.yaml --testdata-variable key=value',
                 (
-                    '-h\n--help\n--verbose\n-T\n--testdata-variable\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--dry-run\n'
+                    '-h\n--help\n--verbose\n-T\n--testdata-variable\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--render-stats\n--watch\n--plan-users\n--plan-only\n--plan-format\n--dry-run\n'
                     'test.feature\ntest-dir'
                 ),
             ),
@@ -298,7 +407,7 @@ class TestBashCompleteAction:
             ),
             (
                 f'grizzly-cli local run --yes -T key=value --environment-file test.yaml --testdata-variable key=value test-dir{sep}test.feature',
-                '-h\n--help\n--verbose\n-T\n--testdata-variable\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--dry-run',
+                '-h\n--help\n--verbose\n-T\n--testdata-variable\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--render-stats\n--watch\n--plan-users\n--plan-only\n--plan-format\n--dry-run',
             ),
             ('grizzly-cli local run --yes -T key=value --environment-file test.yaml --testdata-variable key=value test.fe', 'test.feature'),
             ('grizzly-cli local run --yes -T key=value --environment-file test.yaml --testdata-variable key=value --help', ''),
@@ -352,25 +461,25 @@ class TestBashCompleteAction:
                 'grizzly-cli dist run ',
                 (
                     '-h\n--help\n--verbose\n-T\n--testdata-variable\n-y\n--yes\n-e\n--environment-file\n'
-                    '--csv-prefix\n--csv-interval\n--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--dry-run\ntest.feature\ntest-dir'
+                    '--csv-prefix\n--csv-interval\n--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--render-stats\n--watch\n--plan-users\n--plan-only\n--plan-format\n--dry-run\ntest.feature\ntest-dir'
                 ),
             ),
             (
                 'grizzly-cli dist run -',
                 (
                     '-h\n--help\n--verbose\n-T\n--testdata-variable\n-y\n--yes\n-e\n--environment-file\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n-l\n'
-                    '--log-file\n--log-dir\n--dump\n--dry-run'
+                    '--log-file\n--log-dir\n--dump\n--render-stats\n--watch\n--plan-users\n--plan-only\n--plan-format\n--dry-run'
                 ),
             ),
             (
                 'grizzly-cli dist run --',
-                '--help\n--verbose\n--testdata-variable\n--yes\n--environment-file\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n--log-file\n--log-dir\n--dump\n--dry-run',
+                '--help\n--verbose\n--testdata-variable\n--yes\n--environment-file\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n--log-file\n--log-dir\n--dump\n--render-stats\n--watch\n--plan-users\n--plan-only\n--plan-format\n--dry-run',
             ),
             (
                 'grizzly-cli dist run --yes',
                 (
                     '-h\n--help\n--verbose\n-T\n--testdata-variable\n-e\n--environment-file\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n'
-                    '-l\n--log-file\n--log-dir\n--dump\n--dry-run'
+                    '-l\n--log-file\n--log-dir\n--dump\n--render-stats\n--watch\n--plan-users\n--plan-only\n--plan-format\n--dry-run'
                 ),
             ),
             ('grizzly-cli dist run --help --yes', ''),
@@ -379,7 +488,7 @@ class TestBashCompleteAction:
                 'grizzly-cli dist run --yes -T key=value',
                 (
                     '-h\n--help\n--verbose\n-T\n--testdata-variable\n-e\n--environment-file\n--csv-prefix\n--csv-interval\n'
-                    '--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--dry-run\ntest.feature\ntest-dir'
+                    '--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--render-stats\n--watch\n--plan-users\n--plan-only\n--plan-format\n--dry-run\ntest.feature\ntest-dir'
                 ),
             ),
             ('grizzly-cli dist run --yes -T key=value --env', '--environment-file'),
@@ -388,12 +497,12 @@ class TestBashCompleteAction:
             ('grizzly-cli dist run --yes -T key=value --environment-file test-', 'test-dir'),
             (
                 'grizzly-cli dist run --yes -T key=value --environment-file test-dir',
-                '-h\n--help\n--verbose\n-T\n--testdata-variable\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--dry-run',
+                '-h\n--help\n--verbose\n-T\n--testdata-variable\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--render-stats\n--watch\n--plan-users\n--plan-only\n--plan-format\n--dry-run',
             ),
             ('grizzly-cli dist run --yes -T key=value --environment-file test.', 'test.yaml'),
             (
                 'grizzly-cli dist run --yes -T key=value --environment-file test.yaml',
-                '-h\n--help\n--verbose\n-T\n--testdata-variable\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--dry-run',
+                '-h\n--help\n--verbose\n-T\n--testdata-variable\n--csv-prefix\n--csv-interval\n--csv-flush-interval\n-l\n--log-file\n--log-dir\n--dump\n--render-stats\n--watch\n--plan-users\n--plan-only\n--plan-format\n--dry-run',
             ),
             ('grizzly-cli dist run --yes -T key=value --environment-file test.yaml --test', '--testdata-variable'),
             ('grizzly-cli dist run --yes -T key=value --environment-file test.yaml --testdata-variable', ''),
@@ -401,7 +510,7 @@ class TestBashCompleteAction:
                 'grizzly-cli dist run --yes -T key=value --environment-file test.yaml --testdata-variable key=value',
                 (
                     '-h\n--help\n--verbose\n-T\n--testdata-variable\n--csv-prefix\n--csv-interval\n--csv-flush-interval\ntest.feature\ntest-dir\n-l\n--log-file\n'
-                    '--log-dir\n--dump\n--dry-run'
+                    '--log-dir\n--dump\n--render-stats\n--watch\n--plan-users\n--plan-only\n--plan-format\n--dry-run'
                 ),
             ),
             ('grizzly-cli dist run --yes -T key=value --environment-file test.yaml --testdata-variable key=value test', 'test.feature\ntest-dir'),
@@ -457,21 +566,21 @@ class TestBashCompleteAction:
             (
                 'grizzly-cli dist',
                 (
-                    '-h\n--help\n--workers\n--id\n--limit-nofile\n--health-retries\n--health-timeout\n--health-interval\n--registry\n'
+                    '-h\n--help\n--workers\n--users-per-worker\n--id\n--limit-nofile\n--health-retries\n--health-timeout\n--health-interval\n--registry\n'
                     '--tty\n--wait-for-worker\n--project-name\n--force-build\n--build\n--validate-config\nbuild\nclean\nrun'
                 ),
             ),
             (
                 'grizzly-cli dist -',
                 (
-                    '-h\n--help\n--workers\n--id\n--limit-nofile\n--health-retries\n--health-timeout\n--health-interval\n--registry\n'
+                    '-h\n--help\n--workers\n--users-per-worker\n--id\n--limit-nofile\n--health-retries\n--health-timeout\n--health-interval\n--registry\n'
                     '--tty\n--wait-for-worker\n--project-name\n--force-build\n--build\n--validate-config'
                 ),
             ),
             (
                 'grizzly-cli dist --',
                 (
-                    '--help\n--workers\n--id\n--limit-nofile\n--health-retries\n--health-timeout\n--health-interval\n--registry\n'
+                    '--help\n--workers\n--users-per-worker\n--id\n--limit-nofile\n--health-retries\n--health-timeout\n--health-interval\n--registry\n'
                     '--tty\n--wait-for-worker\n--project-name\n--force-build\n--build\n--validate-config'
                 ),
             ),
@@ -486,14 +595,21 @@ class TestBashCompleteAction:
             (
                 'grizzly-cli dist --workers 8',
                 (
-                    '-h\n--help\n--id\n--limit-nofile\n--health-retries\n--health-timeout\n--health-interval\n--registry\n--tty\n'
+                    '-h\n--help\n--users-per-worker\n--id\n--limit-nofile\n--health-retries\n--health-timeout\n--health-interval\n--registry\n--tty\n'
+                    '--wait-for-worker\n--project-name\n--force-build\n--build\n--validate-config\nbuild\nclean\nrun'
+                ),
+            ),
+            (
+                'grizzly-cli dist --workers auto',
+                (
+                    '-h\n--help\n--users-per-worker\n--id\n--limit-nofile\n--health-retries\n--health-timeout\n--health-interval\n--registry\n--tty\n'
                     '--wait-for-worker\n--project-name\n--force-build\n--build\n--validate-config\nbuild\nclean\nrun'
                 ),
             ),
             (
                 'grizzly-cli dist --workers 8 --force-build',
                 (
-                    '-h\n--help\n--id\n--limit-nofile\n--health-retries\n--health-timeout\n--health-interval\n--registry\n--tty\n'
+                    '-h\n--help\n--users-per-worker\n--id\n--limit-nofile\n--health-retries\n--health-timeout\n--health-interval\n--registry\n--tty\n'
                     '--wait-for-worker\n--project-name\nbuild\nclean\nrun'
                 ),
             ),
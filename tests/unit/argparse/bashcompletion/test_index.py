@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import json
+from os import utime
+from typing import TYPE_CHECKING
+
+from grizzly_cli.argparse.bashcompletion import index as index_module
+from grizzly_cli.argparse.bashcompletion.index import FileIndex, get_file_index, snapshot
+from tests.helpers import rm_rf
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pathlib import Path
+
+    from _pytest.tmpdir import TempPathFactory
+    from pytest_mock import MockerFixture
+
+
+def _age(*paths: Path) -> None:
+    # make sure mtimes are not considered racy, but still changes
+    for path in paths:
+        mtime_ns = path.stat().st_mtime_ns - 10_000_000_000
+        utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestFileIndex:
+    def test_refresh(self, tmp_path_factory: TempPathFactory, mocker: MockerFixture) -> None:
+        test_context = tmp_path_factory.mktemp('test_index')
+        (test_context / 'features').mkdir()
+        (test_context / 'features' / 'test.feature').touch()
+        (test_context / 'features' / 'steps').mkdir()
+        (test_context / 'features' / 'steps' / 'steps.py').touch()
+        (test_context / '.git').mkdir()
+        (test_context / '.git' / 'config').touch()
+        (test_context / '.hidden.feature').touch()
+        (test_context / 'README.md').touch()
+        _age(test_context, test_context / 'features', test_context / 'features' / 'steps')
+
+        try:
+            index = FileIndex(test_context)
+            scan_spy = mocker.spy(index, '_scan')
+
+            assert index.file.parent.name == 'completion'
+            assert index.refresh()
+            assert sorted(index.files()) == ['README.md', 'features/steps/steps.py', 'features/test.feature']
+            assert scan_spy.call_count == 3
+
+            # nothing changed, nothing is listed
+            scan_spy.reset_mock()
+            assert not index.refresh()
+            assert scan_spy.call_count == 0
+
+            # only the changed directory is listed
+            (test_context / 'features' / 'other.feature').touch()
+            _age(test_context / 'features')
+            assert index.refresh()
+            assert scan_spy.call_count == 1
+            assert sorted(index.files()) == ['README.md', 'features/other.feature', 'features/steps/steps.py', 'features/test.feature']
+
+            # removed directory
+            scan_spy.reset_mock()
+            rm_rf(test_context / 'features' / 'steps')
+            _age(test_context / 'features')
+            assert index.refresh()
+            assert scan_spy.call_count == 1
+            assert sorted(index.files()) == ['README.md', 'features/other.feature', 'features/test.feature']
+
+            # recently modified directories are always listed, mtime resolution might be too coarse to detect changes
+            scan_spy.reset_mock()
+            (test_context / 'features' / 'steps').mkdir()
+            assert index.refresh()
+            assert index.refresh()
+            assert scan_spy.call_count == 4
+        finally:
+            rm_rf(test_context)
+
+    def test_refresh_symlink(self, tmp_path_factory: TempPathFactory) -> None:
+        test_context = tmp_path_factory.mktemp('test_index')
+        library = tmp_path_factory.mktemp('test_index_library')
+        (library / 'library.feature').touch()
+        (test_context / 'features').mkdir()
+        (test_context / 'features' / 'test.feature').touch()
+        # directory outside of the tree, and a link back into the tree
+        (test_context / 'features' / 'library').symlink_to(library, target_is_directory=True)
+        (test_context / 'features' / 'loop').symlink_to(test_context, target_is_directory=True)
+
+        try:
+            index = FileIndex(test_context)
+
+            assert index.refresh()
+            assert sorted(index.files()) == ['features/library/library.feature', 'features/test.feature']
+            assert sorted(index.directories.keys()) == ['', 'features', 'features/library']
+        finally:
+            rm_rf(test_context)
+            rm_rf(library)
+
+    def test_refresh_prefix(self, tmp_path_factory: TempPathFactory, mocker: MockerFixture) -> None:
+        test_context = tmp_path_factory.mktemp('test_index')
+        for directory in ['features', 'features/sub', 'features-other', 'environments', 'node_modules/foo/bar']:
+            (test_context / directory).mkdir(parents=True)
+            (test_context / directory / 'test.txt').touch()
+        _age(*[path for path in test_context.rglob('*') if path.is_dir()], test_context)
+
+        try:
+            assert FileIndex.is_compatible('', 'foo')
+            assert FileIndex.is_compatible('features', '')
+            assert FileIndex.is_compatible('features', 'feat')
+            assert FileIndex.is_compatible('features', 'features/')
+            assert FileIndex.is_compatible('features', 'features/sub/te')
+            assert FileIndex.is_compatible('features/sub', 'features/')
+            assert not FileIndex.is_compatible('features', 'features-')
+            assert not FileIndex.is_compatible('environments', 'features/')
+            assert not FileIndex.is_compatible('features/sub', 'features/other/')
+
+            index = FileIndex(test_context)
+            scan_spy = mocker.spy(index, '_scan')
+
+            # only root, features and features/sub are walked
+            assert index.refresh('features/')
+            assert scan_spy.call_count == 3
+            assert sorted(index.files('features/')) == ['features/sub/test.txt', 'features/test.txt']
+
+            # the rest of the tree is added when needed, already walked parts are kept
+            scan_spy.reset_mock()
+            assert index.refresh('')
+            assert scan_spy.call_count == 5
+            assert sorted(index.files()) == [
+                'environments/test.txt',
+                'features-other/test.txt',
+                'features/sub/test.txt',
+                'features/test.txt',
+                'node_modules/foo/bar/test.txt',
+            ]
+
+            scan_spy.reset_mock()
+            assert not index.refresh('env')
+            assert scan_spy.call_count == 0
+            assert len(index.directories) == 8
+        finally:
+            rm_rf(test_context)
+
+    def test_load_save(self, tmp_path_factory: TempPathFactory) -> None:
+        test_context = tmp_path_factory.mktemp('test_index')
+        (test_context / 'features').mkdir()
+        (test_context / 'features' / 'test.feature').touch()
+        _age(test_context, test_context / 'features')
+
+        try:
+            index = FileIndex.load(test_context)
+            assert index.directories == {}
+
+            index.save()
+            assert not index.file.exists()
+
+            index.refresh()
+            index.save()
+            assert index.file.exists()
+            assert not index.changed
+
+            loaded = FileIndex.load(test_context)
+            assert loaded.directories == index.directories
+            assert not loaded.refresh()
+
+            # index for another directory, or an older version, is ignored
+            data = json.loads(index.file.read_text())
+            data['version'] = 0
+            index.file.write_text(json.dumps(data))
+            assert FileIndex.load(test_context).directories == {}
+
+            index.file.write_text('{"version": 1, "root": ')
+            assert FileIndex.load(test_context).directories == {}
+        finally:
+            rm_rf(test_context)
+
+
+def test_get_file_index(tmp_path_factory: TempPathFactory, mocker: MockerFixture) -> None:
+    test_context = tmp_path_factory.mktemp('test_index')
+    (test_context / 'test.feature').touch()
+    mocker.patch.object(index_module, '_indexes', {})
+    refresh_spy = mocker.spy(FileIndex, 'refresh')
+
+    try:
+        index = get_file_index(test_context)
+        assert list(index.files()) == ['test.feature']
+        assert refresh_spy.call_count == 1
+        assert index.file.exists()
+
+        # same in-memory index, refreshed on each call
+        assert get_file_index(test_context) is index
+        assert refresh_spy.call_count == 2
+
+        # ...unless in a snapshot
+        with snapshot():
+            get_file_index(test_context)
+            get_file_index(test_context)
+            get_file_index(test_context)
+        assert refresh_spy.call_count == 3
+    finally:
+        rm_rf(test_context)
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import os
+import socket
+import sys
+from pathlib import Path
+from threading import Thread
+from time import sleep
+from typing import TYPE_CHECKING
+
+import pytest
+
+from grizzly_cli.__main__ import _create_parser
+from grizzly_cli.argparse.bashcompletion.server import complete, get_socket_path, serve
+from tests.helpers import rm_rf
+
+if TYPE_CHECKING:  # pragma: no cover
+    from _pytest.capture import CaptureFixture
+    from _pytest.tmpdir import TempPathFactory
+    from pytest_mock import MockerFixture
+
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason='unix sockets are not available on windows')
+
+
+def _request(socket_path: Path, cwd: Path, command: str, current: str) -> str:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(5.0)
+        client.connect(socket_path.as_posix())
+        client.sendall(f'{cwd.as_posix()}\n{command}\n{current}\n'.encode())
+        client.shutdown(socket.SHUT_WR)
+
+        response: list[bytes] = []
+        while True:
+            chunk = client.recv(4096)
+            if not chunk:
+                break
+            response.append(chunk)
+
+    return b''.join(response).decode('utf-8')
+
+
+def test_get_socket_path(mocker: MockerFixture, tmp_path_factory: TempPathFactory) -> None:
+    test_context = tmp_path_factory.mktemp('test_context')
+    mocker.patch('grizzly_cli.argparse.bashcompletion.server.getuser', return_value='foobar')
+
+    try:
+        mocker.patch.dict('os.environ', {'XDG_RUNTIME_DIR': test_context.as_posix()})
+        assert get_socket_path() == test_context / 'grizzly-cli-foobar' / 'completion.sock'
+
+        mocker.patch.dict('os.environ', {'XDG_RUNTIME_DIR': ''})
+        mocker.patch('grizzly_cli.argparse.bashcompletion.server.gettempdir', return_value='/opt/foo')
+        assert get_socket_path() == Path('/opt/foo/grizzly-cli-foobar/completion.sock')
+    finally:
+        rm_rf(test_context)
+
+
+def test_complete(tmp_path_factory: TempPathFactory) -> None:
+    test_context = tmp_path_factory.mktemp('test_context')
+    (test_context / 'features').mkdir()
+    (test_context / 'features' / 'test.feature').touch()
+    original_cwd = Path.cwd()
+    parser = _create_parser()
+
+    try:
+        assert complete(parser, test_context.as_posix(), 'grizzly-cli', '').split('\n') == [
+            '-h', '--help', '--version', 'init', 'local', 'auth', 'dist', 'keyvault', 'render', 'validate', '',
+        ]
+        assert complete(parser, test_context.as_posix(), 'grizzly-cli local run', 'features/').strip() == 'features/test.feature'
+
+        # same parser, different directory
+        other_context = test_context / 'other'
+        other_context.mkdir()
+        (other_context / 'other.feature').touch()
+        assert complete(parser, other_context.as_posix(), 'grizzly-cli local run', '').strip().split('\n')[-1] == 'other.feature'
+
+        assert complete(parser, (test_context / 'does-not-exist').as_posix(), 'grizzly-cli', '') == ''
+    finally:
+        os.chdir(original_cwd)
+        rm_rf(test_context)
+
+
+def test_serve(tmp_path_factory: TempPathFactory) -> None:
+    test_context = tmp_path_factory.mktemp('test_context')
+    (test_context / 'features').mkdir()
+    (test_context / 'features' / 'test.feature').touch()
+    # unix socket paths has a max length, tmp_path_factory paths can be too long
+    socket_path = Path(f'/tmp/grizzly-cli-test-{id(test_context)}') / 'completion.sock'  # noqa: S108
+    original_cwd = Path.cwd()
+    parser = _create_parser()
+
+    thread = Thread(target=serve, args=(parser, socket_path, 1.0), daemon=True)
+
+    try:
+        thread.start()
+
+        for _ in range(50):
+            if socket_path.exists():
+                break
+            sleep(0.05)
+
+        assert socket_path.exists()
+        assert oct(socket_path.stat().st_mode & 0o777) == oct(0o600)
+
+        assert _request(socket_path, test_context, 'grizzly-cli local run', 'features/').strip() == 'features/test.feature'
+        assert _request(socket_path, test_context, 'grizzly-cli', '').split('\n') == [
+            '-h', '--help', '--version', 'init', 'local', 'auth', 'dist', 'keyvault', 'render', 'validate', '',
+        ]
+
+        # only one server per socket
+        with pytest.raises(ValueError, match='completion server is already running on'):
+            serve(parser, socket_path, 1.0)
+
+        # stops when idle
+        thread.join(timeout=5.0)
+        assert not thread.is_alive()
+        assert not socket_path.exists()
+        assert Path.cwd() == original_cwd
+
+        # stale socket file is removed
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+            stale.bind(socket_path.as_posix())
+
+        assert socket_path.exists()
+        serve(parser, socket_path, 0.1)
+        assert not socket_path.exists()
+    finally:
+        rm_rf(socket_path.parent)
+        rm_rf(test_context)
+
+
+def test_serve_directory(tmp_path_factory: TempPathFactory, mocker: MockerFixture, capsys: CaptureFixture) -> None:
+    test_context = tmp_path_factory.mktemp('test_context')
+    socket_directory = Path(f'/tmp/grizzly-cli-test-{id(test_context)}')  # noqa: S108
+    socket_path = socket_directory / 'completion.sock'
+    parser = _create_parser()
+    message = f'{socket_directory.as_posix()} is not a directory only accessible by the current user, completion server is not started'
+
+    try:
+        # created by someone else
+        socket_directory.mkdir(mode=0o700)
+        mocker.patch('grizzly_cli.argparse.bashcompletion.server.os.getuid', return_value=os.getuid() + 1)
+
+        with pytest.raises(ValueError, match=message):
+            serve(parser, socket_path, 0.1)
+
+        mocker.stopall()
+
+        # accessible by others
+        socket_directory.chmod(0o755)
+
+        with pytest.raises(ValueError, match=message):
+            serve(parser, socket_path, 0.1)
+
+        # symbolic link to a directory
+        socket_directory.rmdir()
+        (test_context / 'directory').mkdir(mode=0o700)
+        socket_directory.symlink_to(test_context / 'directory')
+
+        with pytest.raises(ValueError, match=message):
+            serve(parser, socket_path, 0.1)
+
+        assert not socket_path.exists()
+
+        # reported as an error, not a traceback
+        mocker.patch('grizzly_cli.argparse.bashcompletion.server.get_socket_path', return_value=socket_path)
+
+        with pytest.raises(SystemExit) as se:
+            parser.parse_args(['--bash-completion-server'])
+        assert se.value.code == 1
+
+        capture = capsys.readouterr()
+        assert capture.out == ''
+        assert capture.err == f'{message}\n'
+    finally:
+        socket_directory.unlink(missing_ok=True)
+        rm_rf(test_context)
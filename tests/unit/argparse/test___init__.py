@@ -41,21 +41,21 @@ class TestArgumentParser:
 
         assert parser.markdown_help
         assert parser.bash_completion
-        assert len(parser._actions) == 3
+        assert len(parser._actions) == 4
 
         option_strings = [option for action in parser._actions for option in action.option_strings]
 
-        assert option_strings == ['-h', '--help', '--md-help', '--bash-completion']
+        assert option_strings == ['-h', '--help', '--md-help', '--bash-completion', '--bash-completion-server']
 
         parser = ArgumentParser(bash_completion=True, description='test parser')
 
         assert not parser.markdown_help
         assert parser.bash_completion
-        assert len(parser._actions) == 2
+        assert len(parser._actions) == 3
 
         option_strings = [option for action in parser._actions for option in action.option_strings]
 
-        assert option_strings == ['-h', '--help', '--bash-completion']
+        assert option_strings == ['-h', '--help', '--bash-completion', '--bash-completion-server']
 
         parser = ArgumentParser(markdown_help=True, description='test parser')
 
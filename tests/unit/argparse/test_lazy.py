@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable
+
+import pytest
+
+from grizzly_cli.argparse import ArgumentParser
+from grizzly_cli.argparse.lazy import LazyParserMap, LazySubParsersAction
+
+if TYPE_CHECKING:  # pragma: no cover
+    from argparse import ArgumentParser as CoreArgumentParser
+    from argparse import _SubParsersAction
+
+    from _pytest.capture import CaptureFixture
+
+
+class TestLazyParserMap:
+    def test_lazy(self, capsys: CaptureFixture) -> None:
+        created: list[str] = []
+
+        def create_parser(name: str) -> Callable[[_SubParsersAction], None]:
+            def wrapped(sub_parser: _SubParsersAction) -> None:
+                created.append(name)
+                parser = sub_parser.add_parser(name)
+                parser.add_argument('--value', type=int, default=None)
+
+            return wrapped
+
+        parser = ArgumentParser(prog='test-prog')
+        sub_parser = parser.add_subparsers(dest='command')
+
+        assert isinstance(sub_parser, LazySubParsersAction)
+        assert isinstance(sub_parser.choices, LazyParserMap)
+
+        sub_parser.add_lazy_parser('a', create_parser('a'))
+        sub_parser.add_lazy_parser('b', create_parser('b'))
+
+        with pytest.raises(ValueError, match='conflicting subparser: b'):
+            sub_parser.add_lazy_parser('b', create_parser('b'))
+
+        assert list(sub_parser.choices) == ['a', 'b']
+        assert len(sub_parser.choices) == 2
+        assert 'a' in sub_parser.choices
+        assert 'c' not in sub_parser.choices
+        assert created == []
+
+        # usage does not create any parsers
+        with pytest.raises(SystemExit):
+            parser.parse_args(['c'])
+        capture = capsys.readouterr()
+        assert '{a,b}' in capture.err
+        assert created == []
+
+        args = parser.parse_args(['b', '--value', '10'])
+        assert args.command == 'b'
+        assert args.value == 10
+        assert created == ['b']
+
+        args = parser.parse_args(['b'])
+        assert args.value is None
+        assert created == ['b']
+
+        hooked: list[CoreArgumentParser] = []
+        sub_parser.choices.add_hook(hooked.append)
+        assert [hooked_parser.prog for hooked_parser in hooked] == ['test-prog b']
+
+        assert [name for name, _ in sub_parser.choices.items()] == ['a', 'b']
+        assert created == ['b', 'a']
+        assert [hooked_parser.prog for hooked_parser in hooked] == ['test-prog b', 'test-prog a']
+
+        del sub_parser.choices['a']
+        assert list(sub_parser.choices) == ['b']
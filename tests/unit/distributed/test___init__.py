@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 import sys
-from argparse import ArgumentParser, Namespace
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
 from contextlib import suppress
 from datetime import datetime, timezone
 from os import environ
@@ -11,7 +11,7 @@ from typing import TYPE_CHECKING
 
 import pytest
 
-from grizzly_cli.distributed import create_parser, distributed, distributed_run
+from grizzly_cli.distributed import create_parser, distributed, distributed_run, worker_count
 from grizzly_cli.utils import RunCommandResult, rm_rf
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -20,6 +20,19 @@ if TYPE_CHECKING:  # pragma: no cover
     from pytest_mock import MockerFixture
 
 
+def test_worker_count() -> None:
+    assert worker_count('auto') == 'auto'
+    assert worker_count('1') == 1
+    assert worker_count('10') == 10
+
+    for value in ['0', '-1']:
+        with pytest.raises(ArgumentTypeError, match='must be at least 1, or auto'):
+            worker_count(value)
+
+    with pytest.raises(ValueError, match='invalid literal for int'):
+        worker_count('foo')
+
+
 def test_distributed(mocker: MockerFixture) -> None:
     run_mocked = mocker.patch('grizzly_cli.distributed.run', return_value=0)
     build_mocked = mocker.patch('grizzly_cli.distributed.do_build', return_value=5)
@@ -113,7 +126,7 @@ def test_distributed_run(capsys: CaptureFixture, mocker: MockerFixture, tmp_path
 
         run_command_mock.return_value = RunCommandResult(return_code=0)
         do_build_mock.return_value = 255
-        check_output_mock.return_value = '{}'
+        check_output_mock.side_effect = ['{}', '']
         get_default_mtu_mock.return_value = None
         list_images_mock.return_value = {}
 
@@ -173,7 +186,7 @@ def test_distributed_run(capsys: CaptureFixture, mocker: MockerFixture, tmp_path
         run_command_mock.side_effect = [RunCommandResult(return_code=0), rcr, RunCommandResult(return_code=0)]
         do_build_mock.return_value = 0
         check_output_mock.return_value = None
-        check_output_mock.side_effect = ['{}', '{}', '<!-- here is the missing logs -->']
+        check_output_mock.side_effect = ['{}', '', '{}', '<!-- here is the missing logs -->']
         get_default_mtu_mock.return_value = '1400'
         list_images_mock.return_value = {'grizzly-cli-test-project': {'test-user': {}}}
 
@@ -320,6 +333,24 @@ def test_distributed_run(capsys: CaptureFixture, mocker: MockerFixture, tmp_path
         assert environ.get('LOCUST_WAIT_FOR_WORKERS_REPORT_AFTER_RAMP_UP', None) == '1.25 * WORKER_REPORT_INTERVAL'
         assert environ.get('GRIZZLY_MOUNT_PATH', None) == 'execution-context'
 
+        # compose project is already running
+        arguments = parser.parse_args(['dist', '--workers', '1', 'run', f'{test_context}/test.feature'])
+        setattr(arguments, 'container_system', 'docker')  # noqa: B010
+        setattr(arguments, 'file', ' '.join(arguments.file))  # noqa: B010
+
+        run_command_mock.side_effect = [RunCommandResult(return_code=0)]
+        check_output_mock.side_effect = ['{}', 'f00b4r\n']
+
+        assert distributed_run(arguments, {}, {'master': [], 'worker': [], 'common': []}) == 1
+        capture = capsys.readouterr()
+        assert capture.err == ''
+        assert capture.out == '!! grizzly-cli-test-project-test-user is already running, use --id to run more than one instance at the same time\n'
+
+        # only config, containers was not started
+        assert run_command_mock.call_count == 7
+        args, _ = check_output_mock.call_args_list[-1]
+        assert args[0] == ['docker', 'ps', '--quiet', '--filter', 'label=com.docker.compose.project=grizzly-cli-test-project-test-user']
+
     finally:
         rm_rf(test_context)
 
@@ -33,9 +33,26 @@ def test___import__(tmp_path_factory: TempPathFactory, mocker: MockerFixture) ->
             assert grizzly_cli.MOUNT_CONTEXT == '/srv/grizzly'
             assert static_context.as_posix() == grizzly_cli.STATIC_CONTEXT
             assert test_context.name == grizzly_cli.PROJECT_NAME
-            assert len(grizzly_cli.SCENARIOS) == 0
     finally:
         rm_rf(test_context)
 
         with suppress(KeyError):
             del environ['GRIZZLY_MOUNT_CONTEXT']
+
+
+def test_get_cache_dir(mocker: MockerFixture) -> None:
+    from grizzly_cli import get_cache_dir  # noqa: PLC0415
+
+    mocker.patch.dict(environ, {'GRIZZLY_CLI_CACHE_DIR': '/srv/cache'})
+    assert get_cache_dir() == Path('/srv/cache')
+
+    mocker.patch.dict(environ, {'GRIZZLY_CLI_CACHE_DIR': '', 'XDG_CACHE_HOME': '/home/foobar/.xdg-cache'})
+    mocker.patch('grizzly_cli.sys.platform', 'linux')
+    assert get_cache_dir() == Path('/home/foobar/.xdg-cache/grizzly-cli')
+
+    mocker.patch.dict(environ, {'XDG_CACHE_HOME': ''})
+    mocker.patch('grizzly_cli.Path.home', return_value=Path('/home/foobar'))
+    assert get_cache_dir() == Path('/home/foobar/.cache/grizzly-cli')
+
+    mocker.patch('grizzly_cli.sys.platform', 'darwin')
+    assert get_cache_dir() == Path('/home/foobar/Library/Caches/grizzly-cli')
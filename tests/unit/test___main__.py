@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import subprocess
 import sys
 from argparse import ArgumentParser as CoreArgumentParser
 from argparse import Namespace
@@ -10,7 +11,8 @@ from typing import TYPE_CHECKING, Optional, cast
 
 import pytest
 
-from grizzly_cli.__main__ import _create_parser, _inject_additional_arguments_from_metadata, _parse_arguments, main
+import grizzly_cli.__main__
+from grizzly_cli.__main__ import _create_parser, _find_feature_file, _inject_additional_arguments_from_metadata, _parse_arguments, main
 from tests.helpers import SOME, cwd, rm_rf
 
 if TYPE_CHECKING:
@@ -33,12 +35,13 @@ def test__create_parser() -> None:  # noqa: PLR0915
         '--version',
         '--md-help',
         '--bash-completion',
+        '--bash-completion-server',
     ])
     assert sorted([action.dest for action in parser._actions if len(action.option_strings) == 0]) == ['command']
     subparser = parser._subparsers._group_actions[0]
     assert subparser is not None
     assert subparser.choices is not None
-    assert len(cast('dict[str, Optional[CoreArgumentParser]]', subparser.choices).keys()) == 5
+    assert len(cast('dict[str, Optional[CoreArgumentParser]]', subparser.choices).keys()) == 7
 
     init_parser = cast('dict[str, Optional[CoreArgumentParser]]', subparser.choices).get('init', None)
     assert init_parser is not None
@@ -59,6 +62,31 @@ def test__create_parser() -> None:  # noqa: PLR0915
         '-h', '--help',
     ])
 
+    render_parser = cast('dict[str, Optional[CoreArgumentParser]]', subparser.choices).get('render', None)
+    assert render_parser is not None
+    assert render_parser._subparsers is None
+    assert getattr(render_parser, 'prog', None) == 'grizzly-cli render'
+    assert sorted([option_string for action in render_parser._actions for option_string in action.option_strings]) == sorted([
+        '-h', '--help',
+        '-o', '--out',
+        '-j', '--jobs',
+    ])
+    assert sorted([action.dest for action in render_parser._actions if len(action.option_strings) == 0]) == ['paths']
+
+    validate_parser = cast('dict[str, Optional[CoreArgumentParser]]', subparser.choices).get('validate', None)
+    assert validate_parser is not None
+    assert validate_parser._subparsers is None
+    assert getattr(validate_parser, 'prog', None) == 'grizzly-cli validate'
+    assert sorted([option_string for action in validate_parser._actions for option_string in action.option_strings]) == sorted([
+        '-h', '--help',
+        '-T', '--testdata-variable',
+        '-e', '--environment-file',
+        '-f', '--format',
+        '-o', '--out',
+        '-j', '--jobs',
+    ])
+    assert sorted([action.dest for action in validate_parser._actions if len(action.option_strings) == 0]) == ['paths']
+
     keyvault_parser = cast('dict[str, Optional[CoreArgumentParser]]', subparser.choices).get('keyvault', None)
     assert keyvault_parser is not None
     print(keyvault_parser._subparsers)
@@ -89,6 +117,7 @@ def test__create_parser() -> None:  # noqa: PLR0915
         '-h', '--help',
         '--force-build', '--build', '--validate-config',
         '--workers',
+        '--users-per-worker',
         '--id',
         '--limit-nofile',
         '--container-system',
@@ -147,6 +176,11 @@ def test__create_parser() -> None:  # noqa: PLR0915
             '--csv-prefix', '--csv-interval', '--csv-flush-interval',
             '-l', '--log-dir', '--log-file',
             '--dump',
+            '--render-stats',
+            '--watch',
+            '--plan-users',
+            '--plan-only',
+            '--plan-format',
             '--dry-run',
         ])
         assert sorted([action.dest for action in run_parser._actions if len(action.option_strings) == 0]) == ['file']
@@ -443,6 +477,84 @@ def test__parse_argument(capsys: CaptureFixture, mocker: MockerFixture, tmp_path
             assert getattr(parsed_args, 'csv_flush_interval', None) is None
             # // csv logging
 
+            # --watch
+            sys.argv = ['grizzly-cli', 'local', 'run', '--watch', 'test.feature']
+            mocker.patch('grizzly_cli.__main__.which', side_effect=['behave'])
+
+            with pytest.raises(SystemExit) as se:
+                _parse_arguments()
+            assert se.type is SystemExit
+            assert se.value.code == 2
+
+            capture = capsys.readouterr()
+            assert capture.out == ''
+            assert capture.err == 'grizzly-cli: error: --watch can only be used in combination with --dump or --dry-run\n'
+
+            sys.argv = ['grizzly-cli', 'local', 'run', '--watch', '--dump', 'test.feature']
+            mocker.patch('grizzly_cli.__main__.which', side_effect=['behave'])
+
+            parsed_args = _parse_arguments()
+
+            assert getattr(parsed_args, 'watch', False)
+            # // --watch
+
+            # --plan-users
+            sys.argv = ['grizzly-cli', 'local', 'run', '--plan-users', '10:5', 'test.feature']
+            mocker.patch('grizzly_cli.__main__.which', side_effect=['behave'])
+
+            with pytest.raises(SystemExit) as se:
+                _parse_arguments()
+            assert se.type is SystemExit
+            assert se.value.code == 2
+
+            capture = capsys.readouterr()
+            assert capture.out == ''
+            assert capture.err == (
+                'grizzly-cli: error: --plan-users: "10:5" is not a valid range of users, it needs to be in the format START:STOP[:STEP], e.g. 10:5000:10\n'
+            )
+
+            sys.argv = ['grizzly-cli', 'local', 'run', '--plan-users', '10:50:10', 'test.feature']
+            mocker.patch('grizzly_cli.__main__.which', side_effect=['behave'])
+
+            parsed_args = _parse_arguments()
+
+            assert getattr(parsed_args, 'plan_users', None) == range(10, 51, 10)
+            # // --plan-users
+
+            # --plan-only/--plan-format
+            sys.argv = ['grizzly-cli', 'local', 'run', '--plan-format', 'csv', 'test.feature']
+            mocker.patch('grizzly_cli.__main__.which', side_effect=['behave'])
+
+            with pytest.raises(SystemExit) as se:
+                _parse_arguments()
+            assert se.type is SystemExit
+            assert se.value.code == 2
+
+            capture = capsys.readouterr()
+            assert capture.out == ''
+            assert capture.err == 'grizzly-cli: error: --plan-format can only be used in combination with --plan-only\n'
+
+            sys.argv = ['grizzly-cli', 'local', 'run', '--plan-only', '--plan-users', '10:50:10', 'test.feature']
+            mocker.patch('grizzly_cli.__main__.which', side_effect=['behave'])
+
+            with pytest.raises(SystemExit) as se:
+                _parse_arguments()
+            assert se.type is SystemExit
+            assert se.value.code == 2
+
+            capture = capsys.readouterr()
+            assert capture.out == ''
+            assert capture.err == 'grizzly-cli: error: --plan-only cannot be used in combination with --plan-users\n'
+
+            sys.argv = ['grizzly-cli', 'local', 'run', '--plan-only', '--plan-format', 'csv', 'test.feature']
+            mocker.patch('grizzly_cli.__main__.which', side_effect=['behave'])
+
+            parsed_args = _parse_arguments()
+
+            assert getattr(parsed_args, 'plan_only', False)
+            assert getattr(parsed_args, 'plan_format', None) == 'csv'
+            # // --plan-only/--plan-format
+
             # -T/--testdata-variable
             sys.argv = ['grizzly-cli', 'local', 'run', '-T', 'variable', 'test.feature']
             mocker.patch('grizzly_cli.__main__.which', side_effect=['behave'])
@@ -496,55 +608,73 @@ def test__parse_argument(capsys: CaptureFixture, mocker: MockerFixture, tmp_path
         rm_rf(test_context)
 
 
-def test__inject_additional_arguments_from_metadata(tmp_path_factory: TempPathFactory, capsys: CaptureFixture, mocker: MockerFixture) -> None:
+def test__find_feature_file(tmp_path_factory: TempPathFactory) -> None:
+    test_context = tmp_path_factory.mktemp('test_context')
+    (test_context / 'features').mkdir()
+    (test_context / 'features' / 'test.feature').touch()
+    (test_context / 'features' / 'test space.feature').touch()
+    (test_context / 'test.yaml').touch()
+
+    try:
+        with cwd(test_context):
+            assert _find_feature_file(['local', 'run', 'features/test.feature']) == Path('features/test.feature')
+            assert _find_feature_file(['local', 'run', '-e', 'test.yaml', 'features/test.feature', '--dump']) == Path('features/test.feature')
+            assert _find_feature_file(['dist', '--workers', '2', 'run', '--verbose', 'features/test', 'space.feature']) == Path('features/test space.feature')
+            assert _find_feature_file(['dist', 'run', 'features/test space.feature']) == Path('features/test space.feature')
+            assert _find_feature_file(['local', 'run', 'features/missing.feature']) is None
+            assert _find_feature_file(['local', 'run', 'test.yaml']) is None
+            assert _find_feature_file(['dist', 'build']) is None
+            assert _find_feature_file(['keyvault', '--file', 'features/test.feature', 'run']) is None
+            assert _find_feature_file(['init', 'run']) is None
+            assert _find_feature_file(['--version']) is None
+    finally:
+        rm_rf(test_context)
+
+
+def test__inject_additional_arguments_from_metadata(tmp_path_factory: TempPathFactory, capsys: CaptureFixture, mocker: MockerFixture) -> None:  # noqa: PLR0915
     test_context = tmp_path_factory.mktemp('test_context')
 
     test_feature_file = test_context / 'test.feature'
     test_feature_file.touch()
-    mocker.patch('grizzly_cli.__main__.get_distributed_system', return_value='docker')
+    get_distributed_system_mock = mocker.patch('grizzly_cli.__main__.get_distributed_system', return_value='docker')
+    create_parser_spy = mocker.spy(grizzly_cli.__main__, '_create_parser')
 
     try:
         with cwd(test_context):
             test_feature_file.write_text('# grizzly-cli run --verbose\nFeature:\n')
-            sys.argv = ['grizzly-cli', 'dist', 'run', 'test.feature']
 
-            orig_args = _parse_arguments()
-            assert not orig_args.verbose
+            assert _inject_additional_arguments_from_metadata(['dist', 'run', 'test.feature']) == ['dist', 'run', '--verbose', 'test.feature']
 
-            args = _inject_additional_arguments_from_metadata(orig_args)
+            # arguments are injected before parsing, so everything is only done once
+            sys.argv = ['grizzly-cli', 'dist', 'run', 'test.feature']
+            args = _parse_arguments()
             capture = capsys.readouterr()
 
             assert capture.err == capture.out == ''
             assert args.verbose
+            assert sys.argv == ['grizzly-cli', 'dist', 'run', '--verbose', 'test.feature']
+            get_distributed_system_mock.assert_called_once_with()
+            assert create_parser_spy.call_count == 1
 
             test_feature_file.write_text('# grizzly-cli local --hello\nFeature:\n')
-            sys.argv = ['grizzly-cli', 'dist', 'run', 'test.feature']
+            argv = ['dist', 'run', 'test.feature']
 
-            orig_args = _parse_arguments()
-            args = _inject_additional_arguments_from_metadata(orig_args)
+            assert _inject_additional_arguments_from_metadata(argv) == argv
 
             capture = capsys.readouterr()
             assert capture.err == ''
             assert capture.out == '?? ignoring local --hello\n'
 
             test_feature_file.write_text('Feature:\n')
-            sys.argv = ['grizzly-cli', 'dist', 'run', 'test.feature']
-
-            orig_args = _parse_arguments()
-            args = _inject_additional_arguments_from_metadata(orig_args)
 
-            assert args is orig_args
+            assert _inject_additional_arguments_from_metadata(argv) is argv
 
             capture = capsys.readouterr()
             assert capture.err == capture.out == ''
 
             test_feature_file.write_text('# grizzly-cli --health-timeout 100\nFeature:\n')
-            sys.argv = ['grizzly-cli', 'dist', 'run', 'test.feature']
-
-            orig_args = _parse_arguments()
-            args = _inject_additional_arguments_from_metadata(orig_args)
 
-            assert args.health_timeout == orig_args.health_timeout
+            assert _inject_additional_arguments_from_metadata(argv) == argv
 
             capture = capsys.readouterr()
             assert capture.err == ''
@@ -553,8 +683,7 @@ def test__inject_additional_arguments_from_metadata(tmp_path_factory: TempPathFa
             test_feature_file.write_text('# grizzly-cli dist --health-timeout 100 --health-retries 101\nFeature:\n# grizzly-cli dist --health-interval 5\n')
             sys.argv = ['grizzly-cli', 'dist', 'run', 'test.feature']
 
-            orig_args = _parse_arguments()
-            args = _inject_additional_arguments_from_metadata(orig_args)
+            args = _parse_arguments()
 
             assert args.health_timeout == 100
             assert args.health_retries == 101
@@ -562,18 +691,33 @@ def test__inject_additional_arguments_from_metadata(tmp_path_factory: TempPathFa
 
             capture = capsys.readouterr()
             assert capture.err == capture.out == ''
+
+            # nothing is injected when completing, messages would be part of the suggestions
+            test_feature_file.write_text('# grizzly-cli local --hello\nFeature:\n')
+            argv = ['dist', 'run', 'test.feature', '--bash-complete=grizzly-cli dist run test.feature --plan-']
+
+            assert _inject_additional_arguments_from_metadata(argv) is argv
+
+            sys.argv = ['grizzly-cli', *argv]
+
+            with pytest.raises(SystemExit) as se:
+                _parse_arguments()
+            assert se.value.code == 0
+
+            capture = capsys.readouterr()
+            assert capture.err == ''
+            assert capture.out == '--plan-users\n--plan-only\n--plan-format\n'
+
+            # keyvault --file is not a feature file
+            assert _inject_additional_arguments_from_metadata(['keyvault', '--file', 'test.feature', 'dist']) == ['keyvault', '--file', 'test.feature', 'dist']
     finally:
         rm_rf(test_context)
 
 
 def test_main(mocker: MockerFixture, capsys: CaptureFixture) -> None:
-    local_mock = mocker.patch('grizzly_cli.__main__.local', side_effect=[0])
-    dist_mock = mocker.patch('grizzly_cli.__main__.distributed', side_effect=[1337, 1373])
-    init_mock = mocker.patch('grizzly_cli.__main__.init', side_effect=[7331])
-    inject_additional_arguments_from_metadata_mock = mocker.patch(
-        'grizzly_cli.__main__._inject_additional_arguments_from_metadata',
-        return_value=Namespace(command='dist', file='test.feature'),
-    )
+    local_mock = mocker.patch('grizzly_cli.local.local', side_effect=[0])
+    dist_mock = mocker.patch('grizzly_cli.distributed.distributed', side_effect=[1337, 1373])
+    init_mock = mocker.patch('grizzly_cli.init.init', side_effect=[7331])
     mocker.patch('grizzly_cli.__main__._parse_arguments', side_effect=[
         Namespace(command='local'),
         Namespace(command='dist'),
@@ -589,21 +733,18 @@ def test_main(mocker: MockerFixture, capsys: CaptureFixture) -> None:
     local_mock.reset_mock()
     dist_mock.assert_not_called()
     init_mock.assert_not_called()
-    inject_additional_arguments_from_metadata_mock.assert_not_called()
 
     assert main() == 1337
     local_mock.assert_not_called()
     dist_mock.assert_called_once_with(SOME(Namespace, command='dist'))
     dist_mock.reset_mock()
     init_mock.assert_not_called()
-    inject_additional_arguments_from_metadata_mock.assert_not_called()
 
     assert main() == 7331
     local_mock.assert_not_called()
     dist_mock.assert_not_called()
     init_mock.assert_called_once_with(SOME(Namespace, command='init'))
     init_mock.reset_mock()
-    inject_additional_arguments_from_metadata_mock.assert_not_called()
 
     assert main() == 1
 
@@ -629,4 +770,44 @@ def test_main(mocker: MockerFixture, capsys: CaptureFixture) -> None:
     dist_mock.assert_called_once_with(SOME(Namespace, command='dist', file='test.feature'))
     dist_mock.reset_mock()
     init_mock.assert_not_called()
-    inject_additional_arguments_from_metadata_mock.assert_called_once_with(SOME(Namespace, command='dist', file='test.feature'))
+
+
+@pytest.mark.parametrize('argv', [
+    ['--version'],
+    ['auth'],
+    ['--bash-complete=grizzly-cli '],
+    ['--bash-complete=grizzly-cli auth '],
+    ['local', 'run', '--bash-complete=grizzly-cli local run '],
+    ['dist', 'run', '--bash-complete=grizzly-cli dist run '],
+])
+def test_main_lazy_imports(argv: list[str], tmp_path_factory: TempPathFactory) -> None:
+    test_context = tmp_path_factory.mktemp('test_context')
+
+    script = (
+        'import sys\n'
+        'from grizzly_cli.__main__ import main\n'
+        f'sys.argv = ["grizzly-cli", *{argv!r}]\n'
+        'try:\n'
+        '    main()\n'
+        'except SystemExit:\n'
+        '    pass\n'
+        'print("modules:", ",".join(sorted({name.split(".")[0] for name in sys.modules})))\n'
+    )
+
+    try:
+        output = subprocess.check_output(
+            [sys.executable, '-c', script],
+            cwd=test_context,
+            env={**environ, 'OTP_SECRET': 'ABCDEFGHIJKLMNOP'},
+            universal_newlines=True,
+        )
+
+        modules_line = next(line for line in output.splitlines() if line.startswith('modules: '))
+        modules = modules_line.replace('modules: ', '').split(',')
+
+        assert 'grizzly_cli' in modules
+        assert 'azure' not in modules
+        assert 'behave' not in modules
+        assert 'cryptography' not in modules
+    finally:
+        rm_rf(test_context)
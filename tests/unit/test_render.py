@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import re
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+from grizzly_cli.__main__ import _parse_arguments
+from grizzly_cli.render import find_feature_files, get_output_file, render
+from tests.helpers import cwd, rm_rf
+
+if TYPE_CHECKING:  # pragma: no cover
+    from _pytest.capture import CaptureFixture
+    from _pytest.tmpdir import TempPathFactory
+
+
+def create_project(test_context: Path) -> None:
+    (test_context / 'features' / 'steps').mkdir(parents=True)
+    (test_context / '.hidden').mkdir()
+    (test_context / '.hidden' / 'hidden.feature').write_text('Feature: hidden')
+    (test_context / 'features' / 'first.feature').write_text("""Feature: first
+    Scenario: first
+        {% scenario "included", feature="./steps/include.feature" %}
+""")
+    (test_context / 'features' / 'first.lock.feature').write_text('Feature: rendered first')
+    (test_context / 'features' / 'second.feature').write_text("""Feature: second
+    Scenario: second
+        Given a step
+""")
+    (test_context / 'features' / 'steps' / 'include.feature').write_text("""Feature: include
+    Scenario: included
+        Given an included step
+""")
+    (test_context / 'features' / 'README.md').write_text('# features')
+
+
+def test_find_feature_files(tmp_path_factory: TempPathFactory) -> None:
+    test_context = tmp_path_factory.mktemp('test_context')
+    create_project(test_context)
+
+    try:
+        with cwd(test_context):
+            assert sorted(find_feature_files(['.'])) == sorted([
+                Path('features/first.feature'),
+                Path('features/second.feature'),
+                Path('features/steps/include.feature'),
+            ])
+
+            # files are only found once
+            assert find_feature_files(['features/second.feature', 'features/steps', 'features/second.feature']) == [
+                Path('features/second.feature'),
+                Path('features/steps/include.feature'),
+            ]
+
+            with pytest.raises(ValueError, match=r'^features/README.md does not match \*.feature$'):
+                find_feature_files(['features/README.md'])
+
+            with pytest.raises(ValueError, match=r'^features/missing.feature does not exist$'):
+                find_feature_files(['features/missing.feature'])
+    finally:
+        rm_rf(test_context)
+
+
+def test_get_output_file(tmp_path_factory: TempPathFactory) -> None:
+    test_context = tmp_path_factory.mktemp('test_context')
+
+    try:
+        with cwd(test_context):
+            assert get_output_file(Path('features/test.feature'), Path('build')) == Path('build/features/test.lock.feature')
+            assert get_output_file(test_context / 'test.feature', Path('build')) == Path('build/test.lock.feature')
+            assert get_output_file(Path('/somewhere/else/test.feature'), Path('build')) == Path('build/somewhere/else/test.lock.feature')
+    finally:
+        rm_rf(test_context)
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_render(capsys: CaptureFixture, tmp_path_factory: TempPathFactory, jobs: str) -> None:
+    test_context = tmp_path_factory.mktemp('test_context')
+    create_project(test_context)
+
+    try:
+        with cwd(test_context):
+            sys.argv = ['grizzly-cli', 'render', '--out', 'build', '--jobs', jobs]
+            arguments = _parse_arguments()
+
+            assert render(arguments) == 0
+
+            assert (test_context / 'build' / 'features' / 'first.lock.feature').read_text() == """Feature: first
+    Scenario: first
+        Given an included step"""
+            assert (test_context / 'build' / 'features' / 'second.lock.feature').exists()
+            assert (test_context / 'build' / 'features' / 'steps' / 'include.lock.feature').exists()
+
+            capture = capsys.readouterr()
+            assert capture.out == ''
+            assert sorted(line.strip() for line in re.sub(r' *[0-9.]+ ms', ' X ms', capture.err).strip().split('\n')) == sorted([
+                'X ms features/first.feature',
+                'X ms features/second.feature',
+                'X ms features/steps/include.feature',
+                'rendered 3 feature files in X ms, 0 failed',
+            ])
+
+            # one feature file fails, the others are still rendered
+            rm_rf(test_context / 'build')
+            (test_context / 'features' / 'second.feature').write_text("""Feature: second
+    Scenario: second
+        {% scenario "missing", feature="./steps/include.feature" %}
+""")
+            sys.argv = ['grizzly-cli', 'render', '--out', 'build', '--jobs', jobs, 'features/first.feature', 'features/second.feature']
+            arguments = _parse_arguments()
+
+            assert render(arguments) == 1
+
+            assert (test_context / 'build' / 'features' / 'first.lock.feature').exists()
+            assert not (test_context / 'build' / 'features' / 'second.lock.feature').exists()
+
+            capture = capsys.readouterr()
+            assert capture.out == ''
+            assert [line.strip() for line in re.sub(r' *[0-9.]+ ms', ' X ms', capture.err).strip().split('\n')] == [
+                'X ms features/first.feature',
+                f'X ms features/second.feature: ValueError(\'scenario "missing" not found in {(test_context / "features" / "steps" / "include.feature").as_posix()}\')',
+                'rendered 2 feature files in X ms, 1 failed',
+            ]
+
+            # without output directory, only validated
+            rm_rf(test_context / 'build')
+            sys.argv = ['grizzly-cli', 'render', 'features/first.feature']
+            arguments = _parse_arguments()
+
+            assert render(arguments) == 0
+            assert not (test_context / 'build').exists()
+            assert (test_context / 'features' / 'first.lock.feature').read_text() == 'Feature: rendered first'
+    finally:
+        rm_rf(test_context)
@@ -4,7 +4,7 @@ import logging
 from argparse import ArgumentParser
 from datetime import datetime
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Callable
 
 import pytest
 from jinja2 import Environment
@@ -12,6 +12,7 @@ from jinja2 import Environment
 from grizzly_cli.run import create_parser, run
 from grizzly_cli.utils import setup_logging
 from grizzly_cli.utils.configuration import ScenarioTag
+from grizzly_cli.utils.feature import FeatureAnalysis
 from tests.helpers import CaseInsensitive, rm_rf
 
 if TYPE_CHECKING:
@@ -43,11 +44,15 @@ def test_run(capsys: CaptureFixture, mocker: MockerFixture, tmp_path_factory: Te
     create_parser(sub_parsers, parent='local')
 
     try:
+        mocker.patch.dict('os.environ', {'GRIZZLY_RUN_ID': 'abcd1234'})
         mocker.patch('grizzly_cli.run.grizzly_cli.EXECUTION_CONTEXT', execution_context.as_posix())
         mocker.patch('grizzly_cli.run.grizzly_cli.MOUNT_CONTEXT', mount_context.as_posix())
+        mocker.patch('grizzly_cli.utils.configuration.get_context_root', return_value=execution_context)
         mocker.patch('grizzly_cli.run.get_hostname', return_value='localhost')
-        mocker.patch('grizzly_cli.run.find_variable_names_in_questions', side_effect=[['foo', 'bar'], [], [], [], [], [], [], []])
-        mocker.patch('grizzly_cli.run.find_metadata_notices', side_effect=[[], ['is the event log cleared?'], ['hello world', 'foo bar'], [], [], [], [], []])
+        mocker.patch.object(FeatureAnalysis, 'questions', new_callable=mocker.PropertyMock, side_effect=[['foo', 'bar'], [], [], [], [], [], [], [], []])
+        mocker.patch.object(
+            FeatureAnalysis, 'notices', new_callable=mocker.PropertyMock, side_effect=[[], ['is the event log cleared?'], ['hello world', 'foo bar'], [], [], [], [], []],
+        )
         mocker.patch('grizzly_cli.run.distribution_of_users_per_scenario', autospec=True)
         ask_yes_no_mock = mocker.patch('grizzly_cli.run.ask_yes_no', autospec=True)
         distributed_mock = mocker.MagicMock(return_value=0)
@@ -64,8 +69,21 @@ def test_run(capsys: CaptureFixture, mocker: MockerFixture, tmp_path_factory: Te
         ])
         arguments.file = ' '.join(arguments.file)
 
+        # files from keyvault, for this run and another run of the same project
+        (execution_context / 'files' / 'abcd1234').mkdir(parents=True)
+        (execution_context / 'files' / 'abcd1234' / 'foobar.txt').write_text('foobar')
+        (execution_context / 'files' / 'efgh5678').mkdir(parents=True)
+        (execution_context / 'files' / 'efgh5678' / 'foobar.txt').write_text('foobar')
+
         assert run(arguments, distributed_mock) == 0
 
+        # only files for this run has been removed
+        assert not (execution_context / 'configuration.abcd1234.lock.yaml').exists()
+        assert not (feature_file.parent / 'test.abcd1234.lock.feature').exists()
+        assert not (execution_context / 'files' / 'abcd1234').exists()
+        assert (execution_context / 'files' / 'efgh5678' / 'foobar.txt').exists()
+        rm_rf(execution_context / 'files' / 'efgh5678')
+
         capture = capsys.readouterr()
         assert capture.out == ''
         assert capture.err == """feature file requires values for 2 variables
@@ -81,7 +99,8 @@ bar = foo
                 'GRIZZLY_CLI_HOST': 'localhost',
                 'GRIZZLY_EXECUTION_CONTEXT': execution_context.as_posix(),
                 'GRIZZLY_MOUNT_CONTEXT': mount_context.as_posix(),
-                'GRIZZLY_CONFIGURATION_FILE': CaseInsensitive(Path.joinpath(execution_context, 'configuration.lock.yaml').as_posix()),
+                'GRIZZLY_RUN_ID': 'abcd1234',
+                'GRIZZLY_CONFIGURATION_FILE': CaseInsensitive(Path.joinpath(execution_context, 'configuration.abcd1234.lock.yaml').as_posix()),
                 'TESTDATA_VARIABLE_foo': 'bar',
                 'TESTDATA_VARIABLE_bar': 'foo',
             }, {
@@ -120,6 +139,9 @@ bar = foo
 
         assert run(arguments, local_mock) == 0
 
+        # files/ is removed when no other run is using it
+        assert not (execution_context / 'files').exists()
+
         capture = capsys.readouterr()
 
         distributed_mock.assert_not_called()
@@ -129,7 +151,8 @@ bar = foo
                 'GRIZZLY_CLI_HOST': 'localhost',
                 'GRIZZLY_EXECUTION_CONTEXT': execution_context.as_posix(),
                 'GRIZZLY_MOUNT_CONTEXT': mount_context.as_posix(),
-                'GRIZZLY_CONFIGURATION_FILE': CaseInsensitive(Path.joinpath(execution_context, 'configuration.lock.yaml').as_posix()),
+                'GRIZZLY_RUN_ID': 'abcd1234',
+                'GRIZZLY_CONFIGURATION_FILE': CaseInsensitive(Path.joinpath(execution_context, 'configuration.abcd1234.lock.yaml').as_posix()),
             }, {
                 'master': [],
                 'worker': [],
@@ -164,7 +187,8 @@ bar = foo
                 'GRIZZLY_CLI_HOST': 'localhost',
                 'GRIZZLY_EXECUTION_CONTEXT': execution_context.as_posix(),
                 'GRIZZLY_MOUNT_CONTEXT': mount_context.as_posix(),
-                'GRIZZLY_CONFIGURATION_FILE': CaseInsensitive(Path.joinpath(execution_context, 'configuration.lock.yaml').as_posix()),
+                'GRIZZLY_RUN_ID': 'abcd1234',
+                'GRIZZLY_CONFIGURATION_FILE': CaseInsensitive(Path.joinpath(execution_context, 'configuration.abcd1234.lock.yaml').as_posix()),
             }, {
                 'master': [],
                 'worker': [],
@@ -197,7 +221,8 @@ bar = foo
                 'GRIZZLY_CLI_HOST': 'localhost',
                 'GRIZZLY_EXECUTION_CONTEXT': execution_context.as_posix(),
                 'GRIZZLY_MOUNT_CONTEXT': mount_context.as_posix(),
-                'GRIZZLY_CONFIGURATION_FILE': CaseInsensitive(Path.joinpath(execution_context, 'configuration.lock.yaml').as_posix()),
+                'GRIZZLY_RUN_ID': 'abcd1234',
+                'GRIZZLY_CONFIGURATION_FILE': CaseInsensitive(Path.joinpath(execution_context, 'configuration.abcd1234.lock.yaml').as_posix()),
             }, {
                 'master': [],
                 'worker': [],
@@ -227,7 +252,8 @@ bar = foo
                 'GRIZZLY_CLI_HOST': 'localhost',
                 'GRIZZLY_EXECUTION_CONTEXT': execution_context.as_posix(),
                 'GRIZZLY_MOUNT_CONTEXT': mount_context.as_posix(),
-                'GRIZZLY_CONFIGURATION_FILE': CaseInsensitive(Path.joinpath(execution_context, 'configuration.lock.yaml').as_posix()),
+                'GRIZZLY_RUN_ID': 'abcd1234',
+                'GRIZZLY_CONFIGURATION_FILE': CaseInsensitive(Path.joinpath(execution_context, 'configuration.abcd1234.lock.yaml').as_posix()),
             }, {
                 'master': [],
                 'worker': [],
@@ -262,7 +288,8 @@ bar = foo
                 'GRIZZLY_CLI_HOST': 'localhost',
                 'GRIZZLY_EXECUTION_CONTEXT': execution_context.as_posix(),
                 'GRIZZLY_MOUNT_CONTEXT': mount_context.as_posix(),
-                'GRIZZLY_CONFIGURATION_FILE': CaseInsensitive(Path.joinpath(execution_context, 'configuration.lock.yaml').as_posix()),
+                'GRIZZLY_RUN_ID': 'abcd1234',
+                'GRIZZLY_CONFIGURATION_FILE': CaseInsensitive(Path.joinpath(execution_context, 'configuration.abcd1234.lock.yaml').as_posix()),
             }, {
                 'master': [],
                 'worker': [],
@@ -293,7 +320,8 @@ bar = foo
                 'GRIZZLY_CLI_HOST': 'localhost',
                 'GRIZZLY_EXECUTION_CONTEXT': execution_context.as_posix(),
                 'GRIZZLY_MOUNT_CONTEXT': mount_context.as_posix(),
-                'GRIZZLY_CONFIGURATION_FILE': CaseInsensitive(Path.joinpath(execution_context, 'configuration.lock.yaml').as_posix()),
+                'GRIZZLY_RUN_ID': 'abcd1234',
+                'GRIZZLY_CONFIGURATION_FILE': CaseInsensitive(Path.joinpath(execution_context, 'configuration.abcd1234.lock.yaml').as_posix()),
                 'GRIZZLY_LOG_DIR': 'foobar',
             }, {
                 'master': [],
@@ -325,7 +353,8 @@ bar = foo
                 'GRIZZLY_CLI_HOST': 'localhost',
                 'GRIZZLY_EXECUTION_CONTEXT': execution_context.as_posix(),
                 'GRIZZLY_MOUNT_CONTEXT': mount_context.as_posix(),
-                'GRIZZLY_CONFIGURATION_FILE': CaseInsensitive(Path.joinpath(execution_context, 'configuration.lock.yaml').as_posix()),
+                'GRIZZLY_RUN_ID': 'abcd1234',
+                'GRIZZLY_CONFIGURATION_FILE': CaseInsensitive(Path.joinpath(execution_context, 'configuration.abcd1234.lock.yaml').as_posix()),
                 'GRIZZLY_LOG_DIR': 'foobar',
                 'GRIZZLY_DRY_RUN': 'true',
             }, {
@@ -356,7 +385,74 @@ bar = foo
         capture = capsys.readouterr()
 
         assert capture.out == 'Feature: this feature is testing something\n'
-        assert capture.err == ''
+        # rendered by the previous runs
+        assert capture.err == f'render cache hit for {feature_file.as_posix()}\n'
+
+        # --plan-users, nothing is executed
+        plan_users_mock = mocker.patch('grizzly_cli.run.plan_users_per_scenario', autospec=True)
+
+        arguments = parser.parse_args([
+            'run',
+            '-e', f'{execution_context.as_posix()}/configuration.yaml',
+            f'{execution_context.as_posix()}/features/test.feature',
+            '--plan-users', '10:50:10',
+        ])
+        arguments.file = ' '.join(arguments.file)
+
+        assert run(arguments, distributed_mock) == 0
+
+        distributed_mock.assert_not_called()
+        local_mock.assert_not_called()
+        plan_users_mock.assert_called_once_with(arguments, {
+            'GRIZZLY_CLI_HOST': 'localhost',
+            'GRIZZLY_EXECUTION_CONTEXT': execution_context.as_posix(),
+            'GRIZZLY_MOUNT_CONTEXT': mount_context.as_posix(),
+            'GRIZZLY_RUN_ID': 'abcd1234',
+        })
+        assert arguments.file == (feature_file.parent / 'test.abcd1234.lock.feature').as_posix()
+        assert not (feature_file.parent / 'test.abcd1234.lock.feature').exists()
+
+        # --plan-only, nothing is asked for or executed
+        write_plan_mock = mocker.patch('grizzly_cli.run.write_distribution_plan', autospec=True, return_value=1)
+        mocker.patch.object(FeatureAnalysis, 'questions', new_callable=mocker.PropertyMock, side_effect=[['foo', 'baz'], ['foo']])
+        mocker.patch.dict('os.environ', {'TESTDATA_VARIABLE_foo': 'bar'})
+        get_input_mock.reset_mock()
+        capsys.readouterr()
+
+        arguments = parser.parse_args([
+            'run',
+            '-e', f'{execution_context.as_posix()}/configuration.yaml',
+            f'{execution_context.as_posix()}/features/test.feature',
+            '--plan-only',
+            '--plan-format', 'csv',
+        ])
+        arguments.file = ' '.join(arguments.file)
+
+        with pytest.raises(ValueError, match='missing value for variable "baz", specify it with -T/--testdata-variable'):
+            run(arguments, distributed_mock)
+
+        get_input_mock.assert_not_called()
+        write_plan_mock.assert_not_called()
+
+        arguments.file = f'{execution_context.as_posix()}/features/test.feature'
+
+        assert run(arguments, distributed_mock) == 1
+
+        distributed_mock.assert_not_called()
+        local_mock.assert_not_called()
+        get_input_mock.assert_not_called()
+        write_plan_mock.assert_called_once_with(arguments, {
+            'GRIZZLY_CLI_HOST': 'localhost',
+            'GRIZZLY_EXECUTION_CONTEXT': execution_context.as_posix(),
+            'GRIZZLY_MOUNT_CONTEXT': mount_context.as_posix(),
+            'GRIZZLY_RUN_ID': 'abcd1234',
+            'TESTDATA_VARIABLE_foo': 'bar',
+        })
+        assert not (feature_file.parent / 'test.abcd1234.lock.feature').exists()
+        assert not (execution_context / 'configuration.abcd1234.lock.yaml').exists()
+
+        capture = capsys.readouterr()
+        assert capture.out == ''
     finally:
         tmp_path_factory._basetemp = original_tmp_path
         rm_rf(test_context)
@@ -384,11 +480,14 @@ def test_run_dump(capsys: CaptureFixture, mocker: MockerFixture, tmp_path_factor
     create_parser(sub_parsers, parent='local')
 
     try:
+        mocker.patch.dict('os.environ', {'GRIZZLY_RUN_ID': 'abcd1234'})
         mocker.patch('grizzly_cli.run.grizzly_cli.EXECUTION_CONTEXT', execution_context.as_posix())
         mocker.patch('grizzly_cli.run.grizzly_cli.MOUNT_CONTEXT', mount_context.as_posix())
         mocker.patch('grizzly_cli.run.get_hostname', return_value='localhost')
-        mocker.patch('grizzly_cli.run.find_variable_names_in_questions', side_effect=[['foo', 'bar'], [], [], [], [], [], [], []])
-        mocker.patch('grizzly_cli.run.find_metadata_notices', side_effect=[[], ['is the event log cleared?'], ['hello world', 'foo bar'], [], [], [], [], []])
+        mocker.patch.object(FeatureAnalysis, 'questions', new_callable=mocker.PropertyMock, side_effect=[['foo', 'bar'], [], [], [], [], [], [], []])
+        mocker.patch.object(
+            FeatureAnalysis, 'notices', new_callable=mocker.PropertyMock, side_effect=[[], ['is the event log cleared?'], ['hello world', 'foo bar'], [], [], [], [], []],
+        )
         mocker.patch('grizzly_cli.run.distribution_of_users_per_scenario', autospec=True)
         distributed_mock = mocker.MagicMock(return_value=0)
         local_mock = mocker.MagicMock(return_value=0)
@@ -451,7 +550,7 @@ def test_run_dump(capsys: CaptureFixture, mocker: MockerFixture, tmp_path_factor
         local_mock.assert_not_called()
 
         capture = capsys.readouterr()
-        assert capture.err == ''
+        assert capture.err == f'render cache miss for {feature_file.as_posix()}\n'
         assert capture.out == ''
 
         output_file = execution_context / 'output.feature'
@@ -533,7 +632,7 @@ def test_run_dump(capsys: CaptureFixture, mocker: MockerFixture, tmp_path_factor
         local_mock.assert_not_called()
 
         capture = capsys.readouterr()
-        assert capture.err == ''
+        assert capture.err == f'render cache miss for {feature_file.as_posix()}\n'
         assert capture.out == ''
 
         output_file = execution_context / 'output.feature'
@@ -682,7 +781,7 @@ the following variables was used in ../second.feature#second but was not declare
         local_mock.assert_not_called()
 
         capture = capsys.readouterr()
-        assert capture.err == ''
+        assert capture.err == f'render cache miss for {feature_file.as_posix()}\n'
         assert capture.out == ''
         assert output_file.read_text() == """Feature: a feature
     Scenario: first
@@ -738,7 +837,7 @@ the following variables was used in ../second.feature#second but was not declare
         local_mock.assert_not_called()
 
         capture = capsys.readouterr()
-        assert capture.err == ''
+        assert capture.err == f'render cache miss for {feature_file.as_posix()}\n'
         assert capture.out == ''
         assert output_file.read_text() == """Feature: a feature
     Scenario: first
@@ -786,7 +885,7 @@ the following variables was used in ../second.feature#second but was not declare
         local_mock.assert_not_called()
 
         capture = capsys.readouterr()
-        assert capture.err == ''
+        assert capture.err == f'render cache miss for {feature_file.as_posix()}\n'
         assert capture.out == ''
         assert output_file.read_text() == """Feature: a feature
     Scenario: first
@@ -814,6 +913,93 @@ the following variables was used in ../second.feature#second but was not declare
         rm_rf(test_context)
 
 
+def test_run_watch(mocker: MockerFixture, tmp_path_factory: TempPathFactory) -> None:  # noqa: PLR0915
+    setup_logging()
+
+    original_tmp_path = tmp_path_factory._basetemp
+    tmp_path_factory._basetemp = Path.cwd() / '.pytest_tmp'
+    test_context = tmp_path_factory.mktemp('test_context')
+    execution_context = test_context / 'execution-context'
+    execution_context.mkdir()
+    feature_file = execution_context / 'features' / 'test.feature'
+    feature_file.parent.mkdir(parents=True, exist_ok=True)
+    feature_file.write_text('Feature: a feature\n    Scenario: first\n        {% scenario "included", feature="./include.feature" %}\n')
+    (execution_context / 'features' / 'include.feature').write_text('Feature: include\n    Scenario: included\n        Given a step\n')
+    (execution_context / 'configuration.yaml').write_text('configuration:')
+    output_file = execution_context / 'output.feature'
+
+    parser = ArgumentParser()
+
+    sub_parsers = parser.add_subparsers(dest='test')
+
+    create_parser(sub_parsers, parent='local')
+
+    try:
+        mocker.patch.dict('os.environ', {'GRIZZLY_RUN_ID': 'abcd1234'})
+        mocker.patch('grizzly_cli.run.grizzly_cli.EXECUTION_CONTEXT', execution_context.as_posix())
+        mocker.patch('grizzly_cli.run.get_hostname', return_value='localhost')
+        mocker.patch.object(FeatureAnalysis, 'questions', new_callable=mocker.PropertyMock, return_value=[])
+        mocker.patch.object(FeatureAnalysis, 'notices', new_callable=mocker.PropertyMock, return_value=[])
+        mocker.patch('grizzly_cli.run.distribution_of_users_per_scenario', autospec=True)
+        watch_mock = mocker.patch('grizzly_cli.run.watch_feature_file', autospec=True)
+        local_mock = mocker.MagicMock(return_value=0)
+
+        setattr(getattr(run, '__wrapped__'), '__value__', execution_context.as_posix())  # noqa: B009, B010
+
+        # --dump output.feature --watch
+        arguments = parser.parse_args([
+            'run',
+            '-e', f'{execution_context.as_posix()}/configuration.yaml',
+            f'{execution_context.as_posix()}/features/test.feature',
+            '--dump', output_file.as_posix(),
+            '--watch',
+        ])
+        arguments.file = ' '.join(arguments.file)
+
+        assert run(arguments, local_mock) == 0
+
+        local_mock.assert_not_called()
+        watch_mock.assert_called_once()
+        args, kwargs = watch_mock.call_args
+        lock_file = feature_file.with_name('test.abcd1234.lock.feature')
+        assert args[:2] == (feature_file, lock_file)
+        # not from the render cache, the include graph is needed to know what to render again
+        assert not args[2].cache_hit
+        assert args[2].graph is not None
+        assert args[3] == {feature_file.resolve(), (feature_file.parent / 'include.feature').resolve()}
+        assert kwargs['environment_file'] == execution_context / 'configuration.yaml'
+        assert output_file.read_text() == 'Feature: a feature\n    Scenario: first\n        Given a step\n'
+        assert not lock_file.exists()
+
+        watch_mock.reset_mock()
+
+        # --dry-run --watch
+        def watch_feature_file(*_: Any, refresh: Callable[[], None], **__: Any) -> None:
+            refresh()
+
+        watch_mock.side_effect = watch_feature_file
+
+        arguments = parser.parse_args([
+            'run',
+            '-e', f'{execution_context.as_posix()}/configuration.yaml',
+            f'{execution_context.as_posix()}/features/test.feature',
+            '--dry-run',
+            '--watch',
+        ])
+        arguments.file = ' '.join(arguments.file)
+
+        assert run(arguments, local_mock) == 0
+
+        watch_mock.assert_called_once()
+        # once, and once more when refreshed
+        assert local_mock.call_count == 2
+        args, _ = local_mock.call_args
+        assert args[1]['GRIZZLY_DRY_RUN'] == 'true'
+    finally:
+        tmp_path_factory._basetemp = original_tmp_path
+        rm_rf(test_context)
+
+
 def test_if_condition_with_scenario_tag_ext(caplog: LogCaptureFixture) -> None:
     environment = Environment(autoescape=False, extensions=[ScenarioTag])
 
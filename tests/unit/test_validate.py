@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import json
+import re
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+from xml.etree import ElementTree as ET
+
+import pytest
+
+from grizzly_cli.__main__ import _parse_arguments
+from grizzly_cli.validate import find_environment_files, get_testdata_variables, validate
+from tests.helpers import cwd, rm_rf
+
+if TYPE_CHECKING:  # pragma: no cover
+    from _pytest.capture import CaptureFixture
+    from _pytest.tmpdir import TempPathFactory
+    from pytest_mock import MockerFixture
+
+
+def create_project(test_context: Path) -> None:
+    (test_context / 'features' / 'steps').mkdir(parents=True)
+    (test_context / 'environments').mkdir()
+    (test_context / 'features' / 'ok.feature').write_text("""Feature: ok
+    Background: common
+        Given "2" users
+
+    Scenario: first
+        {% scenario "included", feature="./steps/include.feature" %}
+
+    Scenario: second
+        Given a user of type "RestApi" load testing "https://localhost"
+        And repeat for "{{ iterations }}" iterations
+        And ask for value of variable "iterations"
+""")
+    (test_context / 'features' / 'steps' / 'include.feature').write_text("""Feature: include
+    Background: common
+        Given "1" user
+
+    Scenario: included
+        Given a user of type "RestApi" load testing "https://localhost"
+        And repeat for "1" iteration
+""")
+    (test_context / 'environments' / 'base.yaml').write_text('configuration:\n  foo: bar\n')
+    (test_context / 'environments' / 'test.yaml').write_text('{% merge "./base.yaml" %}\nconfiguration:\n  bar: foo\n')
+    (test_context / 'environments' / 'test.lock.yaml').write_text('configuration: {')
+    (test_context / 'broken.yaml').write_text('configuration: {')
+
+
+def test_get_testdata_variables(mocker: MockerFixture) -> None:
+    mocker.patch.dict('os.environ', {'TESTDATA_VARIABLE_foo': 'bar', 'TESTDATA_VARIABLE_bar': 'foo'})
+
+    assert get_testdata_variables(None) == {'foo': 'bar', 'bar': 'foo'}
+    assert get_testdata_variables(['foo=baz', 'hello=world=!']) == {'foo': 'baz', 'bar': 'foo', 'hello': 'world=!'}
+
+    with pytest.raises(ValueError, match='-T/--testdata-variable needs to be in the format NAME=VALUE'):
+        get_testdata_variables(['foo'])
+
+
+def test_find_environment_files(tmp_path_factory: TempPathFactory) -> None:
+    test_context = tmp_path_factory.mktemp('test_context')
+    create_project(test_context)
+
+    try:
+        with cwd(test_context):
+            assert sorted(find_environment_files(['.', 'features/ok.feature'])) == [Path('environments/base.yaml'), Path('environments/test.yaml')]
+            assert find_environment_files(['features']) == []
+    finally:
+        rm_rf(test_context)
+
+
+def test_validate(capsys: CaptureFixture, tmp_path_factory: TempPathFactory) -> None:  # noqa: PLR0915
+    test_context = tmp_path_factory.mktemp('test_context')
+    create_project(test_context)
+
+    try:
+        with cwd(test_context):
+            # missing value for variable, and the included feature file is validated by itself
+            sys.argv = ['grizzly-cli', 'validate', '--jobs', '2']
+            arguments = _parse_arguments()
+
+            assert validate(arguments) == 1
+
+            capture = capsys.readouterr()
+            report = json.loads(capture.out)
+            assert report['failed'] == 1
+            assert sorted((result['type'], result['file'], result['errors']) for result in report['files']) == [
+                ('environment', 'environments/base.yaml', []),
+                ('environment', 'environments/test.yaml', []),
+                ('feature', 'features/ok.feature', ['missing value for variable "iterations"']),
+                ('feature', 'features/steps/include.feature', []),
+            ]
+            assert all(result['time'] > 0.0 for result in report['files'])
+            assert 'validated 2 feature files and 2 environment files in' in capture.err
+            assert re.search(r'features/ok.feature:\n +missing value for variable "iterations"\n', capture.err) is not None
+
+            # too few iterations for the users, and a broken environment file
+            sys.argv = ['grizzly-cli', 'validate', '--jobs', '1', '-T', 'iterations=0', '-e', 'broken.yaml', 'features/ok.feature']
+            arguments = _parse_arguments()
+
+            assert validate(arguments) == 1
+
+            capture = capsys.readouterr()
+            report = json.loads(capture.out)
+            assert report['failed'] == 2
+            assert [(result['type'], result['file']) for result in report['files']] == [('feature', 'features/ok.feature'), ('environment', 'broken.yaml')]
+            assert report['files'][0]['errors'] == ['second: no iterations']
+            assert len(report['files'][1]['errors']) == 1
+            assert report['files'][1]['errors'][0].startswith('ParserError(')
+
+            # everything is valid, junit report to file
+            sys.argv = ['grizzly-cli', 'validate', '-T', 'iterations=1', '--format', 'junit', '--out', 'report.xml']
+            arguments = _parse_arguments()
+
+            assert validate(arguments) == 0
+
+            capture = capsys.readouterr()
+            assert capture.out == ''
+
+            testsuites = ET.parse(test_context / 'report.xml').getroot()
+            assert testsuites.tag == 'testsuites'
+            assert testsuites.get('name') == 'grizzly-cli validate'
+            assert testsuites.get('tests') == '4'
+            assert testsuites.get('failures') == '0'
+            assert [(testsuite.get('name'), testsuite.get('tests')) for testsuite in testsuites] == [('feature', '2'), ('environment', '2')]
+            assert sorted(testcase.get('name', '') for testcase in testsuites.iter('testcase')) == [
+                'environments/base.yaml',
+                'environments/test.yaml',
+                'features/ok.feature',
+                'features/steps/include.feature',
+            ]
+            assert list(testsuites.iter('failure')) == []
+
+            # too many users for the iterations, reported as a junit failure
+            (test_context / 'features' / 'ok.feature').write_text((test_context / 'features' / 'ok.feature').read_text().replace('"2" users', '"3" users'))
+            sys.argv = ['grizzly-cli', 'validate', '-T', 'iterations=1', '--format', 'junit', 'features']
+            arguments = _parse_arguments()
+
+            assert validate(arguments) == 1
+
+            capture = capsys.readouterr()
+            testsuites = ET.fromstring(capture.out)
+            assert testsuites.get('tests') == '2'
+            assert testsuites.get('failures') == '1'
+            failures = list(testsuites.iter('failure'))
+            assert len(failures) == 1
+            assert failures[0].get('message') == 'first will have 2 users to run 1 iterations, increase iterations or lower user count'
+
+            # no files
+            rm_rf(test_context / 'features')
+            rm_rf(test_context / 'environments')
+            sys.argv = ['grizzly-cli', 'validate']
+            arguments = _parse_arguments()
+
+            assert validate(arguments) == 0
+
+            capture = capsys.readouterr()
+            assert capture.out == ''
+            assert 'no feature files or environment files found in .' in capture.err
+    finally:
+        rm_rf(test_context)
@@ -1,33 +1,43 @@
 from __future__ import annotations
 
+import json
 from argparse import Namespace
 from contextlib import ExitStack
-from importlib import reload
 from json.decoder import JSONDecodeError
+from os import environ
 from pathlib import Path
 from tempfile import gettempdir
-from textwrap import dedent
 from typing import TYPE_CHECKING, Any, Union
 from unittest.mock import mock_open
 from unittest.mock import patch as unittest_patch
 
 import pytest
 
+import grizzly_cli.utils
 from grizzly_cli.utils import (
+    _compile_expression,
+    _render_expression,
+    apportion_users,
     ask_yes_no,
+    calculate_user_plan,
+    calculate_users_per_worker,
     distribution_of_users_per_scenario,
-    find_metadata_notices,
-    find_variable_names_in_questions,
     get_default_mtu,
     get_dependency_versions,
     get_distributed_system,
+    get_distribution_plan,
+    get_lock_file,
+    get_recommended_worker_count,
+    get_run_id,
     list_images,
-    parse_feature_file,
+    parse_user_range,
+    plan_users_per_scenario,
     requirements,
     run_command,
     setup_logging,
+    write_distribution_plan,
 )
-from tests.helpers import create_scenario, cwd, rm_rf
+from tests.helpers import create_scenario, mock_feature_analysis, rm_rf
 
 if TYPE_CHECKING:  # pragma: no cover
     from _pytest.capture import CaptureFixture
@@ -36,55 +46,6 @@ if TYPE_CHECKING:  # pragma: no cover
     from requests_mock import Mocker as RequestsMocker
 
 
-def test_parse_feature_file(tmp_path_factory: TempPathFactory) -> None:
-    test_context = tmp_path_factory.mktemp('test_context')
-    test_context_root = str(test_context)
-    feature_file = test_context / 'test.feature'
-    feature_file.touch()
-    feature_file.write_text(dedent("""
-    Feature: test feature
-        Background:
-            Given a common test step
-            When executed in every scenario
-        Scenario: scenario-1
-            Given a test step
-            And another test step
-        Scenario: scenario-2
-            Given a second test step
-            Then execute it
-            When done, just stop
-    """))
-
-    try:
-        with cwd(test_context):
-            import grizzly_cli  # noqa: PLC0415
-            reload(grizzly_cli)
-            reload(grizzly_cli.utils)
-
-            assert len(grizzly_cli.SCENARIOS) == 0
-
-            parse_feature_file('test.feature')
-
-            import grizzly_cli  # noqa: PLC0415
-
-            cached_scenarios = grizzly_cli.SCENARIOS.copy()
-            assert len(grizzly_cli.SCENARIOS) == 2
-            assert next(iter(grizzly_cli.SCENARIOS)).name == 'scenario-1'
-            assert len(next(iter(grizzly_cli.SCENARIOS)).steps) == 2
-            assert len(next(iter(grizzly_cli.SCENARIOS)).background_steps) == 2
-            assert list(grizzly_cli.SCENARIOS)[1].name == 'scenario-2'
-            assert len(list(grizzly_cli.SCENARIOS)[1].steps) == 3
-            assert len(list(grizzly_cli.SCENARIOS)[1].background_steps) == 2
-
-            parse_feature_file('test.feature')
-
-            import grizzly_cli  # noqa: PLC0415
-
-            assert cached_scenarios == grizzly_cli.SCENARIOS
-    finally:
-        rm_rf(test_context_root)
-
-
 def test_list_images(mocker: MockerFixture) -> None:
     check_output = mocker.patch('grizzly_cli.utils.subprocess.check_output', side_effect=[(
         b'{"name": "mcr.microsoft.com/vscode/devcontainers/python", "tag": "0-3.10", "size": "1.16GB", "created": "2021-12-02 23:46:55 +0100 CET", "id": "a05f8cc8454b"}\n'
@@ -313,83 +274,31 @@ def test_get_distributed_system(capsys: CaptureFixture, mocker: MockerFixture) -
     which.reset_mock()
 
 
-def test_find_variable_names_in_questions(mocker: MockerFixture) -> None:
-    mocker.patch('grizzly_cli.SCENARIOS', [])
-    mocker.patch('grizzly_cli.utils.parse_feature_file', autospec=True)
-
-    assert find_variable_names_in_questions('test.feature') == []
-
-    mocker.patch('grizzly_cli.SCENARIOS', [
-        create_scenario(
-            'scenario-1',
-            [],
-            [
-                'Given a user of type "RestApi" load testing "https://localhost"',
-                'And ask for value of variable test_variable_1',
-            ],
-        ),
-    ])
-
-    with pytest.raises(ValueError, match='could not find variable name in "ask for value of variable test_variable_1'):
-        find_variable_names_in_questions('test.feature')
-
-    mocker.patch('grizzly_cli.SCENARIOS', [
-        create_scenario(
-            'scenario-1',
-            [],
-            [
-                'Given a user of type "RestApi" load testing "https://localhost"',
-                'And ask for value of variable "test_variable_2"',
-                'And ask for value of variable "test_variable_1"',
-            ],
-        ),
-        create_scenario(
-            'scenario-2',
-            [
-                'And ask for value of variable "bar"',
-            ],
-            [
-                'Given a user of type "MessageQueueUser" load testing "mqs://localhost"',
-                'And ask for value of variable "foo"',
-            ],
-        ),
-    ])
-    variables = find_variable_names_in_questions('test.feature')
-    assert len(variables) == 4
-    assert variables == ['bar', 'foo', 'test_variable_1', 'test_variable_2']
-
-
-def test_find_metadata_notices(tmp_path_factory: TempPathFactory) -> None:
-    test_context = tmp_path_factory.mktemp('test_context')
+def test_apportion_users() -> None:
+    assert apportion_users(10, []) == []
+    assert apportion_users(10, [0, 0]) == [0, 0]
+    assert apportion_users(10, [1]) == [10]
+    assert apportion_users(10, [1, 1]) == [5, 5]
 
-    try:
-        feature_file = test_context / 'test-1.feature'
-        feature_file.write_text("""Feature: test -1
-    Scenario: hello world
-        Given a feature file with a rich set of expressions
-""")
-        assert find_metadata_notices(str(feature_file)) == []
+    # largest remainder, ties goes to the first weight
+    assert apportion_users(3, [1, 1]) == [2, 1]
+    assert apportion_users(10, [2, 3, 5]) == [2, 3, 5]
+    assert apportion_users(10, [1, 1, 1]) == [4, 3, 3]
+    assert apportion_users(30, [20, 20, 33, 6, 10, 4, 4]) == [6, 6, 10, 2, 3, 2, 1]
 
-        feature_file.write_text("""# grizzly-cli run --verbose
-# grizzly-cli:notice have you created testdata?
-Feature: test -1
-    Scenario: hello world
-        Given a feature file with a rich set of expressions
-""")
+    # at least one user per weight above zero, and none for weights that are zero
+    assert apportion_users(4, [1, 50, 0, 0]) == [1, 3, 0, 0]
+    assert apportion_users(40, [500, 1]) == [39, 1]
+    assert apportion_users(5, [1000, 1, 1, 1, 1]) == [1, 1, 1, 1, 1]
+    assert apportion_users(10, [1000, 1, 2, 1, 1]) == [6, 1, 1, 1, 1]
 
-        assert find_metadata_notices(str(feature_file)) == ['have you created testdata?']
+    # the sum is always the number of users
+    weights: list[float] = [(index * 7919) % 101 + 1 for index in range(500)]
+    for user_count in [500, 501, 1000, 12345]:
+        assert sum(apportion_users(user_count, weights)) == user_count
 
-        feature_file.write_text("""# grizzly-cli run --verbose
-# grizzly-cli:notice have you created testdata?
-Feature: test -1
-    Scenario: hello world
-        # grizzly-cli:notice is the event log cleared?
-        Given a feature file with a rich set of expressions
-""")
-
-        assert find_metadata_notices(str(feature_file)) == ['have you created testdata?', 'is the event log cleared?']
-    finally:
-        rm_rf(test_context)
+    with pytest.raises(ValueError, match='2 users cannot be apportioned to 3 weights, at least one user per weight is needed'):
+        apportion_users(2, [1, 0, 1, 1])
 
 
 def test_distribution_of_users_per_scenario(capsys: CaptureFixture, mocker: MockerFixture) -> None:  # noqa: PLR0915
@@ -399,7 +308,7 @@ def test_distribution_of_users_per_scenario(capsys: CaptureFixture, mocker: Mock
 
     ask_yes_no = mocker.patch('grizzly_cli.utils.ask_yes_no', autospec=True)
 
-    mocker.patch('grizzly_cli.SCENARIOS', [
+    mock_feature_analysis(mocker, [
         create_scenario(
             'scenario-1',
             [],
@@ -414,7 +323,7 @@ def test_distribution_of_users_per_scenario(capsys: CaptureFixture, mocker: Mock
     with pytest.raises(ValueError, match='grizzly needs at least 1 users to run this feature'):
         distribution_of_users_per_scenario(arguments, {})
 
-    mocker.patch('grizzly_cli.SCENARIOS', [
+    mock_feature_analysis(mocker, [
         create_scenario(
             'scenario-1',
             [
@@ -445,7 +354,7 @@ def test_distribution_of_users_per_scenario(capsys: CaptureFixture, mocker: Mock
 
     capsys.readouterr()
 
-    mocker.patch('grizzly_cli.SCENARIOS', [
+    mock_feature_analysis(mocker, [
         create_scenario(
             'scenario-1',
             [
@@ -494,7 +403,7 @@ def test_distribution_of_users_per_scenario(capsys: CaptureFixture, mocker: Mock
     args, _ = ask_yes_no.call_args_list[-1]
     assert args[0] == 'continue?'
 
-    mocker.patch('grizzly_cli.SCENARIOS', [
+    mock_feature_analysis(mocker, [
         create_scenario(
             'scenario-1',
             [],
@@ -505,7 +414,7 @@ def test_distribution_of_users_per_scenario(capsys: CaptureFixture, mocker: Mock
     with pytest.raises(ValueError, match='scenario "scenario-1" does not have any steps'):
         distribution_of_users_per_scenario(arguments, {})
 
-    mocker.patch('grizzly_cli.SCENARIOS', [
+    mock_feature_analysis(mocker, [
         create_scenario(
             'scenario-1',
             ['Given "1" users'],
@@ -516,7 +425,7 @@ def test_distribution_of_users_per_scenario(capsys: CaptureFixture, mocker: Mock
     with pytest.raises(ValueError, match='scenario-1 does not have a user type'):
         distribution_of_users_per_scenario(arguments, {})
 
-    mocker.patch('grizzly_cli.SCENARIOS', [
+    mock_feature_analysis(mocker, [
         create_scenario(
             'scenario-1',
             [
@@ -576,17 +485,19 @@ ident   weight  #iter  #user  description
     args, _ = ask_yes_no.call_args_list[-1]
     assert args[0] == 'continue?'
 
-    assert render.call_count == 5
-    for _, kwargs in render.call_args_list:
-        assert kwargs.get('boolean', None)
-        assert kwargs.get('integer', None) == 500
-        assert kwargs.get('float', None) == 1.33
-        assert kwargs.get('string', None) == 'foo bar'
-        assert kwargs.get('neg_integer', None) == -100
-        assert kwargs.get('neg_float', None) == -1.33
-        assert kwargs.get('pad_integer', None) == '001'
-
-    mocker.patch('grizzly_cli.SCENARIOS', [
+    # the default weight of scenario-2 is a literal, and is not rendered
+    assert render.call_count == 4
+    for args, _ in render.call_args_list:
+        _, context = args
+        assert context.get('boolean', None)
+        assert context.get('integer', None) == 500
+        assert context.get('float', None) == 1.33
+        assert context.get('string', None) == 'foo bar'
+        assert context.get('neg_integer', None) == -100
+        assert context.get('neg_float', None) == -1.33
+        assert context.get('pad_integer', None) == '001'
+
+    mock_feature_analysis(mocker, [
         create_scenario(
             'scenario-1 testing a lot of stuff',
             [
@@ -642,7 +553,7 @@ ident   weight  #iter  #user  description
     capsys.readouterr()
     assert ask_yes_no.call_count == 2
 
-    mocker.patch('grizzly_cli.SCENARIOS', [
+    mock_feature_analysis(mocker, [
         create_scenario(
             'scenario-1',
             [
@@ -690,7 +601,7 @@ ident   weight  #iter  #user  description
 """
     capsys.readouterr()
 
-    mocker.patch('grizzly_cli.SCENARIOS', [
+    mock_feature_analysis(mocker, [
         create_scenario(
             'scenario-1 testing a lot of stuff',
             [
@@ -788,10 +699,10 @@ each scenario will execute accordingly:
 ident   weight  #iter  #user  description
 ------|-------|------|------|-------------|
 001         33     23      6  scenario-0 
-002         16      5      2  scenario-1 
+002         16      5      3  scenario-1 
 003         28      8      5  scenario-2 
 004          5      2      1  scenario-3 
-005          8      3      2  scenario-4 
+005          8      3      1  scenario-4 
 006          4      1      1  scenario-5 
 007          4      1      1  scenario-6 
 ------|-------|------|------|-------------|
@@ -809,9 +720,9 @@ ident   weight  #iter  #user  description
 ------|-------|------|------|-------------|
 001         25     35      6  scenario-0 
 002         18      8      4  scenario-1 
-003         31     13      7  scenario-2 
+003         31     13      8  scenario-2 
 004          6      2      2  scenario-3 
-005          9      4      3  scenario-4 
+005          9      4      2  scenario-4 
 006          4      2      1  scenario-5 
 007          4      2      1  scenario-6 
 ------|-------|------|------|-------------|
@@ -830,10 +741,10 @@ ident   weight  #iter  #user  description
 001         20     56      6  scenario-0 
 002         20     12      6  scenario-1 
 003         33     21     10  scenario-2 
-004          6      4      1  scenario-3 
+004          6      4      2  scenario-3 
 005         10      6      3  scenario-4 
 006          4      3      2  scenario-5 
-007          4      3      2  scenario-6 
+007          4      3      1  scenario-6 
 ------|-------|------|------|-------------|
 
 """,
@@ -849,8 +760,8 @@ ident   weight  #iter  #user  description
 ------|-------|------|------|-------------|
 001         16     66      6  scenario-0 
 002         20     15      7  scenario-1 
-003         35     24     12  scenario-2 
-004          6      5      3  scenario-3 
+003         35     24     13  scenario-2 
+004          6      5      2  scenario-3 
 005         10      8      4  scenario-4 
 006          5      3      2  scenario-5 
 007          5      3      2  scenario-6 
@@ -869,8 +780,8 @@ ident   weight  #iter  #user  description
 ------|-------|------|------|-------------|
 001         16  23940      6  scenario-0 
 002         20   5250      7  scenario-1 
-003         35   8820     12  scenario-2 
-004          6   1680      3  scenario-3 
+003         35   8820     13  scenario-2 
+004          6   1680      2  scenario-3 
 005         10   2730      4  scenario-4 
 006          5   1260      2  scenario-5 
 007          5   1260      2  scenario-6 
@@ -889,7 +800,7 @@ def test_distribution_of_users_per_scenario_advanced(capsys: CaptureFixture, moc
         'And spawn rate is "{{ rate }}" users per second',
     ]
 
-    mocker.patch('grizzly_cli.SCENARIOS', [
+    mock_feature_analysis(mocker, [
         create_scenario(
             'scenario-0',
             background_steps,
@@ -962,6 +873,166 @@ def test_distribution_of_users_per_scenario_advanced(capsys: CaptureFixture, moc
     capsys.readouterr()
 
 
+def test_distribution_of_users_per_scenario_workers(capsys: CaptureFixture, mocker: MockerFixture) -> None:
+    setup_logging()
+
+    background_steps = ['Given "{{ users }}" users']
+
+    mock_feature_analysis(mocker, [
+        create_scenario(f'scenario-{number}', background_steps, [
+            f'Given a user of type "RestApi" with weight "{weight}" load testing "https://localhost"',
+            'And repeat for "100" iterations',
+        ])
+        for number, weight in [(1, 6), (2, 3), (3, 1)]
+    ])
+
+    # recommended number of workers
+    arguments = Namespace(file='test.feature', yes=True, workers='auto', users_per_worker=4)
+
+    distribution_of_users_per_scenario(arguments, {'TESTDATA_VARIABLE_users': '10'})
+
+    assert arguments.workers == 3
+
+    capture = capsys.readouterr()
+    assert capture.out == ''
+    assert capture.err.endswith("""001          6    100      6  scenario-1 
+002          3    100      3  scenario-2 
+003          1    100      1  scenario-3 
+------|-------|------|------|-------------|
+
+each worker will run accordingly, with 3 workers:
+
+worker  #user  scenarios
+------|------|-----------|
+     1      4  001-002
+     2      3  001-002
+     3      3  001, 003
+------|------|-----------|
+
+recommended number of workers is 3, with at most 4 users per worker
+
+""")
+
+    # too few workers for the number of users per worker
+    arguments = Namespace(file='test.feature', yes=True, workers=2, users_per_worker=4)
+
+    distribution_of_users_per_scenario(arguments, {'TESTDATA_VARIABLE_users': '10'})
+
+    assert arguments.workers == 2
+
+    capture = capsys.readouterr()
+    assert capture.out == ''
+    assert capture.err.endswith("""each worker will run accordingly, with 2 workers:
+
+worker  #user  scenarios
+------|------|-----------|
+     1      5  001-003
+     2      5  001-002
+------|------|-----------|
+
+recommended number of workers is 3, with at most 4 users per worker
+
+worker 1 will have 5 users, which is more than 4 users per worker
+worker 2 will have 5 users, which is more than 4 users per worker
+""")
+
+    # no number of users per worker, no recommendation
+    arguments = Namespace(file='test.feature', yes=True, workers=1, users_per_worker=None)
+
+    distribution_of_users_per_scenario(arguments, {'TESTDATA_VARIABLE_users': '10'})
+
+    capture = capsys.readouterr()
+    assert capture.err.endswith("""each worker will run accordingly, with 1 workers:
+
+worker  #user  scenarios
+------|------|-----------|
+     1     10  001-003
+------|------|-----------|
+
+""")
+
+
+def test_get_distribution_plan(mocker: MockerFixture) -> None:
+    mock_feature_analysis(mocker, [
+        create_scenario('scenario-1', ['Given "{{ users }}" users'], [
+            'Given a user of type "RestApi" with weight "3" load testing "https://localhost"',
+            'And repeat for "{{ iterations }}" iterations',
+        ]),
+        create_scenario('scenario-2', [], [
+            'Given a user of type "MessageQueueUser" with weight "1" load testing "mq://localhost"',
+            'And repeat for "2" iterations',
+        ]),
+    ])
+
+    assert get_distribution_plan('test.feature', {'users': 8, 'iterations': 10}) == {
+        'users': 8,
+        'total_iterations': 12,
+        'variables': {'users': 8, 'iterations': 10},
+        'scenarios': [
+            {'identifier': '001', 'name': 'scenario-1', 'user': 'RestApi', 'weight': 3, 'users': 6, 'iterations': 10, 'errors': []},
+            {'identifier': '002', 'name': 'scenario-2', 'user': 'MessageQueueUser', 'weight': 1, 'users': 2, 'iterations': 2, 'errors': []},
+        ],
+    }
+
+    plan = get_distribution_plan('test.feature', {'users': 8, 'iterations': 0})
+    assert [scenario['errors'] for scenario in plan['scenarios']] == [['no iterations'], []]
+
+    plan = get_distribution_plan('test.feature', {'users': 12, 'iterations': 10})
+    assert [scenario['errors'] for scenario in plan['scenarios']] == [[], ['more users than iterations']]
+
+    # users are not distributed based on weight
+    mock_feature_analysis(mocker, [
+        create_scenario('scenario-1', [], [
+            'Given "2" users of type "RestApi" load testing "https://localhost"',
+            'And repeat for "4" iterations',
+        ]),
+    ])
+
+    plan = get_distribution_plan('test.feature', {})
+    assert plan['scenarios'] == [{'identifier': '001', 'name': 'scenario-1', 'user': 'RestApi', 'weight': None, 'users': 2, 'iterations': 4, 'errors': []}]
+
+
+def test_write_distribution_plan(capsys: CaptureFixture, mocker: MockerFixture) -> None:
+    mock_feature_analysis(mocker, [
+        create_scenario('scenario-1', ['Given "{{ users }}" users'], [
+            'Given a user of type "RestApi" with weight "3" load testing "https://localhost"',
+            'And repeat for "10" iterations',
+        ]),
+        create_scenario('scenario, 2', [], [
+            'Given a user of type "RestApi" with weight "1" load testing "https://localhost"',
+            'And repeat for "{{ iterations }}" iterations',
+        ]),
+    ])
+
+    environ = {'GRIZZLY_RUN_ID': 'abcd1234', 'TESTDATA_VARIABLE_users': '4', 'TESTDATA_VARIABLE_iterations': '5'}
+
+    arguments = Namespace(file='test.feature', plan_format=None)
+    assert write_distribution_plan(arguments, environ) == 0
+
+    capture = capsys.readouterr()
+    assert capture.err == ''
+    assert json.loads(capture.out) == {
+        'users': 4,
+        'total_iterations': 15,
+        'variables': {'users': 4, 'iterations': 5},
+        'scenarios': [
+            {'identifier': '001', 'name': 'scenario-1', 'user': 'RestApi', 'weight': 3, 'users': 3, 'iterations': 10, 'errors': []},
+            {'identifier': '002', 'name': 'scenario, 2', 'user': 'RestApi', 'weight': 1, 'users': 1, 'iterations': 5, 'errors': []},
+        ],
+    }
+
+    arguments = Namespace(file='test.feature', plan_format='csv')
+    environ.update({'TESTDATA_VARIABLE_iterations': '0'})
+    assert write_distribution_plan(arguments, environ) == 1
+
+    capture = capsys.readouterr()
+    assert capture.err == ''
+    assert capture.out == """identifier,name,user,weight,users,iterations,errors,total_iterations,TESTDATA_VARIABLE_users,TESTDATA_VARIABLE_iterations
+001,scenario-1,RestApi,3,3,10,,10,4,0
+002,"scenario, 2",RestApi,1,1,0,no iterations,10,4,0
+"""
+
+
 def test_distribution_of_users_per_scenario_no_weights(capsys: CaptureFixture, mocker: MockerFixture) -> None:
     setup_logging()
 
@@ -971,7 +1042,7 @@ def test_distribution_of_users_per_scenario_no_weights(capsys: CaptureFixture, m
         'Given spawn rate is "{{ rate }}" users per second',
     ]
 
-    mocker.patch('grizzly_cli.SCENARIOS', [
+    mock_feature_analysis(mocker, [
         create_scenario(
             'scenario-0',
             background_steps,
@@ -1015,6 +1086,161 @@ ident   #iter  #user  description
     capsys.readouterr()
 
 
+def test__render_expression(mocker: MockerFixture) -> None:
+    _compile_expression.cache_clear()
+    template_spy = mocker.spy(grizzly_cli.utils, 'Template')
+
+    # literals are not templates
+    assert _render_expression('10', {'users': 5}) == '10'
+    assert _render_expression('', {}) == ''
+    template_spy.assert_not_called()
+
+    # each expression is only compiled once
+    assert _render_expression('{{ users * 2 }}', {'users': 5}) == '10'
+    assert _render_expression('{{ users * 2 }}', {'users': 6}) == '12'
+    assert _render_expression('{% if users > 5 %}1{% else %}0{% endif %}', {'users': 6}) == '1'
+    assert template_spy.call_count == 2
+
+
+def test_calculate_users_per_worker() -> None:
+    # one user of each scenario in turn, each user to the next worker
+    assert calculate_users_per_worker([3, 1, 2], 2) == [[1, 0, 2], [2, 1, 0]]
+    assert calculate_users_per_worker([3, 1, 2], 1) == [[3, 1, 2]]
+    assert calculate_users_per_worker([1, 1], 3) == [[1, 0], [0, 1], [0, 0]]
+    assert calculate_users_per_worker([0, 4, 0], 2) == [[0, 2, 0], [0, 2, 0]]
+    assert calculate_users_per_worker([], 2) == [[], []]
+
+    users = calculate_users_per_worker([17, 5, 0, 9, 1], 4)
+    assert [sum(worker_users) for worker_users in users] == [8, 8, 8, 8]
+    assert [sum(scenario_users) for scenario_users in zip(*users)] == [17, 5, 0, 9, 1]
+
+
+def test_get_recommended_worker_count() -> None:
+    assert get_recommended_worker_count(0, 10) == 1
+    assert get_recommended_worker_count(10, 10) == 1
+    assert get_recommended_worker_count(11, 10) == 2
+    assert get_recommended_worker_count(5000, 300) == 17
+
+
+def test_parse_user_range() -> None:
+    assert parse_user_range('10:5000:10') == range(10, 5001, 10)
+    assert parse_user_range('1:3') == range(1, 4)
+    assert parse_user_range('5:5') == range(5, 6)
+
+    for value in ['10', '10:5', '0:10', '10:20:0', '10:20:5:1', 'a:b', '10:20:']:
+        with pytest.raises(ValueError, match=f'"{value}" is not a valid range of users, it needs to be in the format START:STOP\\[:STEP\\], e.g. 10:5000:10'):
+            parse_user_range(value)
+
+
+def test_calculate_user_plan(mocker: MockerFixture) -> None:
+    background_steps = ['Given "{{ users }}" users']
+
+    mock_feature_analysis(mocker, [
+        create_scenario('scenario-1', background_steps, [
+            'Given a user of type "RestApi" with weight "{{ weight }}" load testing "https://localhost"',
+            'And repeat for "4" iterations',
+        ]),
+        create_scenario('scenario-2', background_steps, [
+            'Given a user of type "RestApi" with weight "1" load testing "https://localhost"',
+            'And repeat for "10" iterations',
+        ]),
+        create_scenario('scenario-3', background_steps, [
+            'Given a user of type "RestApi" with weight "0" load testing "https://localhost"',
+            'And repeat for "10" iterations',
+        ]),
+    ])
+
+    # the number of users in the background is not used, so it does not need a value
+    scenarios, plans = calculate_user_plan('test.feature', {'weight': 3}, range(2, 13, 5))
+
+    assert [(scenario.name, scenario.weight, scenario.iterations) for scenario in scenarios] == [('scenario-1', 3, 4), ('scenario-2', 1, 10), ('scenario-3', 0, 10)]
+    assert [(plan.user_count, plan.user_counts, plan.zero_users, plan.over_iterations, plan.error) for plan in plans] == [
+        (2, [], [], [], 'grizzly needs at least 3 users to run this feature'),
+        (7, [5, 2, 0], [2], [0], None),
+        (12, [9, 3, 0], [2], [0], None),
+    ]
+
+    # all number of users are less than the number of scenarios
+    scenarios, plans = calculate_user_plan('test.feature', {'weight': 3}, range(1, 3))
+
+    assert [(scenario.name, scenario.weight, scenario.iterations) for scenario in scenarios] == [('scenario-1', 3, 4), ('scenario-2', 1, 10), ('scenario-3', 0, 10)]
+    assert [(plan.user_count, plan.error) for plan in plans] == [
+        (1, 'grizzly needs at least 3 users to run this feature'),
+        (2, 'grizzly needs at least 3 users to run this feature'),
+    ]
+
+    mock_feature_analysis(mocker, [
+        create_scenario('scenario-1', [], [
+            'Given "1" user of type "RestApi" load testing "https://localhost"',
+            'And repeat for "4" iterations',
+        ]),
+    ])
+
+    with pytest.raises(ValueError, match='users can only be planned when they are distributed based on weight'):
+        calculate_user_plan('test.feature', {}, range(1, 10))
+
+
+def test_plan_users_per_scenario(capsys: CaptureFixture, mocker: MockerFixture) -> None:
+    setup_logging()
+
+    background_steps = ['Given "1" users']
+
+    mock_feature_analysis(mocker, [
+        create_scenario(f'scenario-{number}', background_steps, [
+            f'Given a user of type "RestApi" with weight "{weight}" load testing "https://localhost"',
+            f'And repeat for "{iterations}" iterations',
+        ])
+        for number, weight, iterations in [(1, 10, 100), (2, 0, 10), (3, 0, 10), (4, 1, 1), (5, 1, 1)]
+    ])
+
+    arguments = Namespace(file='test.feature', plan_users=range(4, 21, 4))
+
+    plan_users_per_scenario(arguments, {'TESTDATA_VARIABLE_foo': 'bar'})
+
+    capture = capsys.readouterr()
+    assert capture.out == ''
+    assert capture.err == """
+feature file test.feature has 5 scenarios
+
+ident   weight  #iter  description
+------|-------|------|-------------|
+001         10    100  scenario-1 
+002          0     10  scenario-2 
+003          0     10  scenario-3 
+004          1      1  scenario-4 
+005          1      1  scenario-5 
+------|-------|------|-------------|
+
+#users  zero users                                          users > iterations
+------|---------------------------------------------------|--------------------|
+     4  grizzly needs at least 5 users to run this feature
+     8  002-003
+    12  002-003
+    16  002-003
+    20  002-003                                             004
+------|---------------------------------------------------|--------------------|
+
+"""
+
+    # with a number of users per worker, the recommended number of workers for each number of users
+    arguments = Namespace(file='test.feature', plan_users=range(5, 21, 5), users_per_worker=8)
+
+    plan_users_per_scenario(arguments, {'TESTDATA_VARIABLE_foo': 'bar'})
+
+    capture = capsys.readouterr()
+    assert capture.out == ''
+    assert capture.err.endswith("""
+#users  #workers  zero users  users > iterations
+------|---------|-----------|--------------------|
+     5         1  002-003
+    10         2  002-003
+    15         2  002-003
+    20         3  002-003     004
+------|---------|-----------|--------------------|
+
+""")
+
+
 def test_ask_yes_no(capsys: CaptureFixture, mocker: MockerFixture) -> None:
     get_input = mocker.patch('grizzly_cli.utils.get_input', side_effect=['yeah', 'n', 'y'])
 
@@ -1040,6 +1266,30 @@ def test_ask_yes_no(capsys: CaptureFixture, mocker: MockerFixture) -> None:
         assert args[0] == 'are you sure you know what you are doing? [y/n]: '
 
 
+def test_get_run_id(mocker: MockerFixture) -> None:
+    mocker.patch.dict('os.environ', {'GRIZZLY_RUN_ID': 'ci-build_123'})
+    assert get_run_id() == 'ci-build_123'
+
+    mocker.patch.dict('os.environ', {'GRIZZLY_RUN_ID': '../foo'})
+    with pytest.raises(ValueError, match=r'GRIZZLY_RUN_ID "\.\./foo" can only contain letters, digits, "_" and "-"'):
+        get_run_id()
+
+    mocker.patch.dict('os.environ', clear=True)
+    run_id = get_run_id()
+    assert len(run_id) == 8
+    assert environ['GRIZZLY_RUN_ID'] == run_id
+    assert get_run_id() == run_id
+
+
+def test_get_lock_file(mocker: MockerFixture) -> None:
+    mocker.patch.dict('os.environ', clear=True)
+    assert get_lock_file(Path('features/test.feature')) == Path('features/test.lock.feature')
+
+    mocker.patch.dict('os.environ', {'GRIZZLY_RUN_ID': 'abcd1234'})
+    assert get_lock_file(Path('features/test.feature')) == Path('features/test.abcd1234.lock.feature')
+    assert get_lock_file(Path('/environments/local.yaml')) == Path('/environments/local.abcd1234.lock.yaml')
+
+
 def test_get_dependency_versions_git(mocker: MockerFixture, tmp_path_factory: TempPathFactory, capsys: CaptureFixture) -> None:  # noqa: PLR0915
     test_context = tmp_path_factory.mktemp('test_context')
     requirements_file = test_context / 'requirements.txt'
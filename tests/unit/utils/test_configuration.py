@@ -10,15 +10,24 @@ import pytest
 from azure.core.exceptions import ClientAuthenticationError, ServiceRequestError
 from azure.identity import ChainedTokenCredential
 from azure.keyvault.secrets import KeyVaultSecret, SecretClient, SecretProperties
+from jinja2 import Environment, TemplateNotFound
 
 from grizzly_cli.utils import chunker, setup_logging
+from grizzly_cli.utils import configuration as configuration_module
 from grizzly_cli.utils.configuration import (
+    MergeYamlTag,
     ScenarioTag,
+    TemplateBytecodeCache,
+    TemplateLoader,
     _get_metadata,
     _import_files,
     _write_file,
+    create_environment,
     get_context_root,
+    get_files_directory,
     get_keyvault_client,
+    get_template,
+    is_commented,
     load_configuration,
     load_configuration_file,
     load_configuration_keyvault,
@@ -115,10 +124,129 @@ class TestScenarioTag:
         | bar | foo |
 
         And one more step"""
+
+            with pytest.raises(ValueError, match='scenario "fourth" not found in'):
+                ScenarioTag.get_scenario_text('fourth', test_feature)
         finally:
             tmp_path_factory._basetemp = original_tmp_path
             rm_rf(test_context)
 
+    def test_render_scenario_text(self, tmp_path_factory: TempPathFactory) -> None:
+        test_context = tmp_path_factory.mktemp('test_render_scenario_text')
+        test_feature = test_context / 'test.feature'
+
+        try:
+            test_feature.write_text("""Feature: test
+    Scenario: first
+        Given a variable with value "{$ foo $}"
+        And a variable with value "{$ bar $}-{$ foo $}"
+        And a variable with value "{{ baz }}"
+""")
+
+            rendered = ScenarioTag.render_scenario_text('first', './test.feature', test_feature, {'foo': 'hello', 'bar': 1}, ignore_errors=False)
+            assert rendered == """Given a variable with value "hello"
+        And a variable with value "1-hello"
+        And a variable with value "{{ baz }}\""""
+
+            # values are not scanned for variables
+            rendered = ScenarioTag.render_scenario_text('first', './test.feature', test_feature, {'foo': '{$ bar $}', 'bar': 'world'}, ignore_errors=False)
+            assert rendered == """Given a variable with value "{$ bar $}"
+        And a variable with value "world-{$ bar $}"
+        And a variable with value "{{ baz }}\""""
+
+            # unused and undeclared variables are reported in the order they are declared, and used
+            with pytest.raises(ValueError) as ve:  # noqa: PT011
+                ScenarioTag.render_scenario_text('first', './test.feature', test_feature, {'foo': 'hello', 'zoo': 'a', 'baz': 'b'}, ignore_errors=False)
+
+            assert str(ve.value) == """the following variables has been declared in scenario tag but not used in ./test.feature#first:
+  zoo
+  baz
+
+the following variables was used in ./test.feature#first but was not declared in scenario tag:
+  bar
+"""
+
+            assert ScenarioTag.render_scenario_text('first', './test.feature', test_feature, {'zoo': 'a'}, ignore_errors=True) == """Given a variable with value "{$ foo $}"
+        And a variable with value "{$ bar $}-{$ foo $}"
+        And a variable with value "{{ baz }}\""""
+        finally:
+            rm_rf(test_context)
+
+    def test_filter_stream(self) -> None:
+        environment = Environment(autoescape=False, extensions=[ScenarioTag])
+        source = """Feature: {{ name }}
+    Scenario: first
+        Given a variable with value "{{ value | int }}"
+    # {% scenario "second", feature="./{{ name }}.feature" %}
+    {% if enabled %}
+    Scenario: third
+    {% endif %}"""
+
+        # everything except the condition is data, consecutive data is one token
+        tokens = [(token.type, token.value) for token in environment._tokenize(source, None) if token.type != 'name']
+        assert tokens[0] == ('data', """Feature: {{ name }}
+    Scenario: first
+        Given a variable with value "{{ value | int }}"
+    # {% scenario "second", feature="./{{ name }}.feature" %}
+    """)
+        assert tokens[1:3] == [('block_begin', '{%'), ('block_end', '%}')]
+        assert tokens[3] == ('data', '\n    Scenario: third\n    ')
+
+        assert environment.from_string(source).render(enabled=True) == source.replace('{% if enabled %}', '').replace('{% endif %}', '')
+
+    def test_get_include_index(self, tmp_path_factory: TempPathFactory, mocker: MockerFixture) -> None:
+        test_context = tmp_path_factory.mktemp('test_include_index')
+        test_feature = test_context / 'test.feature'
+        parse_feature_spy = mocker.spy(configuration_module, 'parse_feature')
+
+        try:
+            test_feature.write_text("""Feature: test
+    Scenario: first
+        Given the first scenario
+
+    Scenario: second
+        Given the second scenario
+        And {$ foo $} steps
+""")
+
+            index = ScenarioTag.get_include_index(test_feature)
+            assert index.scenarios == {'first': (2, 4), 'second': (5, None)}
+            assert index.lines[2:4] == ['        Given the first scenario', '']
+
+            assert ScenarioTag.get_scenario_text('first', test_feature) == 'Given the first scenario'
+            assert ScenarioTag.get_scenario_text('second', test_feature) == 'Given the second scenario\n        And {$ foo $} steps'
+            assert ScenarioTag.get_include_index(test_feature) is index
+            assert parse_feature_spy.call_count == 1
+
+            # modified file is parsed again
+            test_feature.write_text("""Feature: test
+    Scenario: second
+        Given the second scenario
+""")
+
+            assert ScenarioTag.get_scenario_text('second', test_feature) == 'Given the second scenario'
+            assert ScenarioTag.get_include_index(test_feature) is not index
+            assert parse_feature_spy.call_count == 2
+        finally:
+            rm_rf(test_context)
+
+
+def test_is_commented() -> None:
+    source = 'first {% merge %}\n  # second {% merge %}\n#{% merge %}\n'
+
+    assert [is_commented(source, position) for position in [source.index('{%', offset) for offset in [0, 10, 35]]] == [False, True, True]
+
+
+def test_merge_yaml_tag_filter_stream() -> None:
+    environment = Environment(autoescape=False, extensions=[MergeYamlTag])
+    source = """configuration:
+  # {% merge "./{{ name }}.yaml" %}
+  foo: "{{ bar }}-{{ baz }}"
+"""
+
+    tokens = [(token.type, token.value) for token in environment._tokenize(source, None)]
+    assert tokens == [('data', source.rstrip('\n'))]
+
 
 def test_get_keyvault_client(mocker: MockerFixture) -> None:
     secrets_client_mock = mocker.patch('grizzly_cli.utils.configuration.SecretClient', return_value=MagicMock(spec=SecretClient))
@@ -163,7 +291,15 @@ def test_get_context_root(tmp_path_factory: TempPathFactory, mocker: MockerFixtu
         rm_rf(test_context)
 
 
-def test__write_file(tmp_path_factory: TempPathFactory) -> None:
+def test_get_files_directory(mocker: MockerFixture) -> None:
+    mocker.patch.dict('os.environ', clear=True)
+    assert get_files_directory(Path('/srv/project')) == Path('/srv/project/files')
+
+    mocker.patch.dict('os.environ', {'GRIZZLY_RUN_ID': 'abcd1234'})
+    assert get_files_directory(Path('/srv/project')) == Path('/srv/project/files/abcd1234')
+
+
+def test__write_file(tmp_path_factory: TempPathFactory, mocker: MockerFixture) -> None:
     test_context = tmp_path_factory.mktemp('test_context')
 
     try:
@@ -198,6 +334,11 @@ def test__write_file(tmp_path_factory: TempPathFactory) -> None:
 
         with pytest.raises(ValueError, match='could not find `file:` in content type'):
             _write_file(test_context, 'noconf,chunk:0,chunks:2', 'foobar')
+
+        # during a run, files are written in a directory for the run
+        mocker.patch.dict('os.environ', {'GRIZZLY_RUN_ID': 'abcd1234'})
+        assert _write_file(test_context, 'file:foo/bar.txt', b64encode(b'bar foo').decode('utf-8')) == 'files/abcd1234/foo/bar.txt'
+        assert (test_context / 'files' / 'abcd1234' / 'foo' / 'bar.txt').read_text() == 'bar foo'
     finally:
         rm_rf(test_context)
 
@@ -367,7 +508,8 @@ configuration:
         level: DEBUG
         max_size: 10000
 """)
-        assert load_configuration_file(env_file_local) == {
+        merges: list[Path] = []
+        assert load_configuration_file(env_file_local, merges) == {
             'configuration': {
                 'authentication': {
                     'admin': {
@@ -381,11 +523,60 @@ configuration:
                 },
             },
         }
+        assert merges == [env_file_base.resolve()]
+
+        # compiled template is loaded from the cache, the merged file is still merged
+        merges = []
+        assert load_configuration_file(env_file_local, merges)['configuration']['authentication']['admin']['username'] == 'administrator'
+        assert merges == [env_file_base.resolve()]
 
     finally:
         rm_rf(test_context)
 
 
+def test_get_template(tmp_path_factory: TempPathFactory, mocker: MockerFixture) -> None:
+    test_context = tmp_path_factory.mktemp('test_context')
+    mocker.patch.dict('os.environ', {'GRIZZLY_CLI_CACHE_DIR': (test_context / 'cache').as_posix()})
+    compile_spy = mocker.spy(Environment, 'compile')
+
+    try:
+        environment = create_environment(ScenarioTag)
+        assert isinstance(environment.loader, TemplateLoader)
+        assert isinstance(environment.bytecode_cache, TemplateBytecodeCache)
+
+        # everything except `{% scenario %}` and `{% if %}` is data
+        template = get_template(environment, 'test.feature', 'Feature: {{ name }}{% if enabled %} enabled{% endif %}')
+        assert template.render(enabled=True) == 'Feature: {{ name }} enabled'
+        assert compile_spy.call_count == 1
+        assert len(list((test_context / 'cache' / 'templates').glob('*.cache'))) == 1
+
+        # same source in another environment (run), is not compiled again
+        environment = create_environment(ScenarioTag)
+        assert get_template(environment, 'test.feature', 'Feature: {{ name }}{% if enabled %} enabled{% endif %}').render(enabled=True) == 'Feature: {{ name }} enabled'
+        assert compile_spy.call_count == 1
+
+        # changed source is compiled again
+        assert get_template(environment, 'test.feature', 'Feature: {{ name }}{% if enabled %} enabled{% endif %}!').render(enabled=True) == 'Feature: {{ name }} enabled!'
+        assert compile_spy.call_count == 2
+
+        # the filtering of the extensions is part of the cache key, the same template is compiled differently with `MergeYamlTag`
+        environment = create_environment(MergeYamlTag)
+        assert get_template(environment, 'test.feature', 'Feature: {{ name }}{% if enabled %} enabled{% endif %}!').render(enabled=True) != 'Feature: {{ name }} enabled!'
+        assert compile_spy.call_count == 3
+        assert len(list((test_context / 'cache' / 'templates').glob('*.cache'))) == 2
+
+        with pytest.raises(TemplateNotFound):
+            environment.get_template('missing.feature')
+
+        # a cache that can not be written to does not fail rendering
+        (test_context / 'cache' / 'templates').rename(test_context / 'cache' / 'moved')
+        (test_context / 'cache' / 'templates').write_text('not a directory')
+        environment = create_environment(ScenarioTag)
+        assert get_template(environment, 'other.feature', 'Feature: other').render() == 'Feature: other'
+    finally:
+        rm_rf(test_context)
+
+
 def test_load_configuration_keyvault(mocker: MockerFixture, tmp_path_factory: TempPathFactory) -> None:
     setup_logging()
 
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from textwrap import dedent
+from typing import TYPE_CHECKING
+
+import pytest
+
+from grizzly_cli.utils.feature import FeatureAnalysis, FeatureScanner, ScenarioRecord, StepSummary, UnsupportedSyntaxError
+from tests.helpers import create_scenario, rm_rf
+
+if TYPE_CHECKING:  # pragma: no cover
+    from _pytest.tmpdir import TempPathFactory
+    from pytest_mock import MockerFixture
+
+
+FEATURE_CONTENT = dedent("""# grizzly-cli run --verbose
+# grizzly-cli:notice have you created testdata?
+Feature: test feature
+    Background:
+        Given "10" users
+        When executed in every scenario
+    Scenario: scenario-1
+        Given a test step
+        And a user of type "RestApi" load testing "https://localhost"
+    Scenario: scenario-2
+        # grizzly-cli:notice is the event log cleared?
+        Given a second test step
+        Then ask for value of variable "foo"
+        When done, just stop
+""")
+
+
+def test_feature_scanner() -> None:
+    scanner = FeatureScanner()
+    scenarios = scanner.scan(FEATURE_CONTENT.splitlines())
+
+    assert scanner.description is None
+
+    scenario = next(scenarios)
+    assert scanner.description == 'test feature'
+    assert scenario.name == 'scenario-1'
+    assert scenario.step_count == 2
+    assert scenario.background_steps == [StepSummary('Given', '"10" users')]
+    assert scenario.steps == [StepSummary('And', 'a user of type "RestApi" load testing "https://localhost"')]
+
+    scenario = next(scenarios)
+    assert scenario.name == 'scenario-2'
+    assert scenario.step_count == 3
+
+    with pytest.raises(StopIteration):
+        next(scenarios)
+
+    # description, tags, tables and doc strings
+    scenarios = FeatureScanner().scan(dedent('''
+    @tag
+    Feature: test feature
+        a description
+        of the feature
+        Scenario: scenario-1
+            a description of the scenario
+            Given a user of type "RestApi" load testing "https://localhost"
+            And value for variable "foo" is "bar"
+            Then post request with name "test" to endpoint "/api"
+            """
+            Given "1" user of type "Dummy"
+            Scenario: not a scenario
+            """
+            And set context variable "foo"
+            | bar |
+            | baz |
+    ''').splitlines())
+
+    scenario = next(scenarios)
+    assert scenario.step_count == 4
+    assert scenario.steps == [
+        StepSummary('Given', 'a user of type "RestApi" load testing "https://localhost"'),
+        StepSummary('And', 'value for variable "foo" is "bar"'),
+    ]
+
+    with pytest.raises(StopIteration):
+        next(scenarios)
+
+
+@pytest.mark.parametrize('content', [
+    '',
+    '# language: sv\nEgenskap: test\n',
+    'Feature: test\n    Scenario Outline: test\n        Given a step\n',
+    'Feature: test\n    Rule: test\n',
+    'Feature: test\n    Scenario: test\n        Given a step\n        this is not a step\n',
+    'Feature: test\n    Scenario: test\n        Given a step\n    Background:\n',
+    'Feature: test\n    Scenario: test\n        Given a step\n        """\n        unterminated\n',
+    'Given a step\n',
+    'Feature: test\n    Scenario: test\n        Given\ta step\n',
+    'Feature: test\n    Scenario: test\n        Given a step\n        And\ta step\n',
+])
+def test_feature_scanner_unsupported(content: str) -> None:
+    with pytest.raises(UnsupportedSyntaxError):
+        list(FeatureScanner().scan(content.splitlines()))
+
+
+def test_feature_analysis_fallback() -> None:
+    analysis = FeatureAnalysis(Path('test.feature'), dedent("""
+    Feature: test feature
+        Scenario Outline: scenario-<name>
+            Given a user of type "RestApi" load testing "https://localhost"
+            And repeat for "<iterations>" iterations
+
+            Examples:
+                | name | iterations |
+                | foo  | 1          |
+                | bar  | 2          |
+    """))
+
+    assert analysis.description == 'test feature'
+    # parsed by behave, where outlines are not expanded
+    assert [scenario.name for scenario in analysis.scenarios] == ['scenario-<name>']
+    assert analysis.scenarios[0].step_count == 2
+    assert analysis.scenarios[0].steps[1] == StepSummary('And', 'repeat for "<iterations>" iterations')
+
+    # behave does not parse a step with a tab after the keyword as a step, it is the description of the scenario
+    analysis = FeatureAnalysis(Path('test.feature'), dedent("""
+    Feature: test feature
+        Scenario: scenario-1
+            Given\ta user of type "RestApi" with weight "2" load testing "https://localhost"
+            Given repeat for "3" iterations
+    """))
+
+    assert analysis.scenarios[0].step_count == 1
+    assert analysis.scenarios[0].steps == [StepSummary('Given', 'repeat for "3" iterations')]
+
+
+def test_feature_analysis() -> None:
+    analysis = FeatureAnalysis(Path('test.feature'), FEATURE_CONTENT)
+
+    assert analysis.digest == FeatureAnalysis.get_digest(FEATURE_CONTENT)
+    assert analysis.metadata_arguments == [['run', '--verbose']]
+    assert analysis.notices == ['have you created testdata?', 'is the event log cleared?']
+    assert 'feature' not in analysis.__dict__
+
+    assert analysis.description == 'test feature'
+    assert [scenario.name for scenario in analysis.scenarios] == ['scenario-1', 'scenario-2']
+    assert [scenario.step_count for scenario in analysis.scenarios] == [2, 3]
+    assert analysis.step_summaries == {
+        'scenario-1': [StepSummary('Given', '"10" users'), StepSummary('And', 'a user of type "RestApi" load testing "https://localhost"')],
+        'scenario-2': [StepSummary('Given', '"10" users'), StepSummary('Then', 'ask for value of variable "foo"')],
+    }
+    assert analysis.scenarios[0].background_steps is analysis.scenarios[1].background_steps
+    assert analysis.questions == ['foo']
+
+    analysis = FeatureAnalysis(Path('test.feature'), '')
+
+    assert analysis.metadata_arguments == []
+    assert analysis.notices == []
+    assert analysis.description is None
+    assert analysis.scenarios == []
+
+
+def test_feature_analysis_questions() -> None:
+    analysis = FeatureAnalysis(Path('test.feature'), '')
+    analysis.scenarios = [ScenarioRecord.from_scenario(scenario) for scenario in [
+        create_scenario(
+            'scenario-1',
+            [],
+            [
+                'Given a user of type "RestApi" load testing "https://localhost"',
+                'And ask for value of variable test_variable_1',
+            ],
+        ),
+    ]]
+
+    with pytest.raises(ValueError, match='could not find variable name in "ask for value of variable test_variable_1'):
+        _ = analysis.questions
+
+    analysis = FeatureAnalysis(Path('test.feature'), '')
+    analysis.scenarios = [ScenarioRecord.from_scenario(scenario) for scenario in [
+        create_scenario(
+            'scenario-1',
+            [],
+            [
+                'Given a user of type "RestApi" load testing "https://localhost"',
+                'And ask for value of variable "test_variable_2"',
+                'And ask for value of variable "test_variable_1"',
+            ],
+        ),
+        create_scenario(
+            'scenario-2',
+            [
+                'And ask for value of variable "bar"',
+            ],
+            [
+                'Given a user of type "MessageQueueUser" load testing "mqs://localhost"',
+                'And ask for value of variable "foo"',
+                'And ask for value of variable "test_variable_1"',
+            ],
+        ),
+    ]]
+
+    assert analysis.questions == ['bar', 'foo', 'test_variable_1', 'test_variable_2']
+
+
+def test_feature_analysis_analyse(tmp_path_factory: TempPathFactory, mocker: MockerFixture) -> None:
+    test_context = tmp_path_factory.mktemp('test_feature_analysis')
+    feature_file = test_context / 'test.feature'
+    feature_file.write_text(FEATURE_CONTENT)
+
+    try:
+        digest_spy = mocker.spy(FeatureAnalysis, 'get_file_digest')
+        scan_spy = mocker.spy(FeatureScanner, 'scan')
+
+        analysis = FeatureAnalysis.analyse(feature_file)
+        assert analysis.file == feature_file.resolve()
+        assert analysis.notices == ['have you created testdata?', 'is the event log cleared?']
+        assert digest_spy.call_count == 1
+        assert analysis.digest == FeatureAnalysis.get_digest(FEATURE_CONTENT)
+
+        # content read from the file is not kept, it is scanned line by line from the file
+        assert analysis.content is None
+        assert [scenario.name for scenario in analysis.scenarios] == ['scenario-1', 'scenario-2']
+        scan_spy.assert_called_once()
+        _, lines = scan_spy.call_args.args
+        assert not isinstance(lines, list)
+        assert lines.closed
+
+        # not modified, not read again
+        assert FeatureAnalysis.analyse(feature_file.as_posix()) is analysis
+        assert digest_spy.call_count == 1
+
+        # modified, but same content
+        feature_file.write_text(FEATURE_CONTENT)
+        stat = feature_file.stat()
+        os.utime(feature_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert FeatureAnalysis.analyse(feature_file) is analysis
+        assert digest_spy.call_count == 2
+
+        # modified content
+        feature_file.write_text(FEATURE_CONTENT.replace('# grizzly-cli:notice have you created testdata?\n', ''))
+        other_analysis = FeatureAnalysis.analyse(feature_file)
+        assert other_analysis is not analysis
+        assert other_analysis.notices == ['is the event log cleared?']
+        assert digest_spy.call_count == 3
+
+        # content provided, e.g. file was just written. only the latest analysis of a file is kept
+        feature_file.write_text(FEATURE_CONTENT)
+        analysis = FeatureAnalysis.analyse(feature_file, FEATURE_CONTENT)
+        assert analysis is not other_analysis
+        assert analysis.notices == ['have you created testdata?', 'is the event log cleared?']
+        assert FeatureAnalysis.analyse(feature_file) is analysis
+        assert FeatureAnalysis._cache[feature_file.resolve()] is analysis
+        assert digest_spy.call_count == 3
+    finally:
+        rm_rf(test_context)
@@ -0,0 +1,460 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+import pytest
+
+from grizzly_cli.utils.configuration import ScenarioTag
+from grizzly_cli.utils.render import IncludeGraph, RenderCache, filter_template_lines, get_digest, parse_scenario_tag, render_feature_file
+from tests.helpers import cwd, rm_rf
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pathlib import Path
+
+    from _pytest.tmpdir import TempPathFactory
+    from pytest_mock import MockerFixture
+
+
+class TestRenderCache:
+    def test_get_put(self, tmp_path_factory: TempPathFactory) -> None:
+        test_context = tmp_path_factory.mktemp('test_render_cache')
+        feature_file = test_context / 'test.feature'
+        include_file = test_context / 'include.feature'
+        include_file.write_text('Feature: include')
+        content_file = test_context / 'test.lock.feature'
+        content_file.write_text('Feature: rendered')
+        cache = RenderCache(test_context / 'cache')
+
+        try:
+            assert cache.get(feature_file, 'Feature: test') is None
+
+            cache.put(feature_file, 'Feature: test', content_file, {include_file.as_posix(): get_digest('Feature: include')})
+            cached_file = cache.get(feature_file, 'Feature: test')
+            assert cached_file is not None
+            assert cached_file.read_text() == 'Feature: rendered'
+
+            # other source, or other file with same source
+            assert cache.get(feature_file, 'Feature: test2') is None
+            assert cache.get(test_context / 'other.feature', 'Feature: test') is None
+
+            # included file has changed
+            include_file.write_text('Feature: include2')
+            assert cache.get(feature_file, 'Feature: test') is None
+
+            # included file has been removed
+            include_file.unlink()
+            assert cache.get(feature_file, 'Feature: test') is None
+
+            # broken entry
+            cache.put(feature_file, 'Feature: test', content_file, {})
+            cache.get_entry_file(feature_file, 'Feature: test').write_text('{"includes": ')
+            assert cache.get(feature_file, 'Feature: test') is None
+
+            # rendered content is missing
+            cache.put(feature_file, 'Feature: test', content_file, {})
+            cache.get_entry_file(feature_file, 'Feature: test').with_suffix('.feature').unlink()
+            assert cache.get(feature_file, 'Feature: test') is None
+
+            # disabled
+            cache = RenderCache(test_context / 'disabled', max_size=0)
+            cache.put(feature_file, 'Feature: test', content_file, {})
+            assert cache.get(feature_file, 'Feature: test') is None
+            assert not cache.directory.exists()
+        finally:
+            rm_rf(test_context)
+
+    def test_evict(self, tmp_path_factory: TempPathFactory) -> None:
+        test_context = tmp_path_factory.mktemp('test_render_cache')
+        feature_file = test_context / 'test.feature'
+        content_file = test_context / 'test.lock.feature'
+        content_file.write_text('Feature: rendered' * 10)
+        cache = RenderCache(test_context / 'cache')
+
+        try:
+            for number in range(3):
+                cache.put(feature_file, f'Feature: {number}', content_file, {})
+                entry_file = cache.get_entry_file(feature_file, f'Feature: {number}')
+                os.utime(entry_file, ns=(0, number * 1_000_000_000))
+
+            entry_size = entry_file.stat().st_size + entry_file.with_suffix('.feature').stat().st_size
+
+            # used, so it is no longer the least recently used
+            assert cache.get(feature_file, 'Feature: 0') is not None
+
+            cache.max_size = entry_size * 2
+            cache.evict()
+
+            assert cache.get(feature_file, 'Feature: 0') is not None
+            assert cache.get(feature_file, 'Feature: 1') is None
+            assert cache.get(feature_file, 'Feature: 2') is not None
+            assert sorted(file.name for file in cache.directory.iterdir()) == sorted(
+                f'{cache.get_entry_file(feature_file, f"Feature: {number}").stem}{suffix}' for number in [0, 2] for suffix in ['.json', '.feature']
+            )
+        finally:
+            rm_rf(test_context)
+
+
+def test_render_feature_file_cwd(tmp_path_factory: TempPathFactory) -> None:
+    test_context = tmp_path_factory.mktemp('test_render_feature_file')
+    feature_file = test_context / 'features' / 'test.feature'
+    output_file = test_context / 'test.lock.feature'
+    cache = RenderCache(test_context / 'cache')
+
+    feature_file.parent.mkdir()
+    feature_file.write_text('Feature: test\n    Scenario: first\n        {% scenario "included", feature="include.feature" %}\n')
+
+    for name in ['first', 'second']:
+        (test_context / name).mkdir()
+        (test_context / name / 'include.feature').write_text(f'Feature: include\n    Scenario: included\n        Given a {name} step\n')
+
+    try:
+        # included file is resolved relative to the current working directory, so it is another include in another directory
+        with cwd(test_context / 'first'):
+            result = render_feature_file(feature_file, output_file, cache)
+            assert not result.cache_hit
+            assert output_file.read_text().endswith('Given a first step')
+
+        with cwd(test_context / 'second'):
+            result = render_feature_file(feature_file, output_file, cache)
+            assert not result.cache_hit
+            assert output_file.read_text().endswith('Given a second step')
+
+        with cwd(test_context / 'first'):
+            result = render_feature_file(feature_file, output_file, cache)
+            assert result.cache_hit
+            assert output_file.read_text().endswith('Given a first step')
+    finally:
+        rm_rf(test_context)
+
+
+def test_render_feature_file(tmp_path_factory: TempPathFactory, mocker: MockerFixture) -> None:
+    test_context = tmp_path_factory.mktemp('test_render_feature_file')
+    feature_file = test_context / 'test.feature'
+    include_file = test_context / 'include.feature'
+    output_file = test_context / 'test.lock.feature'
+    render_spy = mocker.spy(ScenarioTag, 'render')
+
+    def write(file: Path, content: str) -> None:
+        file.write_text(content)
+        # make sure a change is detected even if the file system has coarse mtime resolution
+        stat = file.stat()
+        os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    try:
+        write(feature_file, """Feature: test
+    Scenario: first
+        {% scenario "included", feature="./include.feature", foo="bar" %}
+""")
+        write(include_file, """Feature: include
+    Scenario: included
+        Given a step with {$ foo $}
+""")
+
+        cache = RenderCache(test_context / 'cache')
+
+        hit, *_ = render_feature_file(feature_file, output_file, cache)
+        assert not hit
+        assert output_file.read_text() == """Feature: test
+    Scenario: first
+        Given a step with bar"""
+        assert render_spy.call_count == 1
+
+        output_file.unlink()
+        hit, *_ = render_feature_file(feature_file, output_file, cache)
+        assert hit
+        assert output_file.read_text().endswith('Given a step with bar')
+        assert render_spy.call_count == 1
+
+        # included file changed
+        write(include_file, """Feature: include
+    Scenario: included
+        Given another step with {$ foo $}
+""")
+
+        hit, *_ = render_feature_file(feature_file, output_file, cache)
+        assert not hit
+        assert output_file.read_text().endswith('Given another step with bar')
+        assert render_spy.call_count == 2
+
+        # variable value changed
+        write(feature_file, feature_file.read_text().replace('foo="bar"', 'foo="baz"'))
+
+        hit, *_ = render_feature_file(feature_file, output_file, cache)
+        assert not hit
+        assert output_file.read_text().endswith('Given another step with baz')
+        assert render_spy.call_count == 3
+    finally:
+        rm_rf(test_context)
+
+
+def test_filter_template_lines() -> None:
+    lines = filter_template_lines(iter([
+        'Feature: test',
+        '    Scenario: first',
+        '        {% if {$ foo $} %}',
+        '        Given a step',
+        '        {% endif %}',
+        '        {% if foo %}',
+        '        Given another step',
+        '        {% endif %}',
+    ]))
+
+    assert next(lines) == 'Feature: test'
+    assert list(lines) == [
+        '    Scenario: first',
+        '        Given a step',
+        '        {% if foo %}',
+        '        Given another step',
+        '        {% endif %}',
+    ]
+
+
+def test_parse_scenario_tag() -> None:
+    assert parse_scenario_tag('"first", feature="./test.feature"') == ('first', './test.feature', {})
+    assert parse_scenario_tag('"first", "./test.feature", foo="bar", bar=1') == ('first', './test.feature', {'foo': 'bar', 'bar': 1})
+    assert parse_scenario_tag('feature="./test.feature", scenario="first"') == ('first', './test.feature', {})
+
+    # not literals, or not matching the signature of `ScenarioTag.render`
+    assert parse_scenario_tag('"first", feature=variable') is None
+    assert parse_scenario_tag('"first", feature="./test.feature" ~ suffix') is None
+    assert parse_scenario_tag('"first", feature="./test.feature", **variables') is None
+    assert parse_scenario_tag('"first", "./test.feature", "foo"') is None
+    assert parse_scenario_tag('"first", scenario="first", feature="./test.feature"') is None
+    assert parse_scenario_tag('"first"') is None
+    assert parse_scenario_tag('"first", feature=') is None
+
+
+class TestIncludeGraph:
+    def test_build(self, tmp_path_factory: TempPathFactory) -> None:
+        test_context = tmp_path_factory.mktemp('test_include_graph')
+        feature_file = test_context / 'test.feature'
+        (test_context / 'library').mkdir()
+        (test_context / 'library' / 'steps.feature').write_text("""Feature: steps
+    Scenario: leaf
+        Given a step with {$ foo $}
+
+    Scenario: nested
+        {% scenario "leaf", feature="./steps.feature", foo="{$ foo $}" %}
+        {% scenario "other", feature="../other.feature" %}
+""")
+        (test_context / 'other.feature').write_text("""Feature: other
+    Scenario: other
+        Given another step
+""")
+        source = """Feature: test
+    Scenario: first
+        {% scenario "nested", feature="./library/steps.feature", foo="bar" %}
+
+    Scenario: second
+        {% scenario "leaf", feature="./library/steps.feature", foo="bar" %}
+        # {% scenario "commented", feature="./does-not-exist.feature" %}
+        {% scenario "dynamic", feature=some_variable %}
+
+    Scenario: third
+        {% scenario "missing", feature="./does-not-exist.feature" %}
+"""
+
+        try:
+            graph = IncludeGraph.build(feature_file, source)
+
+            # an include is identified as where it was first found
+            assert [include.identifier for include in graph.roots] == [
+                './library/steps.feature#nested',
+                './steps.feature#leaf',
+                './does-not-exist.feature#missing',
+            ]
+            nested, leaf, missing = graph.roots
+            assert not nested.leaf
+            assert [include.identifier for include in nested.children] == ['./steps.feature#leaf', '../other.feature#other']
+            # same scenario, with same variables, is the same include
+            assert nested.children[0] is leaf
+            assert leaf.leaf
+            # only lines with statements are scanned for includes, with variables substituted
+            assert nested.statements == (
+                '{% scenario "leaf", feature="./steps.feature", foo="bar" %}\n'
+                '        {% scenario "other", feature="../other.feature" %}'
+            )
+            assert leaf.statements == ''
+            assert missing.leaf
+            assert isinstance(missing.error, FileNotFoundError)
+            assert len(graph.includes) == 4
+            assert sorted(include.identifier for include in graph.leafs) == ['../other.feature#other', './does-not-exist.feature#missing', './steps.feature#leaf']
+
+            # leafs are pre-rendered when the graph is built
+            prerendered = graph.prerendered
+            assert prerendered[leaf.key] == 'Given a step with bar'
+            assert prerendered[nested.children[1].key] == 'Given another step'
+            assert isinstance(prerendered[missing.key], FileNotFoundError)
+            assert nested.key not in prerendered
+
+            assert graph.format().split('\n') == [
+                feature_file.as_posix(),
+                '  - ./library/steps.feature#nested: not rendered (2 includes)',
+                f'    - ./steps.feature#leaf: {leaf.render_time:.2f} ms (leaf)',
+                f'    - ../other.feature#other: {nested.children[1].render_time:.2f} ms (leaf)',
+                f'  - ./steps.feature#leaf: {leaf.render_time:.2f} ms (leaf)',
+                '  - ./does-not-exist.feature#missing: not rendered (error)',
+            ]
+        finally:
+            rm_rf(test_context)
+
+    def test_build_previous(self, tmp_path_factory: TempPathFactory, mocker: MockerFixture) -> None:
+        test_context = tmp_path_factory.mktemp('test_include_graph')
+        feature_file = test_context / 'test.feature'
+        nested_file = test_context / 'nested.feature'
+        leaf_file = test_context / 'leaf.feature'
+        other_file = test_context / 'other.feature'
+        nested_file.write_text('Feature: nested\n    Scenario: nested\n        {% scenario "leaf", feature="./leaf.feature" %}\n')
+        leaf_file.write_text('Feature: leaf\n    Scenario: leaf\n        Given a leaf step\n')
+        other_file.write_text('Feature: other\n    Scenario: other\n        Given another step\n')
+        source = """Feature: test
+    Scenario: first
+        {% scenario "nested", feature="./nested.feature" %}
+        {% scenario "other", feature="./other.feature" %}
+"""
+        render_spy = mocker.spy(ScenarioTag, 'render_scenario_text')
+
+        try:
+            # only leafs are rendered, includes are found without rendering
+            previous = IncludeGraph.build(feature_file, source)
+            assert render_spy.call_count == 2
+            render_spy.reset_mock()
+
+            # nothing changed
+            graph = IncludeGraph.build(feature_file, source, previous=previous)
+            assert graph.reused == set(previous.includes.keys())
+            assert graph.prerendered == previous.prerendered
+            assert render_spy.call_count == 0
+
+            # leaf changed, nested that includes it is affected as well
+            graph = IncludeGraph.build(feature_file, source, previous=previous, changed=[leaf_file])
+            other = previous.roots[1]
+            assert graph.reused == {other.key}
+            assert graph.roots[1] is other
+            assert graph.roots[0] is not previous.roots[0]
+            assert graph.prerendered == previous.prerendered
+            # leaf.feature
+            assert render_spy.call_count == 1
+        finally:
+            rm_rf(test_context)
+
+    def test_build_cycle(self, tmp_path_factory: TempPathFactory) -> None:
+        test_context = tmp_path_factory.mktemp('test_include_graph')
+        feature_file = test_context / 'test.feature'
+        (test_context / 'first.feature').write_text("""Feature: first
+    Scenario: first
+        {% scenario "second", feature="./second.feature" %}
+""")
+        (test_context / 'second.feature').write_text("""Feature: second
+    Scenario: second
+        {% scenario "first", feature="./first.feature" %}
+""")
+
+        try:
+            with pytest.raises(ValueError, match=r'^scenario includes itself: ./first.feature#first -> ./second.feature#second -> ./first.feature#first$'):
+                IncludeGraph.build(feature_file, """Feature: test
+    Scenario: test
+        {% scenario "first", feature="./first.feature" %}
+""")
+        finally:
+            rm_rf(test_context)
+
+    def test_build_errors(self, tmp_path_factory: TempPathFactory) -> None:
+        test_context = tmp_path_factory.mktemp('test_include_graph')
+        feature_file = test_context / 'test.feature'
+        (test_context / 'library.feature').write_text('Feature: library\n    Scenario: library\n        Given step with {$ foo $}\n')
+
+        source = """Feature: test
+    Scenario: ok
+        {% scenario "library", feature="./library.feature", foo="0" %}
+    Scenario: error
+        {% scenario "library", feature="./library.feature", foo="0", bar="0" %}
+"""
+
+        try:
+            graph = IncludeGraph.build(feature_file, source)
+            ok, error = graph.roots
+
+            assert graph.prerendered[ok.key] == 'Given step with 0'
+            assert ok.render_time is not None
+
+            # errors about variables are not ignored, they are raised when the include is rendered
+            assert error.error is graph.prerendered[error.key]
+            assert isinstance(error.error, ValueError)
+            assert str(error.error).startswith('the following variables has been declared in scenario tag but not used in ./library.feature#library:\n  bar')
+            assert error.render_time is None
+
+            # unless errors should be ignored
+            graph = IncludeGraph.build(feature_file, source, ignore_errors=True)
+            assert [graph.prerendered[include.key] for include in graph.roots] == ['Given step with 0', 'Given step with 0']
+        finally:
+            rm_rf(test_context)
+
+    def test_prerender_parallel(self, tmp_path_factory: TempPathFactory, mocker: MockerFixture) -> None:
+        test_context = tmp_path_factory.mktemp('test_include_graph')
+        feature_file = test_context / 'test.feature'
+        (test_context / 'library.feature').write_text('Feature: library\n' + ''.join(
+            f'    Scenario: scenario-{number}\n        Given step {number} with {{$ foo $}}\n' for number in range(20)
+        ))
+        mocker.patch('grizzly_cli.utils.render.os.cpu_count', return_value=2)
+        executor_mock = mocker.patch('grizzly_cli.utils.render.ProcessPoolExecutor', wraps=ProcessPoolExecutor)
+        render_spy = mocker.spy(ScenarioTag, 'render_scenario_text')
+
+        source = 'Feature: test\n' + ''.join(
+            f'    Scenario: scenario-{number}\n        {{% scenario "scenario-{number}", feature="./library.feature", foo="{number}" %}}\n' for number in range(20)
+        )
+        # one include with an error, that should be raised when rendered
+        source += '    Scenario: error\n        {% scenario "scenario-0", feature="./library.feature", bar="0" %}\n'
+
+        try:
+            # not enough leafs, or only one worker
+            IncludeGraph.build(feature_file, source, max_workers=1)
+            assert executor_mock.call_count == 0
+            assert render_spy.call_count == 21
+            render_spy.reset_mock()
+
+            graph = IncludeGraph.build(feature_file, source, max_workers=2)
+            assert len(graph.leafs) == 21
+
+            # all leafs was rendered by the workers, none in this process
+            executor_mock.assert_called_once_with(max_workers=2)
+            assert render_spy.call_count == 0
+
+            for number, include in enumerate(graph.roots[:20]):
+                assert graph.prerendered[include.key] == f'Given step {number} with {number}'
+                assert include.render_time is not None
+
+            error = graph.prerendered[graph.roots[20].key]
+            assert isinstance(error, ValueError)
+            assert str(error).startswith('the following variables has been declared in scenario tag but not used in ./library.feature#scenario-0:\n  bar')
+        finally:
+            rm_rf(test_context)
+
+
+def test_render_feature_file_stats(tmp_path_factory: TempPathFactory) -> None:
+    test_context = tmp_path_factory.mktemp('test_render_feature_file')
+    feature_file = test_context / 'test.feature'
+    feature_file.write_text("""Feature: test
+    Scenario: first
+        {% scenario "included", feature="./include.feature" %}
+""")
+    (test_context / 'include.feature').write_text("""Feature: include
+    Scenario: included
+        Given a step
+""")
+    cache = RenderCache(test_context / 'cache')
+
+    try:
+        result = render_feature_file(feature_file, test_context / 'test.lock.feature', cache)
+        assert result.graph is not None
+        stats = result.format_stats().split('\n')
+        assert stats[0] == f'rendered in {result.render_time:.2f} ms, 1 unique includes, 1 leafs pre-rendered serially:'
+        assert stats[1:] == [feature_file.as_posix(), f'  - ./include.feature#included: {result.graph.roots[0].render_time:.2f} ms (leaf)']
+
+        result = render_feature_file(feature_file, test_context / 'test.lock.feature', cache)
+        assert result.cache_hit
+        assert result.format_stats() == f'rendered from cache in {result.render_time:.2f} ms, no includes was rendered'
+    finally:
+        rm_rf(test_context)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import os
+import re
+from typing import TYPE_CHECKING
+
+from grizzly_cli.utils import setup_logging
+from grizzly_cli.utils.configuration import ScenarioTag
+from grizzly_cli.utils.render import RenderCache, render_feature_file
+from grizzly_cli.utils.watch import FileWatcher, watch_feature_file
+from tests.helpers import rm_rf
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Callable
+    from pathlib import Path
+
+    from _pytest.capture import CaptureFixture
+    from _pytest.tmpdir import TempPathFactory
+    from pytest_mock import MockerFixture
+
+
+def write(file: Path, content: str) -> None:
+    file.write_text(content)
+    # make sure a change is detected even if the file system has coarse mtime resolution
+    stat = file.stat()
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_file_watcher(tmp_path_factory: TempPathFactory) -> None:
+    test_context = tmp_path_factory.mktemp('test_file_watcher')
+    first_file = test_context / 'first.feature'
+    second_file = test_context / 'second.feature'
+    first_file.write_text('Feature: first')
+
+    try:
+        watcher = FileWatcher()
+        watcher.watch([first_file, second_file])
+
+        assert watcher.poll() == set()
+
+        write(first_file, 'Feature: first changed')
+        assert watcher.poll() == {first_file.resolve()}
+        assert watcher.poll() == set()
+
+        # created
+        second_file.write_text('Feature: second')
+        assert watcher.poll() == {second_file.resolve()}
+
+        # removed
+        first_file.unlink()
+        assert watcher.poll() == {first_file.resolve()}
+
+        # watched files are replaced, state of files that still are watched is kept
+        write(second_file, 'Feature: second changed')
+        watcher.watch([second_file])
+        assert list(watcher.files.keys()) == [second_file.resolve()]
+        assert watcher.poll() == {second_file.resolve()}
+    finally:
+        rm_rf(test_context)
+
+
+def test_watch_feature_file(tmp_path_factory: TempPathFactory, mocker: MockerFixture, capsys: CaptureFixture) -> None:
+    setup_logging()
+
+    test_context = tmp_path_factory.mktemp('test_watch_feature_file')
+    feature_file = test_context / 'test.feature'
+    output_file = test_context / 'test.lock.feature'
+    first_file = test_context / 'first.feature'
+    second_file = test_context / 'second.feature'
+    environment_file = test_context / 'environment.yaml'
+    base_file = test_context / 'base.yaml'
+
+    write(feature_file, """Feature: test
+    Scenario: first
+        {% scenario "first", feature="./first.feature" %}
+
+    Scenario: second
+        {% scenario "second", feature="./second.feature" %}
+""")
+    write(first_file, 'Feature: first\n    Scenario: first\n        Given a first step\n')
+    write(second_file, 'Feature: second\n    Scenario: second\n        Given a second step\n')
+    write(base_file, 'configuration:\n    foo: bar\n')
+    write(environment_file, '{% merge "./base.yaml" %}\nconfiguration:\n    bar: foo\n')
+
+    changes: list[Callable[[], None]] = [
+        # nothing changed
+        lambda: None,
+        # included file changed, only that include is rendered again
+        lambda: write(second_file, 'Feature: second\n    Scenario: second\n        Given a changed second step\n'),
+        # error while rendering, keeps watching
+        lambda: write(feature_file, feature_file.read_text().replace('"./second.feature"', '"./third.feature"')),
+        # file that did not exist is created
+        lambda: write(test_context / 'third.feature', 'Feature: third\n    Scenario: second\n        Given a third step\n'),
+        # merged environment file changed
+        lambda: write(base_file, 'configuration:\n    foo: baz\n'),
+    ]
+
+    def sleep(_: float) -> None:
+        if len(changes) < 1:
+            raise KeyboardInterrupt
+
+        changes.pop(0)()
+
+    mocker.patch('grizzly_cli.utils.watch.sleep', side_effect=sleep)
+    render_spy = mocker.spy(ScenarioTag, 'render_scenario_text')
+    # error when refreshing, after the file that did not exist is created, keeps watching
+    refresh_mock = mocker.MagicMock(side_effect=[None, ValueError('scenario-2 will have 0 users'), None])
+
+    try:
+        dependencies: set[Path] = set()
+        result = render_feature_file(feature_file, output_file, RenderCache(max_size=0), dependencies=dependencies)
+        assert dependencies == {feature_file.resolve(), first_file.resolve(), second_file.resolve()}
+        assert render_spy.call_count == 2
+        render_spy.reset_mock()
+
+        capsys.readouterr()
+        watch_feature_file(feature_file, output_file, result, dependencies, refresh_mock, environment_file=environment_file)
+
+        assert output_file.read_text().endswith('Given a third step')
+        assert refresh_mock.call_count == 3
+        # second.feature and third.feature, missing third.feature is not rendered
+        assert render_spy.call_count == 2
+
+        capture = capsys.readouterr()
+        assert capture.out == ''
+
+        # context lines in the diff that are empty, has a trailing space
+        output = re.sub(r'refreshed in [0-9.]+ ms', 'refreshed in X ms', capture.err).replace('\n \n', '\n\n')
+        third_file = test_context / 'third.feature'
+        assert output == f"""watching 5 files for changes, press ctrl+c to stop
+changed: {second_file.resolve().as_posix()}
+--- a/test.lock.feature
++++ b/test.lock.feature
+@@ -3,4 +3,4 @@
+         Given a first step
+
+     Scenario: second
+-        Given a second step
++        Given a changed second step
+refreshed in X ms, reused 1 of 2 includes
+changed: {feature_file.resolve().as_posix()}
+failed to render {feature_file}: FileNotFoundError(2, 'No such file or directory')
+changed: {third_file.resolve().as_posix()}
+--- a/test.lock.feature
++++ b/test.lock.feature
+@@ -3,4 +3,4 @@
+         Given a first step
+
+     Scenario: second
+-        Given a changed second step
++        Given a third step
+failed to refresh {feature_file}: scenario-2 will have 0 users
+changed: {base_file.resolve().as_posix()}
+refreshed in X ms, reused 1 of 2 includes
+stopped watching
+"""
+    finally:
+        rm_rf(test_context)